@@ -0,0 +1,17 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import create_app
+from models.user import db
+from services.async_reads import AsyncReadApp
+
+# Async entry point: the read-heavy routes on an event loop, everything else on threads
+#   uvicorn --app-dir app --host 0.0.0.0 --port 5000 --workers 4 asgi:app
+# The sync entry point (wsgi.py under gunicorn) is unchanged.
+flask_app = create_app()
+app = AsyncReadApp(flask_app)
+
+# As in wsgi.py: don't carry startup connections into forked workers
+with flask_app.app_context():
+    db.engine.dispose()
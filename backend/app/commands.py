@@ -0,0 +1,161 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import click
+from flask.cli import with_appcontext
+from flask import current_app
+from models.user import db, User
+from services.task_counters import rebuild_task_counters, reconcile_task_counters
+from services.task_trends import rebuild_task_trends, reconcile_task_trends
+from services.search import install_search_index
+from services.task_import import IMPORT_FORMATS, IMPORT_READERS, import_tasks
+from services.migrations import upgrade_database, pending_migrations
+from services.revocation import revocation_list
+from services.task_sync import prune_task_deletions
+from services.due_dates import due_scheduler
+from services.task_events import task_events
+
+@click.command('rebuild-task-counters')
+@click.option('--check', is_flag=True, help='Only report drift between task_counters and tasks; exit 1 if any.')
+@with_appcontext
+def rebuild_task_counters_command(check):
+    """Rebuild (or check) the task_counters table from the tasks table."""
+    mismatches = reconcile_task_counters(db)
+    
+    for (user_id, status, priority), (stored, live) in sorted(mismatches.items(), key=str):
+        click.echo(f'user={user_id} status={status} priority={priority}: counter={stored} live={live}')
+    
+    if check:
+        click.echo(f'{len(mismatches)} counter(s) out of sync')
+        sys.exit(1 if mismatches else 0)
+    
+    rows = rebuild_task_counters(db)
+    click.echo(f'Rebuilt task_counters: {rows} row(s), fixed {len(mismatches)} drifted counter(s)')
+
+@click.command('rebuild-task-trends')
+@click.option('--check', is_flag=True, help='Only report drift between the trend rollups and tasks; exit 1 if any.')
+@click.option('--batch-size', type=int, default=5000, show_default=True, help='Tasks read per batch.')
+@with_appcontext
+def rebuild_task_trends_command(check, batch_size):
+    """Backfill (or check) the daily trend rollups from the tasks table."""
+    mismatches = reconcile_task_trends(db, batch_size)
+    
+    for (user_id, day), (stored, live) in sorted(mismatches.items(), key=str):
+        scope = 'all' if user_id is None else user_id
+        click.echo(f'user={scope} day={day}: rollup={stored} live={live} (created, completed, overdue)')
+    
+    if check:
+        click.echo(f'{len(mismatches)} rollup row(s) out of sync')
+        sys.exit(1 if mismatches else 0)
+    
+    rows = rebuild_task_trends(db, batch_size)
+    click.echo(f'Rebuilt trend rollups: {rows} user-day row(s), fixed {len(mismatches)} drifted row(s)')
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Create the full-text search index for this database and repopulate it."""
+    backend = install_search_index(db)
+    click.echo(f'Search index ready ({backend})')
+
+@click.command('import-tasks')
+@click.argument('source', type=click.File('rb'))
+@click.option('--user', 'username', required=True, help='Username that will own the imported tasks.')
+@click.option('--format', 'import_format', type=click.Choice(IMPORT_FORMATS),
+              help='Input format (default: from the file extension, else ndjson).')
+@click.option('--batch-size', type=int, help='Rows per INSERT/COPY and commit (default: IMPORT_BATCH_SIZE).')
+@with_appcontext
+def import_tasks_command(source, username, import_format, batch_size):
+    """Import tasks from an NDJSON or CSV file (use - for stdin)."""
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        raise click.ClickException(f'User {username} not found')
+    
+    if import_format is None:
+        import_format = 'csv' if source.name.endswith('.csv') else 'ndjson'
+    
+    records = IMPORT_READERS[import_format](source)
+    events = import_tasks(db, records, user.id, batch_size or current_app.config['IMPORT_BATCH_SIZE'])
+    
+    summary = None
+    for event in events:
+        if event['type'] == 'error':
+            click.echo(f"line {event['line']}: {event['message']}", err=True)
+        elif event['type'] == 'progress':
+            click.echo(f"{event['processed']} processed, {event['imported']} imported, {event['failed']} failed", err=True)
+        else:
+            summary = event
+    
+    if summary is None:
+        raise click.ClickException('Import ended without a summary')
+    
+    click.echo(f"Imported {summary['imported']} of {summary['processed']} task(s), {summary['failed']} failed")
+    if 'error' in summary:
+        raise click.ClickException(f"Import stopped: {summary['error']}")
+
+@click.command('db-upgrade')
+@click.option('--pending', is_flag=True, help='Only list SQL migrations not yet applied (PostgreSQL).')
+@with_appcontext
+def db_upgrade_command(pending):
+    """Create or upgrade the database schema and seed the default admin."""
+    if pending:
+        for version, _ in pending_migrations(db):
+            click.echo(version)
+        return
+    
+    changes = upgrade_database(db)
+    for change in changes:
+        click.echo(f'  + {change}')
+    click.echo(f'Database is up to date ({len(changes)} change(s) applied)')
+
+@click.command('prune-revoked-tokens')
+@with_appcontext
+def prune_revoked_tokens_command():
+    """Delete revoked-token and used-refresh-token entries whose tokens have expired."""
+    deleted = revocation_list.prune()
+    click.echo(f'Pruned {deleted} expired revoked or used token(s)')
+
+@click.command('prune-task-deletions')
+@with_appcontext
+def prune_task_deletions_command():
+    """Delete task tombstones older than TASK_DELETIONS_RETENTION_DAYS."""
+    retention_days = current_app.config.get('TASK_DELETIONS_RETENTION_DAYS', 30)
+    if not retention_days:
+        raise click.ClickException('TASK_DELETIONS_RETENTION_DAYS is 0: tombstones are kept forever')
+    deleted = prune_task_deletions(db, retention_days)
+    click.echo(f'Pruned {deleted} task tombstone(s) older than {retention_days:g} day(s)')
+
+@click.command('run-due-scheduler')
+@click.option('--rescan-only', is_flag=True,
+              help='Run without TASK_EVENTS_BACKEND=redis; writes are then seen only at each rescan.')
+@with_appcontext
+def run_due_scheduler_command(rescan_only):
+    """Send reminder and overdue events as task due dates arrive (runs until interrupted)."""
+    backend = current_app.config.get('TASK_EVENTS_BACKEND', 'memory')
+    if backend != 'redis':
+        if not rescan_only:
+            raise click.ClickException(
+                f'TASK_EVENTS_BACKEND={backend}: this process will not see task writes made by the web workers. '
+                'Set TASK_EVENTS_BACKEND=redis, or pass --rescan-only to rely on rescans every '
+                'DUE_SCHEDULER_REFRESH_SECONDS (reminders can be missed)'
+            )
+        click.echo(f'Warning: TASK_EVENTS_BACKEND={backend}; writes are picked up only when the window is rescanned', err=True)
+    
+    task_events.add_listener(due_scheduler.on_task_event)
+    click.echo(f'Due date scheduler running, sending events to {type(due_scheduler.sink).__name__}')
+    try:
+        due_scheduler.run()
+    except KeyboardInterrupt:
+        due_scheduler.stop()
+
+def register_commands(app):
+    """Register the app's CLI commands (run with `flask --app main:create_app <command>`)."""
+    app.cli.add_command(rebuild_task_counters_command)
+    app.cli.add_command(rebuild_task_trends_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(import_tasks_command)
+    app.cli.add_command(db_upgrade_command)
+    app.cli.add_command(prune_revoked_tokens_command)
+    app.cli.add_command(prune_task_deletions_command)
+    app.cli.add_command(run_due_scheduler_command)
@@ -9,5 +9,100 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///app.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Connection pool (per process; see services/db_pool.py)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))  # extra connections allowed during bursts
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'True').lower() == 'true'  # test connections on checkout
+    
+    # SQLite file databases only
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # bytes
+    
+    # Async read path under asgi.py, see services/async_reads.py
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')  # defaults to DATABASE_URL with the aiosqlite/asyncpg driver
+    ASYNC_SYNC_THREADS = int(os.environ.get('ASYNC_SYNC_THREADS', 8))  # threads serving the other (sync) routes under asgi.py
+    
+    # Per-request profiling and /metrics (opt-in; see services/profiling.py)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False').lower() == 'true'
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))  # log statements slower than this; 0 disables
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # bearer token required by /metrics when set
+    PROFILE_ENDPOINT = os.environ.get('PROFILE_ENDPOINT')  # endpoint name to sample with cProfile, e.g. tasks.get_tasks
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.01))  # fraction of its requests profiled
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')  # where .prof files are written
+    
+    # Fail requests that exceed their view's @query_budget; unset means only under TESTING
+    QUERY_BUDGET_ENFORCE = os.environ.get('QUERY_BUDGET_ENFORCE', '').lower() == 'true' if os.environ.get('QUERY_BUDGET_ENFORCE') else None
+    
+    # Password hashing, see services/passwords.py; hashes made with another method or cost are replaced at login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')  # werkzeug syntax, e.g. scrypt:32768:8:1 or pbkdf2:sha256:600000
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))  # hashing threads per process
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 32))  # waiting hashes before logins get 503
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))  # seconds a request waits for its hash
+    
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-string'
-    JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 3600))  # 1 hour default
\ No newline at end of file
+    JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 3600))  # 1 hour default
+    JWT_REFRESH_TOKEN_EXPIRES = int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES', 30 * 24 * 3600))  # each refresh issues a new one
+    # Signing, see services/jwt_keys.py: HS256 uses JWT_SECRET_KEY; RS256, ES256, EdDSA, ... use PEM keys (needs cryptography)
+    JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
+    JWT_DECODE_ALGORITHMS = os.environ.get('JWT_DECODE_ALGORITHMS', '').split(',') if os.environ.get('JWT_DECODE_ALGORITHMS') else None  # accepted; defaults to JWT_ALGORITHM
+    JWT_PRIVATE_KEY = os.environ.get('JWT_PRIVATE_KEY')  # PEM text, or set JWT_PRIVATE_KEY_FILE; omit on verify-only processes
+    JWT_PRIVATE_KEY_FILE = os.environ.get('JWT_PRIVATE_KEY_FILE')
+    JWT_PUBLIC_KEY = os.environ.get('JWT_PUBLIC_KEY')  # PEM text, or set JWT_PUBLIC_KEY_FILE; derived from the private key if omitted
+    JWT_PUBLIC_KEY_FILE = os.environ.get('JWT_PUBLIC_KEY_FILE')
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 1000))  # Max items per /api/tasks/bulk request
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 5000))  # Rows per INSERT/COPY and commit during imports
+    
+    # Analytics cache: 'memory' (per-process LRU), 'redis' (shared, needs ANALYTICS_CACHE_URL) or 'none'
+    ANALYTICS_CACHE_BACKEND = os.environ.get('ANALYTICS_CACHE_BACKEND', 'memory')
+    ANALYTICS_CACHE_URL = os.environ.get('ANALYTICS_CACHE_URL')
+    ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', 10))  # seconds
+    ANALYTICS_CACHE_SIZE = int(os.environ.get('ANALYTICS_CACHE_SIZE', 1024))  # max entries per process
+    ANALYTICS_TREND_MAX_DAYS = int(os.environ.get('ANALYTICS_TREND_MAX_DAYS', 1100))  # longest range GET /api/analytics/trends accepts
+    
+    # Task change feed (GET /api/tasks/stream), see services/task_events.py
+    TASK_EVENTS_BACKEND = os.environ.get('TASK_EVENTS_BACKEND', 'memory')  # 'memory' (per process), 'redis' (shared, needs TASK_EVENTS_URL) or 'none'
+    TASK_EVENTS_URL = os.environ.get('TASK_EVENTS_URL')
+    TASK_EVENTS_LOG_SIZE = int(os.environ.get('TASK_EVENTS_LOG_SIZE', 1000))  # recent events kept for Last-Event-ID resume
+    TASK_EVENTS_BUFFER = int(os.environ.get('TASK_EVENTS_BUFFER', 100))  # undelivered events per stream before it is closed
+    TASK_EVENTS_HEARTBEAT = float(os.environ.get('TASK_EVENTS_HEARTBEAT', 15))  # seconds between keep-alive comments
+    TASK_EVENTS_RETRY_MS = int(os.environ.get('TASK_EVENTS_RETRY_MS', 3000))  # reconnection delay sent to clients
+    
+    # Incremental sync (GET /api/tasks/changes), see services/task_sync.py
+    SYNC_SETTLE_SECONDS = float(os.environ.get('SYNC_SETTLE_SECONDS', 5))  # recent changes are sent again on the next sync, covering late commits
+    TASK_DELETIONS_RETENTION_DAYS = float(os.environ.get('TASK_DELETIONS_RETENTION_DAYS', 30))  # older sync tokens get 410; 0 keeps tombstones forever
+    
+    # Due date reminders and overdue events, see services/due_dates.py; run one scheduler (`flask run-due-scheduler`)
+    DUE_SCHEDULER_ENABLED = os.environ.get('DUE_SCHEDULER_ENABLED', 'False').lower() == 'true'  # run inside the web process (single worker only)
+    DUE_REMINDER_MINUTES = float(os.environ.get('DUE_REMINDER_MINUTES', 60))  # reminder lead time; 0 disables reminders
+    DUE_SCHEDULER_LOOKAHEAD_HOURS = float(os.environ.get('DUE_SCHEDULER_LOOKAHEAD_HOURS', 24))  # due dates held in memory
+    DUE_SCHEDULER_CATCHUP_MINUTES = float(os.environ.get('DUE_SCHEDULER_CATCHUP_MINUTES', 60))  # rescanned on start for missed events
+    DUE_SCHEDULER_REFRESH_SECONDS = float(os.environ.get('DUE_SCHEDULER_REFRESH_SECONDS', 300))  # window rescans, catching writes it had no event for (late)
+    DUE_EVENTS_SINK = os.environ.get('DUE_EVENTS_SINK', 'log')  # 'log' or 'file' (JSON lines in DUE_EVENTS_FILE)
+    DUE_EVENTS_FILE = os.environ.get('DUE_EVENTS_FILE', 'due_events.ndjson')
+    
+    # User profile cache (per process) and access token revocation, see services/user_cache.py and services/revocation.py
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))  # seconds; 0 disables
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))  # max entries per process
+    REVOCATION_REFRESH_SECONDS = int(os.environ.get('REVOCATION_REFRESH_SECONDS', 30))  # revocations on other workers apply within this
+    REVOCATION_BLOOM_ERROR_RATE = float(os.environ.get('REVOCATION_BLOOM_ERROR_RATE', 0.001))  # false positives cost one lookup
+    
+    # Admission control, see services/rate_limit.py; unset RATE_LIMIT_ENABLED means on except under TESTING
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '').lower() == 'true' if os.environ.get('RATE_LIMIT_ENABLED') else None
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # 'memory' (per process) or 'redis' (shared, needs RATE_LIMIT_URL)
+    RATE_LIMIT_URL = os.environ.get('RATE_LIMIT_URL')
+    RATE_LIMIT_USER_RATE = float(os.environ.get('RATE_LIMIT_USER_RATE', 20))  # requests per second per user
+    RATE_LIMIT_USER_BURST = int(os.environ.get('RATE_LIMIT_USER_BURST', 40))
+    RATE_LIMIT_IP_RATE = float(os.environ.get('RATE_LIMIT_IP_RATE', 50))  # requests per second per client IP
+    RATE_LIMIT_IP_BURST = int(os.environ.get('RATE_LIMIT_IP_BURST', 100))
+    RATE_LIMIT_PROXY_HOPS = int(os.environ.get('RATE_LIMIT_PROXY_HOPS', 0))  # trusted proxies appending to X-Forwarded-For
+    LOAD_SHED_MAX_IN_FLIGHT = int(os.environ.get('LOAD_SHED_MAX_IN_FLIGHT', 0))  # per process; 0 disables
+    LOAD_SHED_MAX_POOL_WAIT_MS = float(os.environ.get('LOAD_SHED_MAX_POOL_WAIT_MS', 0))  # recent average checkout wait; 0 disables
+    LOAD_SHED_RETRY_AFTER = int(os.environ.get('LOAD_SHED_RETRY_AFTER', 1))  # seconds, sent with 503
+    
+    # Task search: 'auto' (FTS5 on SQLite, tsvector + pg_trgm on PostgreSQL) or 'like'
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
\ No newline at end of file
@@ -5,46 +5,75 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from flask import Flask, jsonify
 from flask_jwt_extended import JWTManager
 from config import Config
-from models.user import db as user_db, User
-# Remove the duplicate db import from task model
+from models.user import db as user_db
 from routes.auth import auth_bp
 from routes.tasks import tasks_bp
+from routes.tasks_bulk import tasks_bulk_bp
+from routes.tasks_import import tasks_import_bp
 from routes.analytics import analytics_bp
+from routes.internal import internal_bp
+from commands import register_commands
+from services.migrations import upgrade_database
+from services.cache import analytics_cache
+from services.user_cache import user_cache
+from services.passwords import password_hasher
+from services.revocation import revocation_list
+from services.jwt_keys import signing_keys
+from services.db_pool import init_db
+from services.profiling import request_profiler
+from services.rate_limit import admission_control
+from services.query_budget import query_budget
+from services.task_events import task_events
+from services.due_dates import due_scheduler
 
-def create_app():
-    """Create and configure the Flask application."""
+def create_app(config=None):
+    """
+    Create and configure the Flask application.
+    
+    Args:
+        config (dict): Settings applied over Config before any extension is
+            initialized, e.g. a test database URI (optional)
+    """
     app = Flask(__name__)
     app.config.from_object(Config)
+    if config:
+        app.config.update(config)
     
     # Initialize extensions
-    user_db.init_app(app)
-    # Remove the duplicate initialization
+    init_db(app, user_db)
+    analytics_cache.init_app(app)
+    user_cache.init_app(app)
+    task_events.init_app(app)
+    due_scheduler.init_app(app, user_db)  # after task_events, whose events it follows
+    password_hasher.init_app(app)
     jwt = JWTManager(app)
+    signing_keys.init_app(app)
+    request_profiler.init_app(app, user_db)  # after JWTManager: times its token decoding
+    admission_control.init_app(app, user_db)  # after the profiler, so rejections are recorded; before anything that queries
+    revocation_list.init_app(app, user_db)
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
+    app.register_blueprint(tasks_bulk_bp, url_prefix='/api/tasks/bulk')
+    app.register_blueprint(tasks_import_bp, url_prefix='/api/tasks/import')
     app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+    app.register_blueprint(internal_bp, url_prefix='/api/internal')
     
-    # Create tables
-    with app.app_context():
-        user_db.create_all()
-        # Remove the duplicate creation
-        
-        # Create default admin user if it doesn't exist
-        if not User.query.filter_by(username='admin').first():
-            admin = User(username='admin', email='admin@example.com', role='admin')
-            admin.set_password('admin123')
-            user_db.session.add(admin)
-            user_db.session.commit()
+    # Register CLI commands
+    register_commands(app)
+    
+    # The schema is managed by `flask db-upgrade` (services/migrations.py), not at startup
     
     # Health check endpoint
     @app.route('/health', methods=['GET'])
+    @query_budget(0)
     def health_check():
         return jsonify({'status': 'healthy', 'message': 'Task Management API is running'}), 200
     
     # Root endpoint
     @app.route('/', methods=['GET'])
+    @query_budget(0)
     def index():
         return jsonify({
             'message': 'Welcome to the Task Management API',
@@ -60,8 +89,13 @@ def create_app():
 
 if __name__ == '__main__':
     app = create_app()
+    
+    # Development server: bring the local database up to date before serving
+    with app.app_context():
+        upgrade_database(user_db)
+    
     app.run(
         host=os.environ.get('HOST', '0.0.0.0'),
         port=int(os.environ.get('PORT', 5000)),
-        debug=os.environ.get('DEBUG', 'True').lower() == 'true'
+        debug=os.environ.get('DEBUG', 'False').lower() == 'true'
     )
\ No newline at end of file
@@ -0,0 +1,43 @@
+from models.user import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    """A revoked token (by jti) or token family (by fam), kept until it would have expired, see services/revocation.py."""
+    __tablename__ = 'revoked_tokens'
+    __table_args__ = (
+        # Refresh loads unexpired entries; pruning deletes expired ones
+        db.Index('idx_revoked_tokens_expires_at', 'expires_at'),
+    )
+    
+    jti = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __init__(self, jti, user_id, expires_at):
+        self.jti = jti
+        self.user_id = user_id
+        self.expires_at = expires_at
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
+
+class UsedRefreshToken(db.Model):
+    """A refresh token (by jti) already exchanged for a new pair, kept until it would have expired.
+
+    Apart from revoked_tokens so that routine rotations stay out of the
+    revocation Bloom filter; only POST /api/auth/refresh looks them up.
+    """
+    __tablename__ = 'used_refresh_tokens'
+    __table_args__ = (
+        # Pruning deletes expired entries
+        db.Index('idx_used_refresh_tokens_expires_at', 'expires_at'),
+    )
+    
+    jti = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    used_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<UsedRefreshToken {self.jti}>'
@@ -1,10 +1,23 @@
-from flask_sqlalchemy import SQLAlchemy
+from models.user import db
 from datetime import datetime
 
-db = SQLAlchemy()
-
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Keyset pagination indexes, see services/pagination.py
+        db.Index('idx_tasks_created_at_id', 'created_at', 'id'),
+        db.Index('idx_tasks_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        # List ETags: max(updated_at) and count per user, see services/conditional.py
+        db.Index('idx_tasks_user_id_updated_at', 'user_id', 'updated_at'),
+        # Admins' incremental sync, see services/task_sync.py (users' own use the index above)
+        db.Index('idx_tasks_updated_at_id', 'updated_at', 'id'),
+        # GET /api/tasks?status= for a user's own tasks
+        db.Index('idx_tasks_user_id_status', 'user_id', 'status'),
+        # Admin-wide filters and due date lookups (migrations/001_initial_schema.sql)
+        db.Index('idx_tasks_status', 'status'),
+        db.Index('idx_tasks_priority', 'priority'),
+        db.Index('idx_tasks_due_date', 'due_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -12,8 +25,9 @@ class Task(db.Model):
     status = db.Column(db.String(20), nullable=False, default='pending')  # pending, in_progress, completed
     priority = db.Column(db.String(20), nullable=False, default='medium')  # low, medium, high
     due_date = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
-    updated_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+    # Python-side defaults keep a consistent microsecond format for keyset comparisons
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign key to User
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
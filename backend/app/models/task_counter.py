@@ -0,0 +1,19 @@
+from models.user import db
+
+class TaskCounter(db.Model):
+    """Materialized task count per (user, status, priority), see services/task_counters.py."""
+    __tablename__ = 'task_counters'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    priority = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __init__(self, user_id, status, priority, count=0):
+        self.user_id = user_id
+        self.status = status
+        self.priority = priority
+        self.count = count
+    
+    def __repr__(self):
+        return f'<TaskCounter {self.user_id}/{self.status}/{self.priority}={self.count}>'
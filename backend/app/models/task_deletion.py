@@ -0,0 +1,24 @@
+from models.user import db
+from datetime import datetime
+
+class TaskDeletion(db.Model):
+    """Tombstone for a deleted task, read by GET /api/tasks/changes, see services/task_sync.py."""
+    __tablename__ = 'task_deletions'
+    __table_args__ = (
+        # Changes since a sync token: a user's own tombstones, or every user's for admins; pruning by age
+        db.Index('idx_task_deletions_user_id_deleted_at', 'user_id', 'deleted_at'),
+        db.Index('idx_task_deletions_deleted_at', 'deleted_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __init__(self, task_id, user_id, deleted_at=None):
+        self.task_id = task_id
+        self.user_id = user_id
+        self.deleted_at = deleted_at or datetime.utcnow()
+    
+    def __repr__(self):
+        return f'<TaskDeletion {self.task_id}>'
@@ -0,0 +1,26 @@
+from models.user import db
+
+class TaskDailyStat(db.Model):
+    """Daily task rollup for one user (created, completed and overdue), see services/task_trends.py."""
+    __tablename__ = 'task_daily_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    created = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    overdue = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TaskDailyStat {self.user_id}/{self.day}>'
+
+class TaskDailyTotal(db.Model):
+    """Daily task rollup over every user, so global trends read one row per day."""
+    __tablename__ = 'task_daily_totals'
+
+    day = db.Column(db.Date, primary_key=True)
+    created = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    overdue = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TaskDailyTotal {self.day}>'
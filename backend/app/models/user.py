@@ -1,5 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from services.passwords import password_hasher
 
 db = SQLAlchemy()
 
@@ -11,6 +11,8 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='user')  # 'admin' or 'user'
+    # Bumped on every profile change; carried in access tokens as `ver`, see services/user_cache.py
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     created_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     
@@ -23,12 +25,12 @@ class User(db.Model):
         self.role = role
     
     def set_password(self, password):
-        """Hash and set the user's password."""
-        self.password_hash = generate_password_hash(password)
+        """Hash and set the user's password (on the password hashing pool)."""
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        """Check if the provided password matches the hash."""
-        return check_password_hash(self.password_hash, password)
+        """Check if the provided password matches the hash (on the password hashing pool)."""
+        return password_hasher.verify(self.password_hash, password)
     
     def to_dict(self):
         """Convert user object to dictionary."""
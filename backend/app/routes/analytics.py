@@ -2,22 +2,38 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_sqlalchemy import SQLAlchemy
 from services.analytics import (
     get_task_statistics, 
     get_user_task_statistics, 
     get_tasks_by_priority, 
-    get_tasks_by_status
+    get_tasks_by_status,
+    get_task_summary
 )
+from services.task_trends import InvalidTrendRangeError, get_task_trends, trend_range
+from services.query_budget import query_budget
+from services.cache import analytics_cache
 from models.task import db
+from datetime import datetime
 
 analytics_bp = Blueprint('analytics', __name__)
 
 @analytics_bp.route('/statistics', methods=['GET'])
+@query_budget(1)
 @jwt_required()
 def task_statistics():
     """Get overall task statistics."""
+    return read_statistics(db)
+
+def read_statistics(db: SQLAlchemy):
+    """
+    Respond to GET /api/analytics/statistics using db.session.
+    
+    Like the other read_* functions here, also run by the async read path
+    (services/async_reads.py) with a stand-in db around its own session.
+    """
     try:
         # Check if user is admin
         claims = get_jwt()
@@ -26,10 +42,12 @@ def task_statistics():
         if user_role != 'admin':
             # Return user-specific statistics
             current_user_id = get_jwt_identity()
-            stats = get_user_task_statistics(db, current_user_id)
+            stats = analytics_cache.cached(
+                'statistics', lambda: get_user_task_statistics(db, current_user_id), user_id=current_user_id
+            )
         else:
             # Return overall statistics
-            stats = get_task_statistics(db)
+            stats = analytics_cache.cached('statistics', lambda: get_task_statistics(db))
         
         return jsonify({
             'statistics': stats
@@ -39,11 +57,16 @@ def task_statistics():
         return jsonify({'message': 'Failed to retrieve statistics', 'error': str(e)}), 500
 
 @analytics_bp.route('/priority', methods=['GET'])
+@query_budget(1)
 @jwt_required()
 def tasks_by_priority():
     """Get task count grouped by priority."""
+    return read_priority_stats(db)
+
+def read_priority_stats(db: SQLAlchemy):
+    """Respond to GET /api/analytics/priority using db.session."""
     try:
-        stats = get_tasks_by_priority(db)
+        stats = analytics_cache.cached('priority', lambda: get_tasks_by_priority(db))
         
         return jsonify({
             'priority_stats': stats
@@ -53,15 +76,93 @@ def tasks_by_priority():
         return jsonify({'message': 'Failed to retrieve priority statistics', 'error': str(e)}), 500
 
 @analytics_bp.route('/status', methods=['GET'])
+@query_budget(1)
 @jwt_required()
 def tasks_by_status():
     """Get task count grouped by status."""
+    return read_status_stats(db)
+
+def read_status_stats(db: SQLAlchemy):
+    """Respond to GET /api/analytics/status using db.session."""
     try:
-        stats = get_tasks_by_status(db)
+        stats = analytics_cache.cached('status', lambda: get_tasks_by_status(db))
         
         return jsonify({
             'status_stats': stats
         }), 200
         
     except Exception as e:
-        return jsonify({'message': 'Failed to retrieve status statistics', 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'message': 'Failed to retrieve status statistics', 'error': str(e)}), 500
+
+@analytics_bp.route('/summary', methods=['GET'])
+@query_budget(1)
+@jwt_required()
+def task_summary():
+    """Get statistics, priority and status breakdowns in a single query."""
+    return read_summary(db)
+
+def read_summary(db: SQLAlchemy):
+    """Respond to GET /api/analytics/summary using db.session."""
+    try:
+        claims = get_jwt()
+        user_role = claims.get('role', 'user')
+        
+        # Same scoping as /statistics: admins see everything, users see their own tasks
+        user_id = None if user_role == 'admin' else get_jwt_identity()
+        summary = analytics_cache.cached('summary', lambda: get_task_summary(db, user_id), user_id=user_id)
+        
+        return jsonify(summary), 200
+        
+    except Exception as e:
+        return jsonify({'message': 'Failed to retrieve summary', 'error': str(e)}), 500
+
+@analytics_bp.route('/trends', methods=['GET'])
+@query_budget(1)
+@jwt_required()
+def task_trends():
+    """Get tasks created, completed and overdue per day or week."""
+    return read_trends(db)
+
+def read_trends(db: SQLAlchemy):
+    """Respond to GET /api/analytics/trends using db.session."""
+    try:
+        bucket = request.args.get('bucket', 'day')
+        try:
+            start, end = trend_range(bucket, request.args.get('from'), request.args.get('to'),
+                                     current_app.config.get('ANALYTICS_TREND_MAX_DAYS', 1100))
+        except InvalidTrendRangeError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # Admins see every user's tasks, or one user's with user_id=; users see their own
+        claims = get_jwt()
+        if claims.get('role', 'user') == 'admin':
+            user_id = request.args.get('user_id', type=int)
+        else:
+            user_id = get_jwt_identity()
+        
+        # Which days count as overdue changes at midnight, so the cache key carries the date
+        today = datetime.utcnow().date()
+        trends = analytics_cache.cached(
+            f'trends:{bucket}:{start}:{end}:{today}', lambda: get_task_trends(db, start, end, bucket, user_id, today),
+            user_id=user_id
+        )
+        
+        return jsonify({
+            'trends': trends
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': 'Failed to retrieve trends', 'error': str(e)}), 500
+
+@analytics_bp.route('/cache', methods=['GET'])
+@query_budget(0)
+@jwt_required()
+def cache_statistics():
+    """Get analytics cache hit/miss counters (admin only)."""
+    claims = get_jwt()
+    if claims.get('role', 'user') != 'admin':
+        return jsonify({'message': 'Access denied'}), 403
+    
+    return jsonify({
+        'cache_stats': analytics_cache.stats()
+    }), 200
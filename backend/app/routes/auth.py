@@ -3,10 +3,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
+from services.query_budget import query_budget
+from services.user_cache import user_cache
+from services.revocation import revocation_list
+from services.passwords import password_hasher, PasswordHasherBusy
 from models.user import User, db
-from werkzeug.security import check_password_hash
 import re
+import uuid
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -28,7 +32,28 @@ def validate_password(password):
         return False
     return True
 
+def issue_tokens(user_id, role, version, family=None):
+    """
+    Create an access and refresh token pair.
+
+    Both carry the claims routes authorize with and the family id (`fam`)
+    shared by every token issued from one login, so logout or a replayed
+    refresh token can revoke them together.
+    """
+    claims = {'role': role, 'ver': version, 'fam': family or uuid.uuid4().hex}
+    return {
+        'access_token': create_access_token(identity=user_id, additional_claims=claims),
+        'refresh_token': create_refresh_token(identity=user_id, additional_claims=claims)
+    }
+
+def busy_response():
+    """503 for requests turned away by the password hashing pool."""
+    response = jsonify({'message': 'Too many sign-in attempts in progress, please retry shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
+@query_budget(4)
 def register():
     """Register a new user."""
     try:
@@ -77,11 +102,15 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Registration failed', 'error': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@query_budget(3)
 def login():
     """Authenticate user and return JWT token."""
     try:
@@ -97,73 +126,120 @@ def login():
         # Find user by username or email
         user = User.query.filter((User.username == username) | (User.email == username)).first()
         
-        if not user or not check_password_hash(user.password_hash, password):
+        if not user or not user.check_password(password):
             return jsonify({'message': 'Invalid credentials'}), 401
         
-        # Create access token
-        additional_claims = {"role": user.role}
-        access_token = create_access_token(identity=user.id, additional_claims=additional_claims)
+        # Upgrade hashes made with an older method or cost while we have the plaintext
+        if password_hasher.needs_rehash(user.password_hash):
+            user.set_password(password)
+            db.session.commit()
+        
+        # The token claims let routes authorize without loading the user
+        tokens = issue_tokens(user.id, user.role, user.version)
         
         return jsonify({
             'message': 'Login successful',
-            'access_token': access_token,
+            **tokens,
             'user': user.to_dict()
         }), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return busy_response()
     except Exception as e:
+        db.session.rollback()
         return jsonify({'message': 'Login failed', 'error': str(e)}), 500
 
+@auth_bp.route('/refresh', methods=['POST'])
+@query_budget(3)
+@jwt_required(refresh=True)
+def refresh():
+    """Exchange a refresh token for a new token pair; the refresh token cannot be used again."""
+    try:
+        current_user_id = get_jwt_identity()
+        claims = get_jwt()
+        # Current role and version, usually from the user cache; no password check
+        cached = user_cache.get_user(db, current_user_id, min_version=claims.get('ver'))
+        
+        if not cached:
+            return jsonify({'message': 'User not found'}), 404
+        
+        # The insert decides: it also sees a rotation by another worker, or a
+        # concurrent request with the same token, still in flight
+        if not revocation_list.use_refresh_token(claims['jti'], current_user_id, claims['exp']):
+            revocation_list.revoke_reused(claims.get('fam'), current_user_id)
+            db.session.commit()
+            return jsonify({'message': 'Refresh token has already been used'}), 401
+        
+        tokens = issue_tokens(current_user_id, cached['user']['role'], cached['version'], claims.get('fam'))
+        db.session.commit()
+        
+        return jsonify(tokens), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Token refresh failed', 'error': str(e)}), 500
+
 @auth_bp.route('/profile', methods=['GET'])
+@query_budget(1)
 @jwt_required()
 def profile():
     """Get current user profile."""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        cached = user_cache.get_user(db, current_user_id, min_version=get_jwt().get('ver'))
         
-        if not user:
+        if not cached:
             return jsonify({'message': 'User not found'}), 404
         
         return jsonify({
-            'user': user.to_dict()
+            'user': cached['user']
         }), 200
         
     except Exception as e:
         return jsonify({'message': 'Failed to retrieve profile', 'error': str(e)}), 500
 
 @auth_bp.route('/profile', methods=['PUT'])
+@query_budget(5)
 @jwt_required()
 def update_profile():
     """Update current user profile."""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = db.session.get(User, current_user_id)
         
         if not user:
             return jsonify({'message': 'User not found'}), 404
         
         data = request.get_json()
         
-        # Update allowed fields
+        # Validate every field before assigning any, so the lookups do not autoflush a partial update
         if 'username' in data:
             # Check if username is already taken by another user
             existing_user = User.query.filter(User.username == data['username'], User.id != user.id).first()
             if existing_user:
                 return jsonify({'message': 'Username already exists'}), 409
-            user.username = data['username']
-        
+
         if 'email' in data:
             # Validate email format
             if not validate_email(data['email']):
                 return jsonify({'message': 'Invalid email format'}), 400
-            
+
             # Check if email is already taken by another user
             existing_user = User.query.filter(User.email == data['email'], User.id != user.id).first()
             if existing_user:
                 return jsonify({'message': 'Email already exists'}), 409
+
+        # Update allowed fields
+        if 'username' in data:
+            user.username = data['username']
+        if 'email' in data:
             user.email = data['email']
-        
+        user.version = User.version + 1
+
         db.session.commit()
+        user_cache.invalidate(user.id)
+        user_cache.store(user)
         
         return jsonify({
             'message': 'Profile updated successfully',
@@ -172,4 +248,22 @@ def update_profile():
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'message': 'Failed to update profile', 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'message': 'Failed to update profile', 'error': str(e)}), 500
+
+@auth_bp.route('/logout', methods=['POST'])
+@query_budget(2)
+@jwt_required()
+def logout():
+    """Revoke the access token used for this request and every token issued from the same login."""
+    try:
+        claims = get_jwt()
+        revocation_list.revoke(claims['jti'], get_jwt_identity(), claims['exp'])
+        if claims.get('fam'):
+            revocation_list.revoke_family(claims['fam'], get_jwt_identity())
+        db.session.commit()
+        
+        return jsonify({'message': 'Logged out successfully'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Logout failed', 'error': str(e)}), 500
\ No newline at end of file
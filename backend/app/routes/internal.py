@@ -0,0 +1,59 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from models.user import db
+from services.query_budget import query_budget
+from services.db_pool import get_pool_metrics
+from services.user_cache import user_cache
+from services.revocation import revocation_list
+from services.passwords import password_hasher
+from services.rate_limit import admission_control
+
+internal_bp = Blueprint('internal', __name__)
+
+@internal_bp.route('/pool', methods=['GET'])
+@query_budget(0)
+@jwt_required()
+def pool_metrics():
+    """Get live connection pool metrics for the serving process (admin only)."""
+    claims = get_jwt()
+    if claims.get('role', 'user') != 'admin':
+        return jsonify({'message': 'Access denied'}), 403
+    
+    metrics = {'pool': get_pool_metrics(db)}
+    
+    # Under asgi.py the async read path has its own pool
+    async_reads = current_app.extensions.get('async_reads')
+    if async_reads is not None:
+        metrics['async_pool'] = async_reads.pool_metrics()
+    
+    return jsonify(metrics), 200
+
+@internal_bp.route('/auth', methods=['GET'])
+@query_budget(0)
+@jwt_required()
+def auth_metrics():
+    """Get user cache, token revocation and password hashing counters for the serving process (admin only)."""
+    claims = get_jwt()
+    if claims.get('role', 'user') != 'admin':
+        return jsonify({'message': 'Access denied'}), 403
+    
+    return jsonify({
+        'user_cache': user_cache.stats(),
+        'revocation': revocation_list.stats(),
+        'password_hashing': password_hasher.stats()
+    }), 200
+
+@internal_bp.route('/admission', methods=['GET'])
+@query_budget(0)
+@jwt_required()
+def admission_metrics():
+    """Get rate limiting and load shedding counters for the serving process (admin only)."""
+    claims = get_jwt()
+    if claims.get('role', 'user') != 'admin':
+        return jsonify({'message': 'Access denied'}), 403
+    
+    return jsonify({'admission': {'enabled': admission_control.is_enabled(), **admission_control.stats()}}), 200
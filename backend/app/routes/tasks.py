@@ -2,12 +2,26 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_sqlalchemy import SQLAlchemy
 from models.task import Task, db
 from models.user import User
+from services.pagination import keyset_paginate, InvalidCursorError
+from services.task_counters import record_task_change, task_counter_key
+from services.task_trends import record_trend_change, task_trend_key
+from services.cache import analytics_cache
+from services.task_events import task_events, TaskStream
+from services.task_sync import InvalidSyncTokenError, SyncTokenExpiredError, record_task_deletions, task_changes
+from services.search import get_search_backend
+from services.export import EXPORT_FORMATS, EXPORT_GENERATORS, EXPORT_BATCH_SIZE, export_columns
+from services.serialization import InvalidFieldsError, parse_fields, task_columns, rows_to_dicts, json_response
+from services.query_budget import query_budget, budget_chunks
+from services.conditional import (task_etag, list_validators, content_etag, request_scope, is_not_modified,
+                                  not_modified_response, set_validators, precondition_failed)
 from sqlalchemy import and_, or_
 from datetime import datetime
+from math import ceil
 
 tasks_bp = Blueprint('tasks', __name__)
 
@@ -23,6 +37,10 @@ def validate_task_data(data, required_fields=None):
         if field not in data or not data[field]:
             return False, f'{field} is required'
     
+    # Column limits, checked here so one long title fails only its own task in a bulk write or import batch
+    if isinstance(data.get('title'), str) and len(data['title']) > Task.title.type.length:
+        return False, f'title must be at most {Task.title.type.length} characters'
+    
     # Validate status if provided
     if 'status' in data and data['status'] not in ['pending', 'in_progress', 'completed']:
         return False, 'Invalid status. Must be pending, in_progress, or completed'
@@ -40,92 +58,300 @@ def validate_task_data(data, required_fields=None):
     
     return True, None
 
-@tasks_bp.route('/', methods=['GET'])
+def parse_due_date(value):
+    """Parse a validated ISO due_date string (a trailing Z means UTC)."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def build_task(data, user_id):
+    """Build a new Task from validated request data."""
+    task = Task(
+        title=data['title'],
+        description=data.get('description', ''),
+        status=data.get('status', 'pending'),
+        priority=data.get('priority', 'medium'),
+        user_id=user_id
+    )
+    
+    # Set due_date if provided
+    if 'due_date' in data and data['due_date']:
+        task.due_date = parse_due_date(data['due_date'])
+    
+    return task
+
+def apply_task_updates(task, data):
+    """Apply validated update fields to a task."""
+    # Update fields if provided
+    if 'title' in data:
+        task.title = data['title']
+    
+    if 'description' in data:
+        task.description = data['description']
+    
+    if 'status' in data:
+        task.status = data['status']
+    
+    if 'priority' in data:
+        task.priority = data['priority']
+    
+    if 'due_date' in data:
+        if data['due_date']:
+            task.due_date = parse_due_date(data['due_date'])
+        else:
+            task.due_date = None
+    
+    task.updated_at = datetime.utcnow()
+
+def filter_tasks(query):
+    """
+    Apply the status/priority/search filters and the caller's visibility to a task query.
+    
+    Shared by every task listing endpoint so filtering and ownership rules stay identical.
+    
+    Returns:
+        tuple: (filtered query, search relevance ORDER BY clause or None)
+    """
+    # Filtering parameters
+    status = request.args.get('status')
+    priority = request.args.get('priority')
+    search = request.args.get('search')
+    
+    # Apply filters
+    if status:
+        query = query.filter(Task.status == status)
+    
+    if priority:
+        query = query.filter(Task.priority == priority)
+    
+    search_order = None
+    if search:
+        query, search_order = get_search_backend().apply(query, search)
+    
+    # For non-admin users, only show their own tasks
+    claims = get_jwt()
+    user_role = claims.get('role', 'user')
+    current_user_id = get_jwt_identity()
+    
+    if user_role != 'admin':
+        query = query.filter(Task.user_id == current_user_id)
+    
+    return query, search_order
+
+@tasks_bp.route('/', methods=['GET'], strict_slashes=False)
+@query_budget(4)
 @jwt_required()
 def get_tasks():
     """Get all tasks with filtering and pagination."""
+    return list_tasks(db)
+
+def list_tasks(db: SQLAlchemy):
+    """
+    Respond to GET /api/tasks using db.session.
+    
+    Also run by the async read path (services/async_reads.py) with a
+    stand-in db around its own session; the rest comes from the request.
+    """
     try:
         # Get query parameters
         page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 10, type=int), 100)  # Max 100 items per page
-        
-        # Filtering parameters
-        status = request.args.get('status')
-        priority = request.args.get('priority')
-        search = request.args.get('search')
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), 100)  # 1 to 100 items per page
         
-        # Build query
-        query = Task.query
+        # Cursor mode: ?pagination=cursor for the first page, then ?cursor=<next_cursor>
+        cursor = request.args.get('cursor')
+        use_cursor = cursor is not None or request.args.get('pagination') == 'cursor'
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
         
-        # Apply filters
-        if status:
-            query = query.filter(Task.status == status)
-        
-        if priority:
-            query = query.filter(Task.priority == priority)
-        
-        if search:
-            search_filter = or_(
-                Task.title.contains(search),
-                Task.description.contains(search)
-            )
-            query = query.filter(search_filter)
-        
-        # For non-admin users, only show their own tasks
+        # Sparse fieldsets: ?fields=id,title,status
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except InvalidFieldsError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # Select only the needed columns as tuples instead of hydrating Task objects
+        query, search_order = filter_tasks(db.session.query(*task_columns(fields)))
+        
+        if use_cursor:
+            try:
+                rows, pagination = keyset_paginate(query, per_page, cursor, include_total)
+            except InvalidCursorError as e:
+                return jsonify({'message': str(e)}), 400
+            
+            # A keyset page is one index range scan; an aggregate over every matching
+            # task would cost more than the page, so the page validates itself
+            response = json_response({
+                'tasks': rows_to_dicts(rows, fields),
+                'pagination': pagination
+            })
+            etag = content_etag(response.get_data())
+            if is_not_modified(etag):
+                return not_modified_response(etag)
+            return set_validators(response, etag)
+        
+        # Conditional GET: answer 304 from the aggregate validator query, before fetching any rows
         claims = get_jwt()
-        user_role = claims.get('role', 'user')
-        current_user_id = get_jwt_identity()
-        
-        if user_role != 'admin':
-            query = query.filter(Task.user_id == current_user_id)
+        etag, last_modified, total = list_validators(query, request_scope(get_jwt_identity(), claims.get('role', 'user')))
+        if is_not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
         
-        # Order by creation date (newest first)
-        query = query.order_by(Task.created_at.desc())
+        # Order by search relevance (best match first) when ranked, then creation date (newest first)
+        if search_order is not None:
+            query = query.order_by(search_order, Task.created_at.desc())
+        else:
+            query = query.order_by(Task.created_at.desc())
         
-        # Paginate
+        # Paginate; the validators already counted the matching tasks
         paginated_tasks = query.paginate(
             page=page, 
             per_page=per_page, 
-            error_out=False
+            error_out=False,
+            count=False
         )
         
-        return jsonify({
-            'tasks': [task.to_dict() for task in paginated_tasks.items],
+        return set_validators(json_response({
+            'tasks': rows_to_dicts(paginated_tasks.items, fields),
             'pagination': {
                 'page': paginated_tasks.page,
-                'pages': paginated_tasks.pages,
+                'pages': ceil(total / per_page),
                 'per_page': paginated_tasks.per_page,
-                'total': paginated_tasks.total
+                'total': total
             }
-        }), 200
+        }), etag, last_modified)
         
     except Exception as e:
         return jsonify({'message': 'Failed to retrieve tasks', 'error': str(e)}), 500
 
+@tasks_bp.route('/export', methods=['GET'])
+@query_budget(0)
+@jwt_required()
+def export_tasks():
+    """Stream every matching task as NDJSON or CSV."""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'message': 'Invalid format. Must be ndjson or csv'}), 400
+    
+    try:
+        # Same filters and visibility as GET /api/tasks, selecting plain column tuples
+        query, _ = filter_tasks(db.session.query(*export_columns()))
+        query = query.order_by(Task.created_at.desc(), Task.id.desc())
+        
+        # yield_per streams rows in batches (a server-side cursor on PostgreSQL),
+        # so memory stays flat no matter how many rows are exported
+        rows = query.yield_per(EXPORT_BATCH_SIZE)
+        # One statement for the whole export: later batches come from the open cursor
+        body = budget_chunks(EXPORT_GENERATORS[export_format](rows), 1, label='routes.tasks.export_tasks chunk')
+        
+        return Response(
+            stream_with_context(body),
+            mimetype=EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename=tasks.{export_format}'}
+        )
+        
+    except Exception as e:
+        return jsonify({'message': 'Failed to export tasks', 'error': str(e)}), 500
+
+@tasks_bp.route('/changes', methods=['GET'])
+@query_budget(2)
+@jwt_required()
+def get_changes():
+    """Get the tasks created, updated or deleted since a sync token."""
+    return read_changes(db)
+
+def read_changes(db: SQLAlchemy):
+    """Respond to GET /api/tasks/changes using db.session; see list_tasks()."""
+    try:
+        limit = min(max(request.args.get('limit', 500, type=int), 1), 1000)
+        # Admins sync every user's tasks
+        user_id = None if get_jwt().get('role', 'user') == 'admin' else get_jwt_identity()
+        
+        try:
+            result = task_changes(
+                db, user_id, request.args.get('since'), limit,
+                settle_seconds=current_app.config.get('SYNC_SETTLE_SECONDS', 5),
+                retention_days=current_app.config.get('TASK_DELETIONS_RETENTION_DAYS', 30)
+            )
+        except InvalidSyncTokenError as e:
+            return jsonify({'message': str(e)}), 400
+        except SyncTokenExpiredError as e:
+            return jsonify({'message': str(e)}), 410
+        
+        return json_response(result)
+        
+    except Exception as e:
+        return jsonify({'message': 'Failed to retrieve changes', 'error': str(e)}), 500
+
+@tasks_bp.route('/stream', methods=['GET'])
+@query_budget(0)
+@jwt_required()
+def stream_tasks():
+    """Push create/update/delete events for the caller's tasks (every task for admins) as Server-Sent Events."""
+    response, _ = open_stream()
+    return response
+
+def open_stream(notify=None):
+    """
+    Respond to GET /api/tasks/stream.
+    
+    The response body blocks a thread between events; the async app
+    (services/async_reads.py) drives the returned stream on its event loop
+    instead, woken by notify.
+    
+    Returns:
+        tuple: (response, TaskStream, or None when the feed is disabled)
+    """
+    if not task_events.enabled:
+        return (jsonify({'message': 'The task change feed is disabled'}), 404), None
+    
+    # Resolved now: the body runs after the request context is gone, so a
+    # long-lived stream does not count as a request in flight
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    stream = TaskStream(task_events, get_jwt_identity(), get_jwt().get('role', 'user') == 'admin',
+                        last_event_id, notify)
+    
+    response = Response(
+        iter(stream),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    return response, stream
+
 @tasks_bp.route('/<int:task_id>', methods=['GET'])
+@query_budget(2)
 @jwt_required()
 def get_task(task_id):
     """Get a specific task by ID."""
+    return read_task(db, task_id)
+
+def read_task(db: SQLAlchemy, task_id):
+    """Respond to GET /api/tasks/<task_id> using db.session; see list_tasks()."""
     try:
-        task = Task.query.get(task_id)
+        claims = get_jwt()
+        user_role = claims.get('role', 'user')
+        current_user_id = get_jwt_identity()
+        
+        # Conditional GET: check the validators with a narrow lookup before loading the full row
+        if request.if_none_match or request.if_modified_since:
+            row = db.session.query(Task.user_id, Task.updated_at).filter(Task.id == task_id).first()
+            if row and (user_role == 'admin' or row.user_id == current_user_id):
+                etag = task_etag(task_id, row.updated_at)
+                if is_not_modified(etag, row.updated_at):
+                    return not_modified_response(etag, row.updated_at)
+        
+        task = db.session.get(Task, task_id)
         
         if not task:
             return jsonify({'message': 'Task not found'}), 404
         
         # Check if user has permission to view this task
-        claims = get_jwt()
-        user_role = claims.get('role', 'user')
-        current_user_id = get_jwt_identity()
-        
         if user_role != 'admin' and task.user_id != current_user_id:
             return jsonify({'message': 'Access denied'}), 403
         
-        return jsonify({'task': task.to_dict()}), 200
+        response = jsonify({'task': task.to_dict()})
+        return set_validators(response, task_etag(task.id, task.updated_at), task.updated_at), 200
         
     except Exception as e:
         return jsonify({'message': 'Failed to retrieve task', 'error': str(e)}), 500
 
-@tasks_bp.route('/', methods=['POST'])
+@tasks_bp.route('/', methods=['POST'], strict_slashes=False)
+@query_budget(5)
 @jwt_required()
 def create_task():
     """Create a new task."""
@@ -137,37 +363,38 @@ def create_task():
         if not is_valid:
             return jsonify({'message': error_message}), 400
         
-        # Create new task
-        task = Task(
-            title=data['title'],
-            description=data.get('description', ''),
-            status=data.get('status', 'pending'),
-            priority=data.get('priority', 'medium'),
-            user_id=get_jwt_identity()  # Assign to current user
-        )
-        
-        # Set due_date if provided
-        if 'due_date' in data and data['due_date']:
-            task.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
+        # Create new task, assigned to the current user
+        task = build_task(data, get_jwt_identity())
         
         db.session.add(task)
+        # Flushed first so created_at is set for the trend rollup
+        db.session.flush()
+        record_task_change(db, after=task_counter_key(task))
+        record_trend_change(db, after=task_trend_key(task))
         db.session.commit()
+        analytics_cache.invalidate_user(task.user_id)
+        task_data = task.to_dict()
+        task_events.publish('task.created', task_data, task.user_id)
         
-        return jsonify({
+        response = jsonify({
             'message': 'Task created successfully',
-            'task': task.to_dict()
-        }), 201
+            'task': task_data
+        })
+        return set_validators(response, task_etag(task.id, task.updated_at), task.updated_at), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Failed to create task', 'error': str(e)}), 500
 
 @tasks_bp.route('/<int:task_id>', methods=['PUT'])
+@query_budget(7)
 @jwt_required()
 def update_task(task_id):
     """Update a specific task."""
     try:
-        task = Task.query.get(task_id)
+        # Lock the row: the version check, the write and the counter deltas must see the same state,
+        # or two concurrent updates would both apply their deltas
+        task = db.session.get(Task, task_id, with_for_update=True)
         
         if not task:
             return jsonify({'message': 'Task not found'}), 404
@@ -180,6 +407,10 @@ def update_task(task_id):
         if user_role != 'admin' and task.user_id != current_user_id:
             return jsonify({'message': 'Access denied'}), 403
         
+        # Optimistic concurrency: If-Match must name the current version
+        if precondition_failed(task_etag(task.id, task.updated_at)):
+            return jsonify({'message': 'Task has been modified since it was fetched'}), 412
+        
         data = request.get_json()
         
         # Validate data (no required fields for updates)
@@ -187,44 +418,36 @@ def update_task(task_id):
         if not is_valid:
             return jsonify({'message': error_message}), 400
         
-        # Update fields if provided
-        if 'title' in data:
-            task.title = data['title']
-        
-        if 'description' in data:
-            task.description = data['description']
-        
-        if 'status' in data:
-            task.status = data['status']
-        
-        if 'priority' in data:
-            task.priority = data['priority']
-        
-        if 'due_date' in data:
-            if data['due_date']:
-                task.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
-            else:
-                task.due_date = None
-        
-        task.updated_at = datetime.utcnow()
+        counter_key, trend_key = task_counter_key(task), task_trend_key(task)
+        apply_task_updates(task, data)
+        # Flushed first so the trend rollup sees the new updated_at
+        db.session.flush()
         
+        record_task_change(db, before=counter_key, after=task_counter_key(task))
+        record_trend_change(db, before=trend_key, after=task_trend_key(task))
         db.session.commit()
+        analytics_cache.invalidate_user(task.user_id)
+        task_data = task.to_dict()
+        task_events.publish('task.updated', task_data, task.user_id)
         
-        return jsonify({
+        response = jsonify({
             'message': 'Task updated successfully',
-            'task': task.to_dict()
-        }), 200
+            'task': task_data
+        })
+        return set_validators(response, task_etag(task.id, task.updated_at), task.updated_at), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Failed to update task', 'error': str(e)}), 500
 
 @tasks_bp.route('/<int:task_id>', methods=['DELETE'])
+@query_budget(6)
 @jwt_required()
 def delete_task(task_id):
     """Delete a specific task."""
     try:
-        task = Task.query.get(task_id)
+        # Lock the row so a concurrent delete waits, then finds nothing, instead of decrementing the counters twice
+        task = db.session.get(Task, task_id, with_for_update=True)
         
         if not task:
             return jsonify({'message': 'Task not found'}), 404
@@ -237,8 +460,20 @@ def delete_task(task_id):
         if user_role != 'admin' and task.user_id != current_user_id:
             return jsonify({'message': 'Access denied'}), 403
         
+        # Optimistic concurrency: If-Match must name the current version
+        if precondition_failed(task_etag(task.id, task.updated_at)):
+            return jsonify({'message': 'Task has been modified since it was fetched'}), 412
+        
+        owner_id = task.user_id
+        counter_key, trend_key = task_counter_key(task), task_trend_key(task)
+        
         db.session.delete(task)
+        record_task_change(db, before=counter_key)
+        record_trend_change(db, before=trend_key)
+        record_task_deletions(db, [(task_id, owner_id)])
         db.session.commit()
+        analytics_cache.invalidate_user(owner_id)
+        task_events.publish('task.deleted', {'id': task_id}, owner_id)
         
         return jsonify({'message': 'Task deleted successfully'}), 200
         
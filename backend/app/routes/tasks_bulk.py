@@ -0,0 +1,294 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from models.task import Task, db
+from routes.tasks import validate_task_data, build_task, apply_task_updates
+from services.task_counters import record_task_changes, task_counter_key
+from services.task_trends import record_trend_changes, task_trend_key, trend_key
+from services.query_budget import query_budget
+from services.cache import analytics_cache
+from services.task_events import task_events
+from services.task_sync import record_task_deletions
+from sqlalchemy import delete, insert
+from datetime import datetime
+
+tasks_bulk_bp = Blueprint('tasks_bulk', __name__)
+
+BULK_MODES = ('atomic', 'partial')
+
+def parse_bulk_request(field):
+    """
+    Read a bulk request body of the form {"<field>": [...], "mode": "atomic|partial"}.
+
+    Returns:
+        tuple: (items, mode, error_response) where error_response is None if valid
+    """
+    data = request.get_json(silent=True)
+
+    if not isinstance(data, dict) or not isinstance(data.get(field), list) or not data[field]:
+        return None, None, (jsonify({'message': f'{field} must be a non-empty list'}), 400)
+
+    mode = data.get('mode', 'atomic')
+    if mode not in BULK_MODES:
+        return None, None, (jsonify({'message': 'Invalid mode. Must be atomic or partial'}), 400)
+
+    max_items = current_app.config['BULK_MAX_ITEMS']
+    if len(data[field]) > max_items:
+        return None, None, (jsonify({'message': f'Too many items. Maximum is {max_items} per request'}), 400)
+
+    return data[field], mode, None
+
+def item_error(index, status, message):
+    """Per-item failure result."""
+    return {'index': index, 'ok': False, 'status': status, 'message': message}
+
+def item_success(index, status, task_id):
+    """Per-item success result."""
+    return {'index': index, 'ok': True, 'status': status, 'id': task_id}
+
+def bulk_response(action, results, success_status):
+    """Build the response for a bulk request that was (at least partly) applied."""
+    failed = sum(1 for result in results if not result['ok'])
+
+    return jsonify({
+        'message': f'{len(results) - failed} task(s) {action}, {failed} failed',
+        'results': results,
+        'succeeded': len(results) - failed,
+        'failed': failed
+    }), (207 if failed else success_status)
+
+def rejected_response(action, errors):
+    """Build the response for an atomic bulk request that was rejected."""
+    return jsonify({
+        'message': f'No tasks were {action}; {len(errors)} item(s) failed',
+        'results': errors,
+        'succeeded': 0,
+        'failed': len(errors)
+    }), 400
+
+def check_task_access(tasks, index, task_id, seen):
+    """Return an error result if task_id can't be modified by the caller, else None."""
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        return item_error(index, 400, 'id must be an integer')
+
+    if task_id in seen:
+        return item_error(index, 400, 'Duplicate id')
+    seen.add(task_id)
+
+    task = tasks.get(task_id)
+    if not task:
+        return item_error(index, 404, 'Task not found')
+
+    claims = get_jwt()
+    if claims.get('role', 'user') != 'admin' and task.user_id != get_jwt_identity():
+        return item_error(index, 403, 'Access denied')
+
+    return None
+
+@tasks_bulk_bp.route('', methods=['POST'])
+@query_budget(4)
+@jwt_required()
+def bulk_create_tasks():
+    """Create many tasks in one transaction."""
+    items, mode, error_response = parse_bulk_request('tasks')
+    if error_response:
+        return error_response
+
+    try:
+        current_user_id = get_jwt_identity()
+        results = [None] * len(items)
+        new_tasks = []
+
+        # Validate every item before writing anything
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = item_error(index, 400, 'Item must be an object')
+                continue
+
+            is_valid, error_message = validate_task_data(item)
+            if not is_valid:
+                results[index] = item_error(index, 400, error_message)
+                continue
+
+            new_tasks.append((index, build_task(item, current_user_id)))
+
+        errors = [result for result in results if result]
+        if errors and mode == 'atomic':
+            return rejected_response('created', errors)
+
+        if new_tasks:
+            # Batched multi-row INSERT ... RETURNING id
+            now = datetime.utcnow()
+            rows = [
+                {
+                    'title': task.title,
+                    'description': task.description,
+                    'status': task.status,
+                    'priority': task.priority,
+                    'due_date': task.due_date,
+                    'user_id': task.user_id,
+                    'created_at': now,
+                    'updated_at': now
+                }
+                for _, task in new_tasks
+            ]
+            if db.session.get_bind().dialect.name == 'postgresql':
+                # Returned in row order whatever order concurrent inserts draw sequence values in
+                ids = db.session.execute(insert(Task).returning(Task.id, sort_by_parameter_order=True),
+                                         rows).scalars().all()
+            else:
+                # SQLite holds its write lock for the whole transaction, so the rowids of these rows
+                # are ascending in row order and sorting maps them back to items (cheaper than
+                # sort_by_parameter_order, which falls back to row-at-a-time on SQLite)
+                ids = sorted(db.session.execute(insert(Task).returning(Task.id), rows).scalars().all())
+            record_task_changes(db, [(None, task_counter_key(task)) for _, task in new_tasks])
+            record_trend_changes(db, [(None, trend_key(task.user_id, task.status, now, now, task.due_date))
+                                      for _, task in new_tasks])
+
+            for (index, task), task_id in zip(new_tasks, ids):
+                task.id, task.created_at, task.updated_at = task_id, now, now
+                results[index] = item_success(index, 201, task_id)
+
+        db.session.commit()
+        if new_tasks:
+            analytics_cache.invalidate_user(current_user_id)
+        for _, task in new_tasks:
+            task_events.publish('task.created', task.to_dict(), task.user_id)
+
+        return bulk_response('created', results, 201)
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Failed to create tasks', 'error': str(e)}), 500
+
+@tasks_bulk_bp.route('', methods=['PUT'])
+@query_budget(6)
+@jwt_required()
+def bulk_update_tasks():
+    """Update many tasks in one transaction; each item is {"id": ..., <fields>}."""
+    items, mode, error_response = parse_bulk_request('tasks')
+    if error_response:
+        return error_response
+
+    try:
+        # Load and lock every targeted task with a single IN query, so concurrent writes to the
+        # same tasks cannot both apply their counter deltas; in id order so they lock alike
+        ids = [item.get('id') for item in items if isinstance(item, dict)]
+        ids = [task_id for task_id in ids if isinstance(task_id, int)]
+        tasks = {task.id: task for task in Task.query.filter(Task.id.in_(ids))
+                 .order_by(Task.id).with_for_update().all()} if ids else {}
+
+        results = [None] * len(items)
+        updates = []
+        seen = set()
+
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = item_error(index, 400, 'Item must be an object')
+                continue
+
+            error = check_task_access(tasks, index, item.get('id'), seen)
+            if error:
+                results[index] = error
+                continue
+
+            data = {key: value for key, value in item.items() if key != 'id'}
+            is_valid, error_message = validate_task_data(data, required_fields=[])
+            if not is_valid:
+                results[index] = item_error(index, 400, error_message)
+                continue
+
+            updates.append((index, tasks[item['id']], data))
+
+        errors = [result for result in results if result]
+        if errors and mode == 'atomic':
+            return rejected_response('updated', errors)
+
+        changes = []
+        trend_keys = []
+        owners = set()
+        for index, task, data in updates:
+            before = task_counter_key(task)
+            trend_keys.append(task_trend_key(task))
+            apply_task_updates(task, data)
+            changes.append((before, task_counter_key(task)))
+            owners.add(task.user_id)
+            results[index] = item_success(index, 200, task.id)
+
+        record_task_changes(db, changes)
+        # Flushed first so the events and the trend rollup get the new updated_at without reloading each task
+        db.session.flush()
+        record_trend_changes(db, [(before, task_trend_key(task)) for before, (_, task, _) in zip(trend_keys, updates)])
+        updated = [task.to_dict() for _, task, _ in updates]
+        db.session.commit()
+        for owner_id in owners:
+            analytics_cache.invalidate_user(owner_id)
+        for task_data in updated:
+            task_events.publish('task.updated', task_data, task_data['user_id'])
+
+        return bulk_response('updated', results, 200)
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Failed to update tasks', 'error': str(e)}), 500
+
+@tasks_bulk_bp.route('', methods=['DELETE'])
+@query_budget(6)
+@jwt_required()
+def bulk_delete_tasks():
+    """Delete many tasks in one transaction; the body is {"ids": [...]}."""
+    ids, mode, error_response = parse_bulk_request('ids')
+    if error_response:
+        return error_response
+
+    try:
+        # Only the columns needed for ownership, counters and trends, in a single IN query; locked
+        # in id order so a concurrent delete waits, then finds nothing, instead of decrementing twice
+        valid_ids = [task_id for task_id in ids if isinstance(task_id, int)]
+        rows = db.session.query(Task.id, Task.user_id, Task.status, Task.priority,
+                                Task.created_at, Task.updated_at, Task.due_date) \
+            .filter(Task.id.in_(valid_ids)).order_by(Task.id).with_for_update().all() if valid_ids else []
+        tasks = {row.id: row for row in rows}
+
+        results = [None] * len(ids)
+        deletions = []
+        seen = set()
+
+        for index, task_id in enumerate(ids):
+            error = check_task_access(tasks, index, task_id, seen)
+            if error:
+                results[index] = error
+                continue
+
+            deletions.append((index, tasks[task_id]))
+
+        errors = [result for result in results if result]
+        if errors and mode == 'atomic':
+            return rejected_response('deleted', errors)
+
+        if deletions:
+            db.session.execute(
+                delete(Task).where(Task.id.in_([task.id for _, task in deletions])),
+                execution_options={'synchronize_session': False}
+            )
+            record_task_changes(db, [(task_counter_key(task), None) for _, task in deletions])
+            record_trend_changes(db, [(task_trend_key(task), None) for _, task in deletions])
+            record_task_deletions(db, [(task.id, task.user_id) for _, task in deletions])
+
+        for index, task in deletions:
+            results[index] = item_success(index, 200, task.id)
+
+        db.session.commit()
+        for owner_id in {task.user_id for _, task in deletions}:
+            analytics_cache.invalidate_user(owner_id)
+        for _, task in deletions:
+            task_events.publish('task.deleted', {'id': task.id}, task.user_id)
+
+        return bulk_response('deleted', results, 200)
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Failed to delete tasks', 'error': str(e)}), 500
@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import json
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.task import db
+from services.query_budget import query_budget, budget_chunks
+from services.task_import import IMPORT_FORMATS, IMPORT_READERS, import_tasks
+
+tasks_import_bp = Blueprint('tasks_import', __name__)
+
+# Read-ahead for the request body; the raw WSGI stream reads lines a byte at a time
+READ_BUFFER_SIZE = 64 * 1024
+
+# Statements per committed batch: rows, counters and the two trend rollups
+IMPORT_BATCH_QUERIES = 4
+
+class RawRequestStream(io.RawIOBase):
+    """
+    Raw I/O view of the WSGI input, for io.BufferedReader.
+
+    Werkzeug's LimitedStream is already raw I/O, but servers that mark
+    their input as terminated (gunicorn) hand over their own stream
+    object, which BufferedReader cannot wrap.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+@tasks_import_bp.route('', methods=['POST'])
+@query_budget(0)
+@jwt_required()
+def import_tasks_upload():
+    """Import tasks for the current user from an NDJSON or CSV request body."""
+    import_format = request.args.get('format', 'ndjson')
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({'message': 'Invalid format. Must be ndjson or csv'}), 400
+    
+    current_user_id = get_jwt_identity()
+    batch_size = current_app.config['IMPORT_BATCH_SIZE']
+    
+    def generate():
+        # The body is parsed line by line as it is read, and one NDJSON event
+        # is written back per skipped line and per committed batch
+        body = io.BufferedReader(RawRequestStream(request.stream), READ_BUFFER_SIZE)
+        records = IMPORT_READERS[import_format](body)
+        for event in import_tasks(db, records, current_user_id, batch_size):
+            yield json.dumps(event) + '\n'
+    
+    body = budget_chunks(generate(), IMPORT_BATCH_QUERIES, label='routes.tasks_import.import_tasks_upload batch')
+    
+    return Response(stream_with_context(body), mimetype='application/x-ndjson')
@@ -5,20 +5,40 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from flask_sqlalchemy import SQLAlchemy
 from models.task import Task
 from models.user import User
+from services.task_counters import get_counter_rows
 from sqlalchemy import func
 from datetime import datetime, timedelta
 
-def get_task_statistics(db: SQLAlchemy):
+def get_grouped_task_counts(db: SQLAlchemy, user_id: int = None):
     """
-    Get overall task statistics.
+    Count tasks grouped by status and priority in a single query.
+    
+    Every statistic in this module is derived from these counts. They are
+    read from the incrementally maintained task_counters table, so the
+    cost depends on the number of (status, priority) groups rather than
+    on the number of tasks.
     
+    Args:
+        db (SQLAlchemy): Database instance
+        user_id (int): Restrict the counts to this user's tasks (optional)
+        
     Returns:
-        dict: Statistics including total tasks, completed tasks, pending tasks, etc.
+        list: (status, priority, count) rows
     """
-    total_tasks = db.session.query(func.count(Task.id)).scalar()
-    completed_tasks = db.session.query(func.count(Task.id)).filter(Task.status == 'completed').scalar()
-    pending_tasks = db.session.query(func.count(Task.id)).filter(Task.status == 'pending').scalar()
-    in_progress_tasks = db.session.query(func.count(Task.id)).filter(Task.status == 'in_progress').scalar()
+    return get_counter_rows(db, user_id)
+
+def _sum_by(grouped_counts, index):
+    """Sum grouped counts by the status (index 0) or priority (index 1) column."""
+    totals = {}
+    for row in grouped_counts:
+        totals[row[index]] = totals.get(row[index], 0) + row[2]
+    return totals
+
+def _build_statistics(grouped_counts):
+    """Fold grouped (status, priority, count) rows into the statistics dict."""
+    by_status = _sum_by(grouped_counts, 0)
+    total_tasks = sum(by_status.values())
+    completed_tasks = by_status.get('completed', 0)
     
     # Calculate completion percentage
     completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
@@ -26,11 +46,20 @@ def get_task_statistics(db: SQLAlchemy):
     return {
         'total_tasks': total_tasks,
         'completed_tasks': completed_tasks,
-        'pending_tasks': pending_tasks,
-        'in_progress_tasks': in_progress_tasks,
+        'pending_tasks': by_status.get('pending', 0),
+        'in_progress_tasks': by_status.get('in_progress', 0),
         'completion_rate': round(completion_rate, 2)
     }
 
+def get_task_statistics(db: SQLAlchemy):
+    """
+    Get overall task statistics.
+    
+    Returns:
+        dict: Statistics including total tasks, completed tasks, pending tasks, etc.
+    """
+    return _build_statistics(get_grouped_task_counts(db))
+
 def get_user_task_statistics(db: SQLAlchemy, user_id: int):
     """
     Get task statistics for a specific user.
@@ -42,30 +71,9 @@ def get_user_task_statistics(db: SQLAlchemy, user_id: int):
     Returns:
         dict: User-specific task statistics
     """
-    total_tasks = db.session.query(func.count(Task.id)).filter(Task.user_id == user_id).scalar()
-    completed_tasks = db.session.query(func.count(Task.id)).filter(
-        Task.user_id == user_id, 
-        Task.status == 'completed'
-    ).scalar()
-    pending_tasks = db.session.query(func.count(Task.id)).filter(
-        Task.user_id == user_id, 
-        Task.status == 'pending'
-    ).scalar()
-    in_progress_tasks = db.session.query(func.count(Task.id)).filter(
-        Task.user_id == user_id, 
-        Task.status == 'in_progress'
-    ).scalar()
-    
-    # Calculate completion percentage
-    completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-    
     return {
         'user_id': user_id,
-        'total_tasks': total_tasks,
-        'completed_tasks': completed_tasks,
-        'pending_tasks': pending_tasks,
-        'in_progress_tasks': in_progress_tasks,
-        'completion_rate': round(completion_rate, 2)
+        **_build_statistics(get_grouped_task_counts(db, user_id))
     }
 
 def get_tasks_by_priority(db: SQLAlchemy):
@@ -75,12 +83,7 @@ def get_tasks_by_priority(db: SQLAlchemy):
     Returns:
         dict: Task counts by priority level
     """
-    priority_counts = db.session.query(
-        Task.priority, 
-        func.count(Task.id)
-    ).group_by(Task.priority).all()
-    
-    return {priority: count for priority, count in priority_counts}
+    return _sum_by(get_grouped_task_counts(db), 1)
 
 def get_tasks_by_status(db: SQLAlchemy):
     """
@@ -89,9 +92,27 @@ def get_tasks_by_status(db: SQLAlchemy):
     Returns:
         dict: Task counts by status
     """
-    status_counts = db.session.query(
-        Task.status, 
-        func.count(Task.id)
-    ).group_by(Task.status).all()
+    return _sum_by(get_grouped_task_counts(db), 0)
+
+def get_task_summary(db: SQLAlchemy, user_id: int = None):
+    """
+    Get statistics, priority and status breakdowns in one round-trip.
     
-    return {status: count for status, count in status_counts}
\ No newline at end of file
+    Args:
+        db (SQLAlchemy): Database instance
+        user_id (int): Restrict the summary to this user's tasks (optional)
+        
+    Returns:
+        dict: Combined statistics, priority_stats and status_stats
+    """
+    grouped_counts = get_grouped_task_counts(db, user_id)
+    statistics = _build_statistics(grouped_counts)
+    
+    if user_id is not None:
+        statistics = {'user_id': user_id, **statistics}
+    
+    return {
+        'statistics': statistics,
+        'priority_stats': _sum_by(grouped_counts, 1),
+        'status_stats': _sum_by(grouped_counts, 0)
+    }
@@ -0,0 +1,396 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import contextvars
+import functools
+import io
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from flask import request
+from flask_jwt_extended import verify_jwt_in_request
+from flask_sqlalchemy.query import Query
+from sqlalchemy.engine import make_url
+from werkzeug.exceptions import HTTPException
+from routes.tasks import list_tasks, read_task, read_changes, open_stream
+from routes.analytics import read_statistics, read_priority_stats, read_status_stats, read_summary, read_trends
+from services.db_pool import (InstrumentedAsyncQueuePool, engine_pool_metrics, install_sqlite_pragmas,
+                              pool_options, _is_memory_sqlite)
+from services.query_budget import assert_max_queries, budget_enforced
+
+# Served on the event loop, by Flask endpoint; every other route runs on the sync app
+ASYNC_VIEWS = {
+    'tasks.get_tasks': list_tasks,
+    'tasks.get_task': read_task,
+    'tasks.get_changes': read_changes,
+    'analytics.task_statistics': read_statistics,
+    'analytics.tasks_by_priority': read_priority_stats,
+    'analytics.tasks_by_status': read_status_stats,
+    'analytics.task_summary': read_summary,
+    'analytics.task_trends': read_trends
+}
+
+# Long-lived responses driven on the event loop, so an open stream holds no thread
+STREAM_ENDPOINTS = {'tasks.stream_tasks'}
+
+# asyncio drivers used when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg'}
+
+# Request bodies for the sync routes are buffered in memory up to this size, then in a temporary file
+MAX_MEMORY_BODY = 1024 * 1024
+
+def async_database_url(config, url):
+    """ASYNC_DATABASE_URL, or the sync engine's URL with its backend's asyncio driver."""
+    if config.get('ASYNC_DATABASE_URL'):
+        return config['ASYNC_DATABASE_URL']
+
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No asyncio driver known for {backend} databases; set ASYNC_DATABASE_URL')
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}').render_as_string(hide_password=False)
+
+def build_environ(scope, body=None):
+    """WSGI environ for an ASGI HTTP request, as the Flask app sees it under gunicorn."""
+    script_name = scope.get('root_path', '').encode('utf-8').decode('latin-1')
+    path_info = scope['path'].encode('utf-8').decode('latin-1')
+    if script_name and path_info.startswith(script_name):
+        path_info = path_info[len(script_name):]
+
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body if body is not None else io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+        value = value.decode('latin-1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+    return environ
+
+def _encode_headers(headers):
+    return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+class SessionDB:
+    """
+    Stand-in for the Flask-SQLAlchemy extension around one session.
+
+    The shared read functions (and the services they call) only use
+    db.session, so they run unchanged on the sync facade of an
+    AsyncSession inside AsyncSession.run_sync().
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+class AsyncReadApp:
+    """
+    ASGI application serving the read-heavy routes from an event loop.
+
+    GET /api/tasks, GET /api/tasks/<id>, GET /api/tasks/changes and the
+    analytics summaries run as coroutines whose queries go through an
+    asyncio driver (aiosqlite or asyncpg) on an AsyncSession, so a
+    request waiting on the database holds no thread and one process keeps
+    many of them in flight. Their bodies are the sync functions from
+    routes/ (list_tasks, read_task, read_*) run inside
+    AsyncSession.run_sync(): filtering, ownership, conditional GET and
+    serialization are the same code on both paths.
+    The Flask request context, the before/after request hooks (profiling,
+    admission control, revocation refresh) and JWT verification apply as
+    for any other request. The before_request hooks and JWT verification
+    can block (a revocation lookup, a rate limit in Redis), so they run on
+    the sync threads in the request's context; the loop only awaits them.
+
+    GET /api/tasks/stream is authenticated the same way, then its events
+    are awaited on the loop: an open change feed holds no thread.
+
+    Every other route goes to the Flask app on ASYNC_SYNC_THREADS
+    threads, one request per thread as under gunicorn. Serve with an ASGI
+    server (see asgi.py); wsgi.py keeps serving everything synchronously.
+
+    Requires SQLAlchemy's asyncio extra (greenlet) and aiosqlite or asyncpg;
+    see requirements-async.txt.
+    """
+
+    def __init__(self, flask_app):
+        config = flask_app.config
+        with flask_app.app_context():
+            # The engine's URL, where Flask-SQLAlchemy has resolved relative SQLite paths
+            url = async_database_url(config, flask_app.extensions['sqlalchemy'].engine.url)
+        if _is_memory_sqlite(url):
+            raise RuntimeError('The async read path needs a database file or server; in-memory SQLite is private to one engine')
+
+        try:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+            self.engine = create_async_engine(url, **pool_options(config, url, InstrumentedAsyncQueuePool))
+        except ImportError as e:
+            raise RuntimeError(f"The async read path requires SQLAlchemy's asyncio extra and aiosqlite or asyncpg; see requirements-async.txt ({e})")
+
+        install_sqlite_pragmas(self.engine.sync_engine, config)
+        # flask_sqlalchemy's Query, as on db.session, so the shared views can paginate()
+        self.sessionmaker = async_sessionmaker(self.engine, query_cls=Query)
+        self.flask_app = flask_app
+        self._executor = ThreadPoolExecutor(max_workers=config.get('ASYNC_SYNC_THREADS', 8),
+                                            thread_name_prefix='asgi-sync')
+
+        profiler = flask_app.extensions.get('request_profiler')
+        if profiler is not None and profiler.enabled:
+            profiler.instrument_engine(self.engine.sync_engine)
+        flask_app.extensions['async_reads'] = self
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']!r}")
+
+        environ = build_environ(scope)
+        endpoint = self._async_endpoint(environ)
+        if endpoint in STREAM_ENDPOINTS:
+            await self._call_stream(environ, receive, send)
+        elif endpoint in ASYNC_VIEWS:
+            await self._call_async(ASYNC_VIEWS[endpoint], environ, send)
+        else:
+            await self._call_sync(environ, receive, send)
+
+    def _async_endpoint(self, environ):
+        if environ['REQUEST_METHOD'] != 'GET':
+            return None
+        try:
+            endpoint, _ = self.flask_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            # Not found, wrong method or a redirect: let Flask answer as usual
+            return None
+        return endpoint
+
+    # Async path
+
+    async def _call_async(self, view, environ, send):
+        """Flask.wsgi_app() for a view awaited on the event loop."""
+        app = self.flask_app
+        ctx = app.request_context(environ)
+        error = None
+        try:
+            try:
+                ctx.push()
+                response = await self._full_dispatch(view)
+            except Exception as e:
+                error = e
+                response = app.handle_exception(e)
+            body = b''.join(response.get_app_iter(environ))
+            status, headers = response.status_code, response.get_wsgi_headers(environ)
+            response.close()
+        finally:
+            ctx.pop(error)
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': _encode_headers(headers.items())})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _full_dispatch(self, view):
+        app = self.flask_app
+        try:
+            response = await self._in_thread(self._authenticate)
+            if response is None:
+                response = await self._run_view(view, request.view_args)
+        except Exception as e:
+            response = app.handle_user_exception(e)
+        return app.finalize_request(response)
+
+    async def _in_thread(self, func, *args):
+        """Run a blocking step of the current request on the sync threads, in the request's context."""
+        call = functools.partial(contextvars.copy_context().run, func, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    def _authenticate(self):
+        """The before_request hooks, then JWT verification; a response if a hook answered the request."""
+        response = self.flask_app.preprocess_request()
+        if response is not None:
+            return response
+
+        # cProfile follows one thread and the view runs on the loop, so a sampled profile would be empty
+        profiler = self.flask_app.extensions.get('request_profiler')
+        if profiler is not None:
+            profiler.discard_cprofile()
+        verify_jwt_in_request()
+        return None
+
+    async def _run_view(self, view, view_args):
+        async with self.sessionmaker() as session:
+            def run(sync_session):
+                return view(SessionDB(sync_session), **view_args)
+
+            if not budget_enforced(self.flask_app):
+                return await session.run_sync(run)
+
+            # The sync view's @query_budget, counting this request's statements on the async engine
+            max_queries = self.flask_app.view_functions[request.endpoint].query_budget
+            with assert_max_queries(self.engine.sync_engine, max_queries, label=f'{view.__module__}.{view.__name__} (async)'):
+                return await session.run_sync(run)
+
+    # Change feed
+
+    async def _call_stream(self, environ, receive, send):
+        """GET /api/tasks/stream: authenticate as for any request, then wait for events on the loop."""
+        app = self.flask_app
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        stream = None
+        ctx = app.request_context(environ)
+        error = None
+        try:
+            try:
+                ctx.push()
+                response = await self._in_thread(self._authenticate)
+                if response is None:
+                    # Subscribing may reach the event backend (the Redis reader's first start)
+                    response, stream = await self._in_thread(
+                        open_stream, lambda: loop.call_soon_threadsafe(ready.set))
+            except Exception as e:
+                response = app.handle_user_exception(e)
+            try:
+                response = app.finalize_request(response)
+            except Exception as e:
+                error = e
+                stream = None
+                response = app.handle_exception(e)
+            status, headers = response.status_code, response.get_wsgi_headers(environ)
+            # The stream's blocking body is replaced below; anything else (an error) is sent as is
+            body = b'' if stream is not None else b''.join(response.get_app_iter(environ))
+            response.close()
+        finally:
+            # Popped before streaming, so teardown (e.g. the in-flight count) does not wait for the client
+            ctx.pop(error)
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': _encode_headers(headers.items())})
+        if stream is None:
+            await send({'type': 'http.response.body', 'body': body})
+            return
+        await self._send_stream(stream, ready, receive, send)
+
+    async def _send_stream(self, stream, ready, receive, send):
+        async def chunk(text):
+            await send({'type': 'http.response.body', 'body': text.encode(), 'more_body': True})
+
+        async def disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        disconnected = asyncio.ensure_future(disconnect())
+        try:
+            await chunk(stream.opening())
+            subscription = stream.subscription
+            while not subscription.overflowed:
+                ready.clear()
+                events = subscription.drain()
+                if events:
+                    await chunk(stream.take(events))
+                    continue
+
+                woken = asyncio.ensure_future(ready.wait())
+                done, _ = await asyncio.wait({woken, disconnected}, timeout=stream.broker.heartbeat,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                woken.cancel()
+                if disconnected in done:
+                    return
+                if not done:
+                    await chunk(': keep-alive\n\n')
+
+            # Overflowed: send what was buffered and end, so the client resumes from the log
+            await chunk(stream.take(subscription.drain()))
+            await send({'type': 'http.response.body'})
+        finally:
+            disconnected.cancel()
+            stream.close()
+
+    # Sync path
+
+    async def _call_sync(self, environ, receive, send):
+        """Run the Flask app for one request on the thread pool, streaming its response back."""
+        with SpooledTemporaryFile(max_size=MAX_MEMORY_BODY) as body:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                body.write(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+            # Buffered, so the length is known even for a chunked request
+            environ['CONTENT_LENGTH'] = str(body.tell())
+            body.seek(0)
+            environ['wsgi.input'] = body
+
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._run_wsgi, environ, send, loop)
+
+    def _run_wsgi(self, environ, send, loop):
+        # The whole request, including a streamed body, stays on this thread (stream_with_context relies on it)
+        start = None
+        started = False
+
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def start_response(status, headers, exc_info=None):
+            nonlocal start
+            if exc_info and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            start = {'type': 'http.response.start', 'status': int(status.split(' ', 1)[0]),
+                     'headers': _encode_headers(headers)}
+            return write
+
+        def write(data):
+            nonlocal started
+            if not started:
+                send_sync(start)
+                started = True
+            if data:
+                send_sync({'type': 'http.response.body', 'body': data, 'more_body': True})
+
+        result = self.flask_app(environ, start_response)
+        try:
+            for chunk in result:
+                write(chunk)
+            write(b'')
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        send_sync({'type': 'http.response.body'})
+
+    # Lifecycle
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.aclose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def aclose(self):
+        """Close the async engine's connections and stop the sync threads."""
+        await self.engine.dispose()
+        self._executor.shutdown(wait=False)
+
+    def pool_metrics(self):
+        """Connection pool metrics for the async engine, as get_pool_metrics() reports the sync one."""
+        return engine_pool_metrics(self.engine.sync_engine)
@@ -0,0 +1,244 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class CacheBackend:
+    """
+    Interface for analytics cache storage.
+
+    The default MemoryCacheBackend is per-process. A shared backend (e.g.
+    Redis) lets every worker see the same entries and invalidations;
+    implement these methods and select it with ANALYTICS_CACHE_BACKEND.
+    """
+
+    def get(self, key):
+        """Return the cached value for key, or _MISSING."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl, prefix=None):
+        """
+        Store value under key for ttl seconds.
+
+        prefix is the one delete_prefix will be called with to drop this key;
+        backends that cannot find keys by prefix cheaply index them under it.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove key, if present."""
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix):
+        """Remove every key starting with prefix."""
+        raise NotImplementedError
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, prefix=None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+
+            # Evict least recently used entries
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache backed by Redis (requires the optional `redis` package).
+
+    Keys are indexed in a set per invalidation prefix (<prefix>__keys__),
+    so invalidating a user's entries after a task write deletes exactly
+    the keys in their set instead of SCANning the whole keyspace.
+    """
+
+    # Set of the index sets, for __len__
+    INDEXES_KEY = 'analytics:__indexes__'
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('ANALYTICS_CACHE_BACKEND=redis requires the redis package')
+
+        import pickle
+        self._pickle = pickle
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._client.get(key)
+        return _MISSING if raw is None else self._pickle.loads(raw)
+
+    @staticmethod
+    def _index_key(prefix):
+        return f'{prefix}__keys__'
+
+    def set(self, key, value, ttl, prefix=None):
+        ttl = max(1, int(ttl))
+        pipe = self._client.pipeline(transaction=False)
+        pipe.set(key, self._pickle.dumps(value), ex=ttl)
+        if prefix is not None:
+            # Every entry shares the TTL, so the index can expire with its newest entry
+            pipe.sadd(self._index_key(prefix), key)
+            pipe.expire(self._index_key(prefix), ttl)
+            pipe.sadd(self.INDEXES_KEY, self._index_key(prefix))
+        pipe.execute()
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def delete_prefix(self, prefix):
+        # Read and drop the index atomically; keys indexed after this go into a fresh set
+        pipe = self._client.pipeline(transaction=True)
+        pipe.smembers(self._index_key(prefix))
+        pipe.delete(self._index_key(prefix))
+        keys, _ = pipe.execute()
+        if keys:
+            self._client.delete(*keys)
+
+    def __len__(self):
+        """Indexed entries, counting expired ones until their prefix is invalidated or its index expires."""
+        indexes = list(self._client.smembers(self.INDEXES_KEY))
+        if not indexes:
+            return 0
+        pipe = self._client.pipeline(transaction=False)
+        for index in indexes:
+            pipe.scard(index)
+        return sum(pipe.execute())
+
+class AnalyticsCache:
+    """
+    Caches analytics results per user (or globally) with invalidation on writes.
+
+    Entries live under `analytics:user:<id>:` for user-scoped results and
+    `analytics:global:` for results that cover every user's tasks. A task
+    write invalidates the owner's entries and all global entries; the TTL
+    bounds staleness for in-process caches on other workers.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 0
+        self._lock = threading.Lock()
+        self._reset_stats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure the backend from ANALYTICS_CACHE_* settings."""
+        backend = app.config.get('ANALYTICS_CACHE_BACKEND', 'memory')
+        self.ttl = app.config.get('ANALYTICS_CACHE_TTL', 10)
+
+        if backend == 'none' or self.ttl <= 0:
+            self.backend = None
+        elif backend == 'redis':
+            self.backend = RedisCacheBackend(app.config['ANALYTICS_CACHE_URL'])
+        else:
+            self.backend = MemoryCacheBackend(app.config.get('ANALYTICS_CACHE_SIZE', 1024))
+
+        self._reset_stats()
+        app.extensions['analytics_cache'] = self
+
+    def _reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _prefix(user_id=None):
+        return 'analytics:global:' if user_id is None else f'analytics:user:{user_id}:'
+
+    def cached(self, name, compute, user_id=None):
+        """
+        Return the cached result of compute(), computing and storing it on a miss.
+
+        Args:
+            name (str): Name of the cached statistic
+            compute (callable): Zero-argument function producing the value
+            user_id (int): Scope the entry to this user, or None for global
+
+        Returns:
+            The cached or freshly computed value
+        """
+        if self.backend is None:
+            return compute()
+
+        key = self._prefix(user_id) + name
+        value = self.backend.get(key)
+
+        if value is not _MISSING:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+
+        value = compute()
+        self.backend.set(key, value, self.ttl, prefix=self._prefix(user_id))
+        return value
+
+    def invalidate_user(self, user_id):
+        """Drop the user's entries and every global entry after a task write."""
+        if self.backend is None:
+            return
+
+        self.backend.delete_prefix(self._prefix(user_id))
+        self.backend.delete_prefix(self._prefix())
+
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self):
+        """
+        Get cache counters for monitoring.
+
+        Returns:
+            dict: Backend name, entry count, hits, misses, invalidations and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'entries': len(self.backend) if self.backend else 0,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0
+        }
+
+analytics_cache = AnalyticsCache()
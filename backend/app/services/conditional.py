@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+from flask import current_app, request
+from models.task import Task
+from sqlalchemy import func
+from werkzeug.http import is_resource_modified
+
+def _stamp(updated_at):
+    return updated_at.strftime('%Y%m%d%H%M%S%f') if updated_at else '0'
+
+def task_etag(task_id, updated_at):
+    """Weak ETag value for one task; changes whenever the task is updated."""
+    return f'task-{task_id}-{_stamp(updated_at)}'
+
+def list_validators(query, scope):
+    """
+    ETag value, Last-Modified and total for a filtered task listing.
+
+    Issues one aggregate query, max(updated_at) and count over the filtered
+    set; for a user's own tasks it is answered from the (user_id, updated_at)
+    index alone. The count catches deletions that leave max(updated_at)
+    unchanged, and is the listing's total, so offset pagination need not
+    count again. scope distinguishes callers and query parameters that
+    share the same filtered set (pages, page sizes, fields).
+
+    Args:
+        query: Filtered task query without ordering applied
+        scope (str): Caller and request parameters the listing depends on
+
+    Returns:
+        tuple: (etag value, last_modified datetime or None, count)
+    """
+    last_modified, count = query.order_by(None).with_entities(func.max(Task.updated_at), func.count(Task.id)).one()
+    digest = hashlib.sha1(f'{scope}|{count}|{_stamp(last_modified)}'.encode()).hexdigest()[:20]
+    return f'tasks-{digest}', last_modified, count
+
+def content_etag(body):
+    """Weak ETag value for a response body, for listings cheaper to build than to aggregate."""
+    return f'tasks-{hashlib.sha1(body).hexdigest()[:20]}'
+
+def request_scope(user_id, role):
+    """Scope string for list_validators from the caller and the query string."""
+    params = '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+    return f'{role}:{user_id}?{params}'
+
+def is_not_modified(etag, last_modified=None):
+    """
+    Whether the request's If-None-Match / If-Modified-Since validators still match.
+
+    If-None-Match takes precedence over If-Modified-Since, with weak comparison.
+    """
+    if not request.if_none_match and not request.if_modified_since:
+        return False
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+def not_modified_response(etag, last_modified=None):
+    """Empty 304 response carrying the current validators."""
+    response = current_app.response_class(status=304)
+    return set_validators(response, etag, last_modified)
+
+def set_validators(response, etag, last_modified=None):
+    """Attach a weak ETag (and Last-Modified if known) to a response."""
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    return response
+
+def precondition_failed(etag):
+    """
+    Whether an If-Match header is present and doesn't match the current ETag.
+
+    Uses weak comparison, since every ETag issued by the API is weak.
+    """
+    return bool(request.if_match) and not request.if_match.contains_weak(etag)
@@ -0,0 +1,160 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait and how often they overflow."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        with self._metrics_lock:
+            self._checkouts = 0
+            self._overflow_checkouts = 0
+            self._timeouts = 0
+            self._wait_total = 0.0
+            self._wait_max = 0.0
+            self._wait_recent = 0.0
+            self._wait_recent_at = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self._timeouts += 1
+                self._wait_recent += (time.perf_counter() - start - self._wait_recent) * 0.2
+                self._wait_recent_at = time.monotonic()
+            raise
+
+        waited = time.perf_counter() - start
+        with self._metrics_lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            # Moving average over roughly the last ten checkouts
+            self._wait_recent += (waited - self._wait_recent) * 0.2
+            self._wait_recent_at = time.monotonic()
+            # Beyond pool_size: this checkout was served by an overflow connection
+            if self.checkedout() > self.size():
+                self._overflow_checkouts += 1
+        return connection
+
+    def recent_wait(self, window=5):
+        """Seconds recent checkouts waited (moving average), or 0 if none happened in the last window seconds."""
+        with self._metrics_lock:
+            if self._wait_recent_at is None or time.monotonic() - self._wait_recent_at > window:
+                return 0.0
+            return self._wait_recent
+
+    def metrics(self):
+        """Current pool state plus counters since the pool was created."""
+        with self._metrics_lock:
+            return {
+                'size': self.size(),
+                'checked_out': self.checkedout(),
+                'checked_in': self.checkedin(),
+                'overflow': max(self.overflow(), 0),
+                'max_overflow': self._max_overflow,
+                'checkouts': self._checkouts,
+                'overflow_checkouts': self._overflow_checkouts,
+                'timeouts': self._timeouts,
+                'wait_ms_avg': round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                'wait_ms_max': round(self._wait_max * 1000, 3)
+            }
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for asyncio engines (see services/async_reads.py)."""
+
+def _is_memory_sqlite(database_uri):
+    url = make_url(database_uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def pool_options(config, database_uri=None, poolclass=InstrumentedQueuePool):
+    """
+    Engine options for the connection pool, from the DB_POOL_* settings.
+
+    In-memory SQLite keeps SQLAlchemy's single-connection pool, so only
+    recycle and pre-ping apply there. database_uri defaults to
+    SQLALCHEMY_DATABASE_URI; asyncio engines need InstrumentedAsyncQueuePool.
+    """
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE']
+    }
+
+    if not _is_memory_sqlite(database_uri or config['SQLALCHEMY_DATABASE_URI']):
+        options.update({
+            'poolclass': poolclass,
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT']
+        })
+
+    return options
+
+def init_db(app, db: SQLAlchemy):
+    """
+    Initialize db for app with the configured pool and, for SQLite files, pragmas.
+
+    Replaces a plain db.init_app(app): engine options must be set before the
+    engine is created. Options already in SQLALCHEMY_ENGINE_OPTIONS win.
+    """
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **pool_options(app.config),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
+    db.init_app(app)
+
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, app.config)
+
+def install_sqlite_pragmas(engine, config):
+    """Apply the SQLITE_* pragmas to every new connection of a SQLite file engine; other engines are left alone."""
+    if engine.dialect.name == 'sqlite' and not _is_memory_sqlite(str(engine.url)):
+        pragmas = {
+            'journal_mode': config['SQLITE_JOURNAL_MODE'],
+            'synchronous': config['SQLITE_SYNCHRONOUS'],
+            'mmap_size': config['SQLITE_MMAP_SIZE']
+        }
+        event.listen(engine, 'connect', lambda dbapi_connection, _: _set_pragmas(dbapi_connection, pragmas))
+
+def _set_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+def get_pool_metrics(db: SQLAlchemy):
+    """
+    Pool metrics for this process's engine.
+
+    Returns:
+        dict: Pool class, a status line and, for instrumented pools, live counters
+    """
+    return engine_pool_metrics(db.engine)
+
+def engine_pool_metrics(engine):
+    """get_pool_metrics for any engine, e.g. the async read path's (pass its sync_engine)."""
+    pool = engine.pool
+    metrics = {
+        'dialect': engine.dialect.name,
+        'pool_class': type(pool).__name__,
+        'status': pool.status()
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        metrics.update(pool.metrics())
+    return metrics
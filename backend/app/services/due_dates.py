@@ -0,0 +1,297 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from flask_sqlalchemy import SQLAlchemy
+from models.task import Task
+from services.serialization import dumps
+from services.task_events import task_events
+
+logger = logging.getLogger(__name__)
+
+# Wait after a failed scan (e.g. the database is unreachable) before trying again
+RETRY_SECONDS = 10
+
+class DueEventSink:
+    """
+    Interface for where reminder and overdue events go.
+
+    LogDueEventSink and FileDueEventSink are built in (DUE_EVENTS_SINK);
+    for anything else (email, push, a queue) implement emit() and assign
+    an instance to due_scheduler.sink.
+    """
+
+    def emit(self, event):
+        """Deliver one event; see DueDateScheduler for its fields."""
+        raise NotImplementedError
+
+class LogDueEventSink(DueEventSink):
+    """Writes each event to this module's logger."""
+
+    def emit(self, event):
+        logger.info('%s: task %s of user %s is due %s', event['type'], event['task_id'], event['user_id'], event['due_date'])
+
+class FileDueEventSink(DueEventSink):
+    """Appends each event to a file as one JSON line."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        line = dumps(event).decode() + '\n'
+        with self._lock, open(self.path, 'a') as events_file:
+            events_file.write(line)
+
+def _utc(value):
+    """Naive UTC datetime from a datetime or an ISO string, as due dates are stored."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class DueDateScheduler:
+    """
+    Fires reminder and overdue events for tasks as their due dates arrive.
+
+    Instead of scanning every task on a timer, the scheduler keeps the
+    tasks due within the next DUE_SCHEDULER_LOOKAHEAD_HOURS in memory,
+    loaded with a range scan of idx_tasks_due_date, and a min-heap of
+    their next fire times; it sleeps until the earliest. Completed tasks
+    and tasks without a due date are skipped. Two events per task:
+
+    - task.reminder, DUE_REMINDER_MINUTES before the due date (0 disables)
+    - task.overdue, at the due date
+
+    Task writes reach it as task events (services/task_events.py), so a
+    new or moved due date is scheduled at once and a completed or deleted
+    task is dropped. The window is rescanned every
+    DUE_SCHEDULER_REFRESH_SECONDS and extended as time passes. Each rescan
+    starts where the previous one did, so writes whose events it did not
+    receive (another process with TASK_EVENTS_BACKEND=memory) are still
+    sent, up to DUE_SCHEDULER_REFRESH_SECONDS late; a reminder whose due
+    date passed in the meantime is skipped.
+
+    Delivery is at least once. On start only tasks due since
+    DUE_SCHEDULER_CATCHUP_MINUTES ago are rescanned, so events missed while
+    it was down are sent if they are that recent, and events sent just
+    before a restart may be sent again; each event's id is stable
+    (<type>:<task id>:<due date>) so sinks can drop repeats.
+
+    Run exactly one scheduler: `flask run-due-scheduler` as its own
+    process, or DUE_SCHEDULER_ENABLED=true with a single web worker.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.app = None
+        self.db = None
+        self.sink = None
+        self.clock = datetime.utcnow
+        self._wake = threading.Condition()
+        self._thread = None
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db: SQLAlchemy):
+        """Configure from the DUE_* settings; with DUE_SCHEDULER_ENABLED, start on the first request."""
+        self.app = app
+        self.db = db
+        self.reminder_lead = timedelta(minutes=app.config.get('DUE_REMINDER_MINUTES', 60))
+        self.lookahead = timedelta(hours=app.config.get('DUE_SCHEDULER_LOOKAHEAD_HOURS', 24))
+        self.catchup = timedelta(minutes=app.config.get('DUE_SCHEDULER_CATCHUP_MINUTES', 60))
+        self.refresh_interval = timedelta(seconds=app.config.get('DUE_SCHEDULER_REFRESH_SECONDS', 300))
+
+        if app.config.get('DUE_EVENTS_SINK', 'log') == 'file':
+            self.sink = FileDueEventSink(app.config.get('DUE_EVENTS_FILE', 'due_events.ndjson'))
+        else:
+            self.sink = LogDueEventSink()
+
+        self._reset()
+        if app.config.get('DUE_SCHEDULER_ENABLED') and app.extensions.get('due_scheduler') is not self:
+            # Not at import: with gunicorn's preload_app a thread started here would stay in the master
+            app.before_request(self._start_once)
+        app.extensions['due_scheduler'] = self
+
+    def _reset(self):
+        with self._wake:
+            self._tasks = {}  # task id -> (due_date, user_id, title), for tasks due before _loaded_until
+            self._heap = []  # (fire_at, event id, task id, type, due_date); stale entries are skipped when popped
+            self._fired = {}  # event id -> due_date, so rescans and repeated writes do not fire twice
+            self._loaded_until = None
+            self._last_refresh = None  # when the last scan ran; the next one starts there
+            self._next_refresh = None
+            self._scanning = None  # task id -> state for events received during a scan
+            self._woken = False
+            self._stopping = False
+
+    # Lifecycle
+
+    def start(self):
+        """Run the scheduler on a background thread."""
+        if self._thread is None:
+            task_events.add_listener(self.on_task_event)
+            self._thread = threading.Thread(target=self.run, name='due-scheduler', daemon=True)
+            self._thread.start()
+
+    def _start_once(self):
+        if self._thread is None:
+            self.start()
+
+    def run(self):
+        """Load the window, then fire events as they fall due until stop() (blocks)."""
+        while True:
+            try:
+                timeout = self.tick()
+            except Exception:
+                logger.exception('Due date scheduler failed; retrying in %ss', RETRY_SECONDS)
+                timeout = RETRY_SECONDS
+            with self._wake:
+                if self._stopping:
+                    return
+                if not self._woken:
+                    self._wake.wait(timeout)
+                self._woken = False
+
+    def stop(self):
+        with self._wake:
+            self._stopping = True
+            self._wake.notify()
+
+    # Scheduling
+
+    def tick(self):
+        """
+        Extend or rescan the window when due, then emit every event whose time has come.
+
+        Returns:
+            float: Seconds until the scheduler next needs to run
+        """
+        now = self.clock()
+        if self._loaded_until is None:
+            self.refresh(catch_up=True)
+            now = self.clock()
+        elif now >= self._next_refresh or now >= self._extend_at():
+            self.refresh()
+            now = self.clock()
+
+        events = []
+        with self._wake:
+            while self._heap and self._heap[0][0] <= now:
+                _, event_id, task_id, event_type, due_date = heapq.heappop(self._heap)
+                state = self._tasks.get(task_id)
+                if state is None or state[0] != due_date or event_id in self._fired:
+                    continue
+                self._fired[event_id] = due_date
+                if event_type == 'task.overdue':
+                    del self._tasks[task_id]
+                events.append({
+                    'id': event_id,
+                    'type': event_type,
+                    'task_id': task_id,
+                    'user_id': state[1],
+                    'title': state[2],
+                    'due_date': due_date,
+                    'fired_at': now
+                })
+            next_run = min([self._next_refresh, self._extend_at()] + ([self._heap[0][0]] if self._heap else []))
+
+        for event in events:
+            try:
+                self.sink.emit(event)
+            except Exception:
+                logger.exception('Delivering %s failed', event['id'])
+
+        return max(0.0, (next_run - now).total_seconds())
+
+    def _extend_at(self):
+        # Halfway through the window, load the next stretch
+        return self._loaded_until - self.reminder_lead - self.lookahead / 2
+
+    def refresh(self, catch_up=False):
+        """
+        Reload the tasks due in the window with one index range scan.
+
+        Tasks due since the previous scan are loaded too: one written
+        without an event may have fallen due before this scan ran. Events
+        already fired for them are skipped.
+
+        Args:
+            catch_up (bool): Load tasks due since DUE_SCHEDULER_CATCHUP_MINUTES
+                ago instead, to send events missed while the scheduler was not running
+        """
+        now = self.clock()
+        start = now - self.catchup if catch_up or self._last_refresh is None else self._last_refresh
+        until = now + self.reminder_lead + self.lookahead
+
+        with self._wake:
+            self._scanning = {}
+        try:
+            with self.app.app_context():
+                rows = self.db.session.query(Task.id, Task.user_id, Task.title, Task.due_date) \
+                    .filter(Task.due_date >= start, Task.due_date < until, Task.status != 'completed') \
+                    .order_by(Task.due_date).all()
+        except Exception:
+            with self._wake:
+                self._scanning = None
+            raise
+
+        with self._wake:
+            tasks = {row.id: (row.due_date, row.user_id, row.title) for row in rows}
+            # Writes seen while scanning may be newer than the rows read
+            for task_id, state in self._scanning.items():
+                if state is None or state[0] >= until:
+                    tasks.pop(task_id, None)
+                else:
+                    tasks[task_id] = state
+            self._scanning = None
+
+            # Overdue tasks already fired stay out; their events stay in _fired until outside any window
+            self._tasks = {task_id: state for task_id, state in tasks.items()
+                           if f'task.overdue:{task_id}:{state[0].isoformat()}' not in self._fired}
+            # The next scan starts at now, so older events can no longer be loaded again
+            self._fired = {event_id: due for event_id, due in self._fired.items() if due >= now - self.catchup}
+            self._loaded_until = until
+            self._last_refresh = now
+            self._next_refresh = now + self.refresh_interval
+            self._heap = []
+            for task_id, state in self._tasks.items():
+                self._push(task_id, state, now)
+            heapq.heapify(self._heap)
+
+    def _push(self, task_id, state, now):
+        due_date = state[0]
+        times = [('task.overdue', due_date)]
+        if self.reminder_lead and due_date > now:
+            times.append(('task.reminder', due_date - self.reminder_lead))
+        for event_type, fire_at in times:
+            event_id = f'{event_type}:{task_id}:{due_date.isoformat()}'
+            if event_id not in self._fired:
+                heapq.heappush(self._heap, (fire_at, event_id, task_id, event_type, due_date))
+
+    def on_task_event(self, event):
+        """Reschedule or drop a task after a write (a task_events listener)."""
+        task = event['task']
+        state = None
+        if event['type'] != 'task.deleted' and task.get('status') != 'completed' and task.get('due_date'):
+            state = (_utc(task['due_date']), event['user_id'], task.get('title'))
+
+        with self._wake:
+            if self._scanning is not None:
+                self._scanning[task['id']] = state
+            if self._loaded_until is None:
+                return
+            # Due dates beyond the window are picked up when it is extended
+            if state is None or state[0] >= self._loaded_until:
+                self._tasks.pop(task['id'], None)
+            elif self._tasks.get(task['id']) != state:
+                self._tasks[task['id']] = state
+                self._push(task['id'], state, self.clock())
+            self._woken = True
+            self._wake.notify()
+
+due_scheduler = DueDateScheduler()
@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csv
+import io
+import json
+from models.task import Task
+
+# Supported ?format= values and their content types
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+EXPORT_FIELDS = ['id', 'title', 'description', 'status', 'priority', 'due_date', 'created_at', 'updated_at', 'user_id']
+
+# Rows fetched per database round-trip and rows written per response chunk
+EXPORT_BATCH_SIZE = 1000
+
+def export_columns():
+    """Columns selected for export, in EXPORT_FIELDS order (plain tuples, no ORM objects)."""
+    return [getattr(Task, field) for field in EXPORT_FIELDS]
+
+def _serialize(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+def generate_ndjson(rows, chunk_size=EXPORT_BATCH_SIZE):
+    """
+    Yield rows as newline-delimited JSON, chunk_size rows per chunk.
+
+    Args:
+        rows (iterable): Tuples in EXPORT_FIELDS order
+        chunk_size (int): Rows per yielded chunk
+
+    Yields:
+        str: Chunk of NDJSON lines
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_FIELDS, map(_serialize, row)))))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def generate_csv(rows, chunk_size=EXPORT_BATCH_SIZE):
+    """
+    Yield rows as CSV with a header line, chunk_size rows per chunk.
+
+    Args:
+        rows (iterable): Tuples in EXPORT_FIELDS order
+        chunk_size (int): Rows per yielded chunk
+
+    Yields:
+        str: Chunk of CSV lines
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_serialize(value) for value in row])
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+EXPORT_GENERATORS = {
+    'ndjson': generate_ndjson,
+    'csv': generate_csv
+}
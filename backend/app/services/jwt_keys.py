@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def is_asymmetric(algorithm):
+    """Whether a JWT algorithm signs with a private key and verifies with a public one."""
+    return algorithm == 'EdDSA' or algorithm[:2] in ('RS', 'PS', 'ES')
+
+def _read_pem(value, path):
+    """PEM text from the setting itself or, failing that, from the file it names."""
+    if value:
+        return value.encode() if isinstance(value, str) else value
+    if path:
+        with open(path, 'rb') as pem_file:
+            return pem_file.read()
+    return None
+
+class SigningKeys:
+    """
+    JWT signing and verification keys, parsed once per process.
+
+    With HS* algorithms tokens are signed and verified with
+    JWT_SECRET_KEY. With RS256, ES256, EdDSA and the like, the PEM keys
+    from JWT_PRIVATE_KEY / JWT_PUBLIC_KEY (or the *_FILE settings) are
+    loaded into key objects at startup and handed to PyJWT as such;
+    passing PEM text would make PyJWT parse it again on every sign and
+    verify. A process given only the public key can verify tokens but not
+    issue them, so verification can run on any number of workers without
+    sharing the private key.
+
+    The verification key follows each token's `alg` header (among
+    JWT_DECODE_ALGORITHMS), so tokens signed before a switch of algorithm
+    stay valid until they expire. HS* tokens are only ever checked against
+    the secret, never the public key.
+    """
+
+    def __init__(self, app=None):
+        self.algorithm = 'HS256'
+        self.secret = None
+        self.private_key = None
+        self.public_key = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Load the configured keys and register them with flask-jwt-extended; call after JWTManager(app)."""
+        self.algorithm = app.config.get('JWT_ALGORITHM', 'HS256')
+        self.secret = app.config.get('JWT_SECRET_KEY')
+        self.private_key = self.public_key = None
+
+        private_pem = _read_pem(app.config.get('JWT_PRIVATE_KEY'), app.config.get('JWT_PRIVATE_KEY_FILE'))
+        public_pem = _read_pem(app.config.get('JWT_PUBLIC_KEY'), app.config.get('JWT_PUBLIC_KEY_FILE'))
+        if private_pem or public_pem or is_asymmetric(self.algorithm):
+            try:
+                from cryptography.hazmat.primitives import serialization
+            except ImportError:
+                raise RuntimeError('Asymmetric JWT algorithms and JWT key settings require the cryptography package')
+
+            if private_pem:
+                self.private_key = serialization.load_pem_private_key(private_pem, password=None)
+                self.public_key = self.private_key.public_key()
+            if public_pem:
+                self.public_key = serialization.load_pem_public_key(public_pem)
+            if is_asymmetric(self.algorithm) and self.public_key is None:
+                raise RuntimeError(f'JWT_ALGORITHM={self.algorithm} requires JWT_PRIVATE_KEY or JWT_PUBLIC_KEY (or their *_FILE settings)')
+
+        manager = app.extensions['flask-jwt-extended']
+        manager.encode_key_loader(self._encode_key)
+        manager.decode_key_loader(self._decode_key)
+        app.extensions['jwt_keys'] = self
+
+    def _encode_key(self, identity):
+        if not is_asymmetric(self.algorithm):
+            return self.secret
+        if self.private_key is None:
+            raise RuntimeError('No JWT private key configured; this process can only verify tokens')
+        return self.private_key
+
+    def _decode_key(self, jwt_header, jwt_payload):
+        return self.public_key if is_asymmetric(jwt_header.get('alg', '')) else self.secret
+
+signing_keys = SigningKeys()
@@ -0,0 +1,145 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import glob
+import logging
+from datetime import datetime
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Table, Column, String, DateTime, MetaData, inspect, select
+from models.user import User
+from models.task import Task
+from models.task_counter import TaskCounter
+from services.task_counters import rebuild_task_counters
+from models.task_trend import TaskDailyTotal
+from services.task_trends import rebuild_task_trends
+from services.search import install_search_index
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'migrations')
+
+# Applied SQL migration files; kept out of db.metadata like tasks_fts
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', String(255), primary_key=True),
+    Column('applied_at', DateTime, nullable=False, default=datetime.utcnow)
+)
+
+def migration_files(directory=MIGRATIONS_DIR):
+    """SQL migration files as (version, path), in the order they apply."""
+    paths = sorted(glob.glob(os.path.join(directory, '*.sql')))
+    return [(os.path.splitext(os.path.basename(path))[0], path) for path in paths]
+
+def pending_migrations(db: SQLAlchemy, directory=MIGRATIONS_DIR):
+    """SQL migrations not yet recorded in schema_migrations."""
+    schema_migrations.create(db.engine, checkfirst=True)
+    with db.engine.connect() as conn:
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+    return [(version, path) for version, path in migration_files(directory) if version not in applied]
+
+def apply_sql_migrations(db: SQLAlchemy, directory=MIGRATIONS_DIR):
+    """
+    Apply pending SQL migration files, each in its own transaction.
+
+    The files are written for PostgreSQL and are safe to re-run, so a
+    database initialized from the same files (docker-compose mounts them
+    into docker-entrypoint-initdb.d) is brought under the runner as-is.
+
+    Returns:
+        list: Versions applied
+    """
+    applied = []
+    for version, path in pending_migrations(db, directory):
+        with open(path) as migration:
+            sql = migration.read()
+
+        with db.engine.begin() as conn:
+            # no_parameters: run the file verbatim, without DBAPI %-interpolation
+            conn.execution_options(no_parameters=True).exec_driver_sql(sql)
+            conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+
+        logger.info('Applied migration %s', version)
+        applied.append(version)
+    return applied
+
+def sync_schema_from_models(db: SQLAlchemy):
+    """
+    Bring a non-PostgreSQL database (SQLite) in line with the models.
+
+    create_all() only creates missing tables, so columns and indexes
+    declared later on existing tables and the search index are added
+    separately. Added columns must be nullable or have a server default.
+
+    Returns:
+        list: Names of the tables and indexes created
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    created = [name for name in db.metadata.tables if name not in existing_tables]
+    db.metadata.create_all(db.engine)
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                _add_column(db, table, column)
+                created.append(f'{table.name}.{column.name}')
+
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(db.engine)
+                created.append(index.name)
+
+    if db.engine.dialect.name == 'sqlite' and 'tasks_fts' not in set(inspect(db.engine).get_table_names()):
+        install_search_index(db)
+        created.append('tasks_fts')
+
+    return created
+
+def _add_column(db: SQLAlchemy, table, column):
+    dialect = db.engine.dialect
+    ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=dialect)}'
+    if column.server_default is not None:
+        ddl += f' DEFAULT {column.server_default.arg}'
+    if not column.nullable:
+        ddl += ' NOT NULL'
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql(ddl)
+
+def seed_data(db: SQLAlchemy):
+    """Create the default admin user and backfill analytics counters and trend rollups if needed."""
+    if not User.query.filter_by(username='admin').first():
+        admin = User(username='admin', email='admin@example.com', role='admin')
+        admin.set_password('admin123')
+        db.session.add(admin)
+        db.session.commit()
+
+    # Seed the analytics counters when upgrading a database that predates them
+    if not TaskCounter.query.first() and Task.query.first():
+        rebuild_task_counters(db)
+    if not TaskDailyTotal.query.first() and Task.query.first():
+        rebuild_task_trends(db)
+
+def upgrade_database(db: SQLAlchemy):
+    """
+    Create or upgrade the schema, then seed required data.
+
+    Run once per deploy (`flask db-upgrade`) rather than at app startup,
+    so worker boot does no DDL. PostgreSQL applies the SQL files in
+    migrations/; other databases are synced from the models.
+
+    Returns:
+        list: Migrations applied, or tables/indexes created
+    """
+    if db.engine.dialect.name == 'postgresql':
+        changes = apply_sql_migrations(db)
+    else:
+        changes = sync_schema_from_models(db)
+
+    seed_data(db)
+    return changes
@@ -0,0 +1,83 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+from models.task import Task
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at, task_id):
+    """
+    Encode a (created_at, id) position into an opaque cursor string.
+
+    Args:
+        created_at (datetime): Creation time of the last task on the page
+        task_id (int): ID of the last task on the page
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = json.dumps([created_at.isoformat(), task_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): Cursor token from a previous response
+
+    Returns:
+        tuple: (created_at, id) position to continue after
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, TypeError):
+        raise InvalidCursorError('Invalid cursor')
+
+
+def keyset_paginate(query, per_page, cursor=None, include_total=False):
+    """
+    Paginate a task query by (created_at, id), newest first.
+
+    Unlike query.paginate(), each page is a single index range scan that
+    costs the same regardless of depth, and no COUNT(*) is issued unless
+    include_total is requested.
+
+    Args:
+        query: Filtered Task query without ordering applied
+        per_page (int): Number of tasks per page
+        cursor (str): Cursor from the previous page, or None for the first page
+        include_total (bool): Whether to count the full filtered set
+
+    Returns:
+        tuple: (tasks, pagination) where pagination is the response metadata
+    """
+    pagination = {'per_page': per_page}
+
+    if include_total:
+        pagination['total'] = query.order_by(None).count()
+
+    if cursor:
+        created_at, task_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Task.created_at, Task.id) < tuple_(created_at, task_id))
+
+    # Fetch one extra row to find out whether another page exists
+    tasks = query.order_by(Task.created_at.desc(), Task.id.desc()).limit(per_page + 1).all()
+    has_more = len(tasks) > per_page
+    tasks = tasks[:per_page]
+
+    pagination['has_more'] = has_more
+    pagination['next_cursor'] = encode_cursor(tasks[-1].created_at, tasks[-1].id) if has_more else None
+
+    return tasks, pagination
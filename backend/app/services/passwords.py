@@ -0,0 +1,163 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashes are queued (or one waited too long); callers answer 503."""
+
+class PasswordHasher:
+    """
+    Password hashing on a small bounded thread pool.
+
+    Hashes are deliberately slow, so running them on request threads lets
+    a login burst occupy every thread and core of a worker. Instead each
+    hash or verification runs on one of PASSWORD_HASH_WORKERS threads
+    (hashlib's scrypt and pbkdf2 release the GIL, so they run in parallel)
+    while the request thread waits. At most PASSWORD_HASH_MAX_QUEUE more
+    may wait for a free thread; beyond that, or after waiting
+    PASSWORD_HASH_TIMEOUT seconds, PasswordHasherBusy is raised.
+
+    The algorithm and cost come from PASSWORD_HASH_METHOD, in werkzeug's
+    method syntax (e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000').
+    needs_rehash() tells whether a stored hash uses other parameters, so
+    old hashes can be upgraded when the user next logs in.
+    """
+
+    def __init__(self, app=None):
+        self.method = 'scrypt'
+        self.salt_length = 16
+        self.workers = 2
+        self.max_queue = 32
+        self.timeout = 10
+        self._executor = None
+        self._prefix = None
+        self._lock = threading.Lock()
+        self._reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure from the PASSWORD_HASH_* settings."""
+        self.shutdown()
+        self.method = app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        self.salt_length = app.config.get('PASSWORD_SALT_LENGTH', 16)
+        self.workers = max(1, app.config.get('PASSWORD_HASH_WORKERS', 2))
+        self.max_queue = max(0, app.config.get('PASSWORD_HASH_MAX_QUEUE', 32))
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self._prefix = None
+        self._reset()
+        app.extensions['password_hasher'] = self
+
+    def _reset(self):
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.hash_ms_total = 0.0
+
+    def shutdown(self):
+        """Stop the pool's threads; a new pool is started on next use."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _pool(self):
+        # Created on first use, so worker processes forked after startup get their own threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+            return self._executor
+
+    def _run(self, func, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy('Too many password hashes in progress')
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        def task():
+            started = time.perf_counter()
+            wait_ms = (started - submitted) * 1000
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_ms_total += wait_ms
+                self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.hash_ms_total += (time.perf_counter() - started) * 1000
+                slots.release()
+
+        future = self._pool().submit(task)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Not started yet: drop it; running: it finishes and frees its slot
+            if future.cancel():
+                with self._lock:
+                    self.queued -= 1
+                slots.release()
+            with self._lock:
+                self.timeouts += 1
+            raise PasswordHasherBusy('Timed out waiting for a password hash')
+
+    def hash(self, password):
+        """Hash a password with the configured method."""
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash of any supported method."""
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with a different method or cost than configured."""
+        if self._prefix is None:
+            # werkzeug fills in default parameters (e.g. 'scrypt' -> 'scrypt:32768:8:1'); one hash tells us which
+            self._prefix = generate_password_hash('', self.method, 1).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._prefix
+
+    def stats(self):
+        """
+        Get pool and queue counters for monitoring.
+
+        Returns:
+            dict: Method, pool limits, current and peak queue depth, outcomes and timings
+        """
+        with self._lock:
+            completed = self.completed
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'running': self.running,
+                'queued': self.queued,
+                'max_queued': self.max_queued,
+                'completed': completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'wait_ms_avg': round(self.wait_ms_total / completed, 3) if completed else 0,
+                'wait_ms_max': round(self.wait_ms_max, 3),
+                'hash_ms_avg': round(self.hash_ms_total / completed, 3) if completed else 0
+            }
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,325 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cProfile
+import hashlib
+import hmac
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from flask import Response, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from services.query_budget import query_budget
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request sections timed besides wall time and SQL
+SECTIONS = ('serialize', 'jwt')
+
+# Distinct slow statements tracked for /metrics; later ones are only logged
+MAX_SLOW_FINGERPRINTS = 500
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_BIND_PARAM = re.compile(r'%\(\w+\)s|%s|(?<!:):\w+|\$\d+')
+_VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+def fingerprint(statement):
+    """
+    Normalize a SQL statement so executions differing only in values match.
+
+    Literals and bind parameters become `?`, IN lists and multi-row VALUES
+    collapse to `(?+)` and whitespace is squeezed.
+    """
+    normalized = _BIND_PARAM.sub('?', statement)
+    normalized = _STRING_LITERAL.sub('?', normalized)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _VALUE_LIST.sub('(?+)', normalized)
+    return ' '.join(normalized.split())
+
+def fingerprint_id(normalized):
+    """Short stable id for a fingerprint, used as the metrics label."""
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+@contextmanager
+def profile_section(name):
+    """Add the time spent in the block to the current request's profile, if any."""
+    profile = _current_profile()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile[name] += time.perf_counter() - start
+
+def _current_profile():
+    if not has_request_context():
+        return None
+    return g.get('_profile')
+
+class ProfiledJSONProvider(DefaultJSONProvider):
+    """Default JSON provider that counts jsonify() time as serialization."""
+
+    def response(self, *args, **kwargs):
+        with profile_section('serialize'):
+            return super().response(*args, **kwargs)
+
+class RequestProfiler:
+    """
+    Opt-in per-request profiling (PROFILING_ENABLED).
+
+    Records wall time, SQL time and query count, JSON serialization time
+    and JWT decode time per request, logs slow statements by fingerprint,
+    and serves the aggregates per endpoint in Prometheus text format at
+    /metrics. A sample of requests to PROFILE_ENDPOINT can be run under
+    cProfile, with the stats written to PROFILE_DIR.
+
+    Aggregates are per process: with several gunicorn workers each scrape
+    sees the worker that served it.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._reset()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db: SQLAlchemy):
+        """Install the request hooks and SQL listeners when PROFILING_ENABLED is set."""
+        self.enabled = app.config.get('PROFILING_ENABLED', False)
+        self.slow_query_seconds = app.config.get('SLOW_QUERY_MS', 200) / 1000
+        self.metrics_token = app.config.get('METRICS_TOKEN')
+        self.profile_endpoint = app.config.get('PROFILE_ENDPOINT')
+        self.profile_sample_rate = app.config.get('PROFILE_SAMPLE_RATE', 0.01)
+        self.profile_dir = app.config.get('PROFILE_DIR', 'profiles')
+        self._reset()
+        app.extensions['request_profiler'] = self
+
+        if not self.enabled:
+            return
+
+        app.json = ProfiledJSONProvider(app)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', query_budget(0)(self.metrics_view), methods=['GET'])
+
+        with app.app_context():
+            self.instrument_engine(db.engine)
+
+        # flask-jwt-extended has no decode hook, so time the manager's decode method
+        jwt_manager = app.extensions.get('flask-jwt-extended')
+        if jwt_manager is not None and hasattr(jwt_manager, '_decode_jwt_from_config'):
+            decode = jwt_manager._decode_jwt_from_config
+
+            def timed_decode(*args, **kwargs):
+                with profile_section('jwt'):
+                    return decode(*args, **kwargs)
+
+            jwt_manager._decode_jwt_from_config = timed_decode
+
+    def instrument_engine(self, engine):
+        """Time engine's statements into the current request's profile and the slow-query log."""
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self._slow_queries = {}
+            self.profiles_captured = 0
+
+    # Request hooks
+
+    def _before_request(self):
+        if request.endpoint == 'metrics':
+            return
+
+        g._profile = {'start': time.perf_counter(), 'sql': 0.0, 'queries': 0, **{name: 0.0 for name in SECTIONS}}
+
+        if (self.profile_endpoint and request.endpoint == self.profile_endpoint
+                and random.random() < self.profile_sample_rate):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is active on this thread
+                return
+            g._cprofile = profiler
+
+    def discard_cprofile(self):
+        """Stop and drop the current request's cProfile sample, if any; it must be called on the thread that started it."""
+        profiler = g.pop('_cprofile', None)
+        if profiler is not None:
+            profiler.disable()
+
+    def _after_request(self, response):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return response
+
+        wall = time.perf_counter() - profile['start']
+        profiler = g.pop('_cprofile', None)
+        if profiler is not None:
+            profiler.disable()
+            self._dump_profile(profiler)
+
+        response.headers['Server-Timing'] = ', '.join(
+            f'{name};dur={profile[name] * 1000:.2f}' for name in ('sql',) + SECTIONS
+        ) + f', total;dur={wall * 1000:.2f}'
+
+        self._record(request.endpoint or 'unmatched', request.method, response.status_code, wall, profile)
+        logger.debug('%s %s %s wall=%.2fms sql=%.2fms queries=%d serialize=%.2fms jwt=%.2fms',
+                     request.method, request.path, response.status_code, wall * 1000, profile['sql'] * 1000,
+                     profile['queries'], profile['serialize'] * 1000, profile['jwt'] * 1000)
+        return response
+
+    def _dump_profile(self, profiler):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f'{request.endpoint}-{time.time_ns()}-{os.getpid()}.prof')
+        profiler.dump_stats(path)
+        with self._lock:
+            self.profiles_captured += 1
+        logger.info('Wrote cProfile stats for %s %s to %s', request.method, request.path, path)
+
+    # SQL listeners
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+
+        profile = _current_profile()
+        if profile is not None:
+            profile['sql'] += elapsed
+            profile['queries'] += 1
+
+        if self.slow_query_seconds > 0 and elapsed >= self.slow_query_seconds:
+            self._record_slow_query(statement, elapsed)
+
+    def _record_slow_query(self, statement, elapsed):
+        normalized = fingerprint(statement)
+        query_id = fingerprint_id(normalized)
+        logger.warning('Slow query %.1fms [%s]: %s', elapsed * 1000, query_id, normalized)
+
+        with self._lock:
+            entry = self._slow_queries.get(query_id)
+            if entry is None:
+                if len(self._slow_queries) >= MAX_SLOW_FINGERPRINTS:
+                    return
+                entry = self._slow_queries[query_id] = {'statement': normalized, 'count': 0, 'seconds': 0.0}
+            entry['count'] += 1
+            entry['seconds'] += elapsed
+
+    # Aggregates
+
+    def _record(self, endpoint, method, status, wall, profile):
+        with self._lock:
+            stats = self._endpoints.get((endpoint, method))
+            if stats is None:
+                stats = self._endpoints[(endpoint, method)] = {
+                    'statuses': {}, 'buckets': [0] * len(DURATION_BUCKETS), 'count': 0, 'seconds': 0.0,
+                    'sql': 0.0, 'queries': 0, **{name: 0.0 for name in SECTIONS}
+                }
+
+            stats['statuses'][status] = stats['statuses'].get(status, 0) + 1
+            stats['count'] += 1
+            stats['seconds'] += wall
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if wall <= bound:
+                    stats['buckets'][index] += 1
+            for name in ('sql', 'queries') + SECTIONS:
+                stats[name] += profile[name]
+
+    def snapshot(self):
+        """
+        Get a copy of the aggregates.
+
+        Returns:
+            dict: Per (endpoint, method) stats and slow queries by fingerprint id
+        """
+        with self._lock:
+            return {
+                'endpoints': {
+                    key: {**stats, 'statuses': dict(stats['statuses']), 'buckets': list(stats['buckets'])}
+                    for key, stats in self._endpoints.items()
+                },
+                'slow_queries': {query_id: dict(entry) for query_id, entry in self._slow_queries.items()},
+                'profiles_captured': self.profiles_captured
+            }
+
+    def render_metrics(self):
+        """Aggregates in the Prometheus text exposition format (0.0.4)."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        endpoints = sorted(snapshot['endpoints'].items())
+
+        family('http_requests_total', 'counter', 'Requests handled, by endpoint, method and status.')
+        for (endpoint, method), stats in endpoints:
+            for status, count in sorted(stats['statuses'].items()):
+                lines.append(f'http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}')
+
+        family('http_request_duration_seconds', 'histogram', 'Request wall time until the response is returned.')
+        for (endpoint, method), stats in endpoints:
+            for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+                lines.append(f'http_request_duration_seconds_bucket{_labels(endpoint=endpoint, method=method, le=bound)} {count}')
+            lines.append(f'http_request_duration_seconds_bucket{_labels(endpoint=endpoint, method=method, le="+Inf")} {stats["count"]}')
+            lines.append(f'http_request_duration_seconds_sum{_labels(endpoint=endpoint, method=method)} {stats["seconds"]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{_labels(endpoint=endpoint, method=method)} {stats["count"]}')
+
+        for name, key, help_text in (
+            ('http_request_sql_seconds_total', 'sql', 'Time spent executing SQL statements.'),
+            ('http_request_sql_queries_total', 'queries', 'SQL statements executed.'),
+            ('http_request_serialize_seconds_total', 'serialize', 'Time spent encoding JSON responses.'),
+            ('http_request_jwt_decode_seconds_total', 'jwt', 'Time spent decoding and verifying JWTs.'),
+        ):
+            family(name, 'counter', help_text)
+            for (endpoint, method), stats in endpoints:
+                value = stats[key] if key == 'queries' else f'{stats[key]:.6f}'
+                lines.append(f'{name}{_labels(endpoint=endpoint, method=method)} {value}')
+
+        family('db_slow_queries_total', 'counter', 'Statements slower than SLOW_QUERY_MS, by fingerprint id (see logs).')
+        for query_id, entry in sorted(snapshot['slow_queries'].items()):
+            lines.append(f'db_slow_queries_total{_labels(fingerprint=query_id)} {entry["count"]}')
+        family('db_slow_query_seconds_total', 'counter', 'Time spent in slow statements, by fingerprint id.')
+        for query_id, entry in sorted(snapshot['slow_queries'].items()):
+            lines.append(f'db_slow_query_seconds_total{_labels(fingerprint=query_id)} {entry["seconds"]:.6f}')
+
+        family('profiles_captured_total', 'counter', 'Requests captured with cProfile.')
+        lines.append(f'profiles_captured_total {snapshot["profiles_captured"]}')
+
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        """GET /metrics, guarded by METRICS_TOKEN when it is set."""
+        if self.metrics_token:
+            supplied = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied, f'Bearer {self.metrics_token}'):
+                return Response('Unauthorized\n', status=401, mimetype='text/plain')
+
+        return Response(self.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+request_profiler = RequestProfiler()
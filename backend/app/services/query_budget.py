@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app
+from sqlalchemy import event
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when code runs more SQL statements than its budget allows."""
+
+    def __init__(self, label, max_queries, statements):
+        self.statements = list(statements)
+        super().__init__(
+            f'{label} ran {len(self.statements)} SQL queries, budget is {max_queries}:\n'
+            + format_statements(self.statements)
+        )
+
+def format_statements(statements):
+    """Number statements one per line, whitespace squeezed, for failure output."""
+    return '\n'.join(f'  {index}. {" ".join(statement.split())}' for index, statement in enumerate(statements, 1))
+
+def _current_owner():
+    """The asyncio task running this code or, outside an event loop, the thread."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task or threading.get_ident()
+
+@contextmanager
+def count_queries(engine):
+    """
+    Record the SQL statements the current thread (or asyncio task) executes on engine.
+
+    Yields:
+        list: Statements, appended to as they execute
+    """
+    statements = []
+    owner = _current_owner()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if _current_owner() == owner:
+            statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+@contextmanager
+def assert_max_queries(engine, max_queries, label='Block'):
+    """Fail with the offending statements if the block runs more than max_queries."""
+    with count_queries(engine) as statements:
+        yield statements
+    if len(statements) > max_queries:
+        raise QueryBudgetExceeded(label, max_queries, statements)
+
+def budget_enforced(app):
+    """QUERY_BUDGET_ENFORCE, defaulting to on under TESTING and off otherwise."""
+    enforce = app.config.get('QUERY_BUDGET_ENFORCE')
+    return app.testing if enforce is None else enforce
+
+def query_budget(max_queries):
+    """
+    Declare the most SQL statements a view may run per request.
+
+    When budgets are enforced (under TESTING by default) a request that
+    exceeds the budget raises QueryBudgetExceeded listing its statements,
+    so a new N+1 pattern fails the test that exercises it. Otherwise the
+    budget is only recorded on the view as `query_budget`.
+
+    Only statements run before the view returns count; streaming views
+    budget their response body per chunk with budget_chunks.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not budget_enforced(current_app):
+                return view(*args, **kwargs)
+
+            engine = current_app.extensions['sqlalchemy'].engine
+            with assert_max_queries(engine, max_queries, label=f'{view.__module__}.{view.__name__}'):
+                return view(*args, **kwargs)
+
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
+
+def budget_chunks(chunks, max_queries, label='Chunk'):
+    """
+    Hold each chunk of a streamed response body to max_queries statements.
+
+    The statement count of a whole export or import grows with the data,
+    so streaming views declare @query_budget(0) for the view itself and
+    wrap their body with this: producing any one chunk (an export batch,
+    an import batch's progress event) that runs more fails like a view
+    over budget would. Returns chunks unchanged when budgets are not enforced.
+    """
+    if not budget_enforced(current_app):
+        return chunks
+
+    engine = current_app.extensions['sqlalchemy'].engine
+    return _budgeted_chunks(iter(chunks), engine, max_queries, label)
+
+def _budgeted_chunks(chunks, engine, max_queries, label):
+    try:
+        while True:
+            with assert_max_queries(engine, max_queries, label=label):
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+            yield chunk
+    finally:
+        # Closing the response closes the body it wraps (e.g. an open cursor)
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
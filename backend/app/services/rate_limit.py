@@ -0,0 +1,259 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import decode_token
+from flask_sqlalchemy import SQLAlchemy
+from services.cache import MemoryCacheBackend, _MISSING
+from services.db_pool import InstrumentedQueuePool
+
+# Always admitted: health checks and metric scrapes matter most during an incident
+EXEMPT_ENDPOINTS = {'health_check', 'metrics', 'static'}
+
+class RateLimitBackend:
+    """
+    Interface for token bucket storage.
+
+    The default MemoryRateLimitBackend is per-process, so each worker
+    allows the configured rate. A shared backend (e.g. Redis) enforces
+    one limit across every worker; implement consume() and select it
+    with RATE_LIMIT_BACKEND.
+    """
+
+    def consume(self, key, rate, burst):
+        """
+        Take one token from the bucket under key, refilled at rate per second up to burst.
+
+        Returns:
+            tuple: (allowed, seconds until a token is available)
+        """
+        raise NotImplementedError
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """In-process token buckets, least recently used evicted beyond max_keys."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+
+            # An evicted bucket comes back full, which is what an idle one would be
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def __len__(self):
+        return len(self._buckets)
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Token buckets shared by every worker, in Redis (requires the optional `redis` package)."""
+
+    # Refill and take atomically, on the Redis server's clock
+    SCRIPT = """
+        local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+        local clock = redis.call('TIME')
+        local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+        local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+        local tokens = math.min(burst, (tonumber(bucket[1]) or burst) + (now - (tonumber(bucket[2]) or now)) * rate)
+        local allowed = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+            allowed = 1
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+        redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+        return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('RATE_LIMIT_BACKEND=redis requires the redis package')
+
+        self._script = redis.Redis.from_url(url).register_script(self.SCRIPT)
+
+    def consume(self, key, rate, burst):
+        allowed, tokens = self._script(keys=[key], args=[rate, burst])
+        return bool(allowed), 0.0 if allowed else (1 - float(tokens)) / rate
+
+class AdmissionControl:
+    """
+    Rate limiting and load shedding in front of every route.
+
+    Before a request is routed to its view:
+
+    - Load shedding: with LOAD_SHED_MAX_IN_FLIGHT requests already being
+      served by this process, or when database connection checkouts have
+      recently waited LOAD_SHED_MAX_POOL_WAIT_MS on average, the request
+      gets 503 with Retry-After rather than queueing behind the others.
+    - Rate limiting: token buckets per client IP (RATE_LIMIT_IP_RATE
+      requests per second, bursts of RATE_LIMIT_IP_BURST) and, for
+      requests with a valid access token, per user (RATE_LIMIT_USER_*).
+      An empty bucket gets 429 with Retry-After.
+
+    /health and /metrics are never limited. Admission control is off
+    under TESTING unless RATE_LIMIT_ENABLED is set explicitly.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.backend = None
+        self.db = None
+        self._lock = threading.Lock()
+        self._reset_stats()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db: SQLAlchemy):
+        """Configure from the RATE_LIMIT_* and LOAD_SHED_* settings and install the request hooks."""
+        self.db = db
+        self.user_rate = app.config.get('RATE_LIMIT_USER_RATE', 20)
+        self.user_burst = app.config.get('RATE_LIMIT_USER_BURST', 40)
+        self.ip_rate = app.config.get('RATE_LIMIT_IP_RATE', 50)
+        self.ip_burst = app.config.get('RATE_LIMIT_IP_BURST', 100)
+        self.proxy_hops = app.config.get('RATE_LIMIT_PROXY_HOPS', 0)
+        self.max_in_flight = app.config.get('LOAD_SHED_MAX_IN_FLIGHT', 0)
+        self.max_pool_wait = app.config.get('LOAD_SHED_MAX_POOL_WAIT_MS', 0) / 1000
+        self.retry_after = app.config.get('LOAD_SHED_RETRY_AFTER', 1)
+
+        if app.config.get('RATE_LIMIT_BACKEND', 'memory') == 'redis':
+            self.backend = RedisRateLimitBackend(app.config['RATE_LIMIT_URL'])
+        else:
+            self.backend = MemoryRateLimitBackend(app.config.get('RATE_LIMIT_MAX_KEYS', 100000))
+
+        # Verified token identities, so the limiter decodes each token once rather than per request
+        self._identities = MemoryCacheBackend(10000)
+        self._reset_stats()
+
+        # Calling again (e.g. to apply changed settings) reconfigures without adding the hooks twice
+        if app.extensions.get('admission_control') is not self:
+            app.before_request(self._before_request)
+            app.teardown_request(self._teardown_request)
+            app.extensions['admission_control'] = self
+
+    def _reset_stats(self):
+        with self._lock:
+            self.in_flight = 0
+            self.max_in_flight_seen = 0
+            self.admitted = 0
+            self.rejected = {'user_rate_limit': 0, 'ip_rate_limit': 0, 'in_flight': 0, 'pool_wait': 0}
+
+    def is_enabled(self):
+        """RATE_LIMIT_ENABLED if set, otherwise on except under TESTING; read per request."""
+        enabled = current_app.config.get('RATE_LIMIT_ENABLED')
+        return enabled if enabled is not None else not current_app.testing
+
+    # Request hooks
+
+    def _before_request(self):
+        if request.endpoint in EXEMPT_ENDPOINTS or not self.is_enabled():
+            return None
+
+        reason = self._shed_reason()
+        if reason is not None:
+            return self._reject(reason, 503, 'Server is overloaded, please retry shortly', self.retry_after)
+
+        allowed, retry_after = self.backend.consume(f'ratelimit:ip:{self._client_ip()}', self.ip_rate, self.ip_burst)
+        if not allowed:
+            return self._reject('ip_rate_limit', 429, 'Too many requests', retry_after)
+
+        user_id = self._user_id()
+        if user_id is not None:
+            allowed, retry_after = self.backend.consume(f'ratelimit:user:{user_id}', self.user_rate, self.user_burst)
+            if not allowed:
+                return self._reject('user_rate_limit', 429, 'Too many requests', retry_after)
+
+        g._admitted = True
+        with self._lock:
+            self.admitted += 1
+            self.in_flight += 1
+            self.max_in_flight_seen = max(self.max_in_flight_seen, self.in_flight)
+        return None
+
+    def _teardown_request(self, exc):
+        if g.pop('_admitted', False):
+            with self._lock:
+                self.in_flight -= 1
+
+    def _shed_reason(self):
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return 'in_flight'
+        if self.max_pool_wait:
+            pool = self.db.engine.pool
+            if isinstance(pool, InstrumentedQueuePool) and pool.recent_wait() >= self.max_pool_wait:
+                return 'pool_wait'
+        return None
+
+    def _reject(self, reason, status, message, retry_after):
+        with self._lock:
+            self.rejected[reason] += 1
+        response = jsonify({'message': message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    def _client_ip(self):
+        # Behind RATE_LIMIT_PROXY_HOPS trusted proxies, the client is that many entries from the end of X-Forwarded-For
+        if self.proxy_hops:
+            route = request.access_route
+            return route[-min(self.proxy_hops, len(route))]
+        return request.remote_addr
+
+    def _user_id(self):
+        """The verified identity of the request's bearer token, or None."""
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return None
+        token = header[7:]
+
+        identity = self._identities.get(token)
+        if identity is _MISSING:
+            try:
+                claims = decode_token(token)
+            except Exception:
+                # Invalid or expired: the view's @jwt_required rejects it; limit by IP only
+                return None
+            identity = claims['sub']
+            self._identities.set(token, identity, max(1, claims['exp'] - time.time()))
+        return identity
+
+    def stats(self):
+        """
+        Get admission counters for monitoring.
+
+        Returns:
+            dict: Limits, requests in flight, admitted and rejected counts by reason
+        """
+        with self._lock:
+            return {
+                'user_rate': self.user_rate,
+                'user_burst': self.user_burst,
+                'ip_rate': self.ip_rate,
+                'ip_burst': self.ip_burst,
+                'max_in_flight': self.max_in_flight,
+                'max_pool_wait_ms': self.max_pool_wait * 1000,
+                'in_flight': self.in_flight,
+                'max_in_flight_seen': self.max_in_flight_seen,
+                'admitted': self.admitted,
+                'rejected': dict(self.rejected),
+                'rejected_total': sum(self.rejected.values())
+            }
+
+admission_control = AdmissionControl()
@@ -0,0 +1,257 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from models.revoked_token import RevokedToken, UsedRefreshToken
+
+logger = logging.getLogger(__name__)
+
+# Smallest filter built, leaving headroom for revocations made between refreshes
+MIN_FILTER_CAPACITY = 1024
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Sized for capacity items at error_rate false positives; membership
+    tests never give false negatives.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class TokenRevocationList:
+    """
+    Revoked access tokens (by jti), checked without a query per request.
+
+    Revocations are stored in revoked_tokens until the token would have
+    expired. Each process keeps a Bloom filter of the unexpired jtis, so
+    almost every check is answered in memory; a filter hit is confirmed
+    with a primary-key lookup, since it may be a false positive. The
+    filter is rebuilt every REVOCATION_REFRESH_SECONDS before a request,
+    so tokens revoked on another worker are rejected within that window;
+    revocations made in this process apply immediately.
+
+    Tokens issued from one login share a family id (`fam`), which can be
+    revoked as a whole. Refresh tokens are single use: presenting one that
+    was already rotated away means it may have been copied, so its whole
+    family is revoked. Used refresh tokens are recorded by use_refresh_token()
+    in used_refresh_tokens, not here: every rotation adds one, and they
+    would swell the filter and its reload with routine traffic. Only
+    POST /api/auth/refresh checks them, through its own insert.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self.refresh_seconds = 30
+        self.error_rate = 0.001
+        self.family_lifetime = 30 * 24 * 3600
+        self._lock = threading.Lock()
+        self._reset()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db: SQLAlchemy):
+        """Register the blocklist check with flask-jwt-extended; call after JWTManager(app)."""
+        self.db = db
+        self.refresh_seconds = app.config.get('REVOCATION_REFRESH_SECONDS', 30)
+        self.error_rate = app.config.get('REVOCATION_BLOOM_ERROR_RATE', 0.001)
+        # A family lives as long as its newest refresh token can
+        self.family_lifetime = app.config.get('JWT_REFRESH_TOKEN_EXPIRES', 30 * 24 * 3600)
+        self._reset()
+
+        app.extensions['flask-jwt-extended'].token_in_blocklist_loader(self._check_token)
+        app.before_request(self.refresh_if_stale)
+        app.extensions['token_revocation'] = self
+
+        # Warm the filter at startup so requests do not pay for the first load
+        with app.app_context():
+            try:
+                self.refresh()
+            except SQLAlchemyError as e:
+                # Schema not migrated yet (or database unreachable): nothing can
+                # have been revoked here, so start empty and retry on the next interval
+                db.session.rollback()
+                logger.warning('Could not load revoked tokens: %s', e)
+                self._loaded_at = time.monotonic()
+            finally:
+                db.session.remove()
+
+    def _reset(self):
+        self._filter = BloomFilter(MIN_FILTER_CAPACITY, self.error_rate)
+        self._loaded_at = None
+        self.checks = 0
+        self.db_lookups = 0
+        self.false_positives = 0
+        self.refreshes = 0
+        self.reuses = 0
+
+    def refresh_if_stale(self):
+        """Rebuild the filter if it was never loaded or is older than the refresh interval."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        # One thread rebuilds; the others keep using the current filter
+        if not self._lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds:
+                self.refresh()
+        except SQLAlchemyError as e:
+            self.db.session.rollback()
+            logger.warning('Could not refresh revoked tokens: %s', e)
+            self._loaded_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def refresh(self):
+        """Rebuild the filter from the unexpired revocations in the database."""
+        jtis = self.db.session.execute(
+            select(RevokedToken.jti).where(RevokedToken.expires_at > datetime.utcnow())
+        ).scalars().all()
+
+        bloom = BloomFilter(max(MIN_FILTER_CAPACITY, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+
+        self._filter = bloom
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+
+    def _insert_once(self, model, jti, **values):
+        """Insert a row keyed by jti unless it exists; return whether this call inserted it."""
+        dialect = self.db.session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            # One statement, and no error if another worker inserted it first; a
+            # concurrent insert waits on the row and then inserts nothing
+            dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            return self.db.session.execute(
+                dialect_insert(model).values(jti=jti, **values).on_conflict_do_nothing(index_elements=['jti'])
+            ).rowcount == 1
+        if self.db.session.get(model, jti) is not None:
+            return False
+        self.db.session.execute(insert(model).values(jti=jti, **values))
+        return True
+
+    def revoke(self, jti, user_id, expires_at):
+        """
+        Revoke a token in the current transaction; the caller commits.
+
+        Args:
+            jti (str): The token's unique id
+            user_id (int): Owner of the token
+            expires_at (int): The token's `exp` claim (seconds since the epoch)
+        """
+        expires = datetime.fromtimestamp(expires_at, tz=timezone.utc).replace(tzinfo=None)
+        self._insert_once(RevokedToken, jti, user_id=user_id, expires_at=expires, revoked_at=datetime.utcnow())
+        self._filter.add(jti)
+
+    def use_refresh_token(self, jti, user_id, expires_at):
+        """
+        Record a refresh token as exchanged, in the current transaction; the caller commits.
+
+        Args:
+            jti (str): The refresh token's unique id
+            user_id (int): Owner of the token
+            expires_at (int): The token's `exp` claim (seconds since the epoch)
+
+        Returns:
+            bool: False if the token was already used, on this or any other
+                worker, including by a request still in flight
+        """
+        expires = datetime.fromtimestamp(expires_at, tz=timezone.utc).replace(tzinfo=None)
+        return self._insert_once(UsedRefreshToken, jti, user_id=user_id, expires_at=expires, used_at=datetime.utcnow())
+
+    def revoke_family(self, family, user_id):
+        """Revoke every token issued from one login, in the current transaction; the caller commits."""
+        self.revoke(family, user_id, time.time() + self.family_lifetime)
+
+    def revoke_reused(self, family, user_id):
+        """A rotated refresh token was presented again: revoke its family, in the current transaction."""
+        self.reuses += 1
+        if family:
+            self.revoke_family(family, user_id)
+
+    def is_revoked(self, jti):
+        """O(1) in memory for tokens that were never revoked; a lookup otherwise."""
+        self.checks += 1
+        if jti not in self._filter:
+            return False
+
+        self.db_lookups += 1
+        revoked = self.db.session.get(RevokedToken, jti) is not None
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    def _check_token(self, jwt_header, jwt_payload):
+        family = jwt_payload.get('fam')
+        if self.is_revoked(jwt_payload['jti']):
+            if family and jwt_payload.get('type') == 'refresh' and not self.is_revoked(family):
+                # A rotated refresh token was replayed: end the session it came from
+                self.revoke_reused(family, jwt_payload['sub'])
+                self.db.session.commit()
+            return True
+        return family is not None and self.is_revoked(family)
+
+    def prune(self):
+        """
+        Delete revocations and used refresh tokens for tokens that have expired anyway.
+
+        Returns:
+            int: Rows deleted
+        """
+        now = datetime.utcnow()
+        deleted = 0
+        for model in (RevokedToken, UsedRefreshToken):
+            deleted += self.db.session.execute(delete(model).where(model.expires_at <= now)).rowcount
+        self.db.session.commit()
+        return deleted
+
+    def stats(self):
+        """
+        Get revocation check counters for monitoring.
+
+        Returns:
+            dict: Filter size and fill, checks, database lookups, false positives and refresh token reuses
+        """
+        return {
+            'filter_entries': self._filter.count,
+            'filter_bits': self._filter.size,
+            'filter_hashes': self._filter.hashes,
+            'refresh_seconds': self.refresh_seconds,
+            'refreshes': self.refreshes,
+            'checks': self.checks,
+            'db_lookups': self.db_lookups,
+            'false_positives': self.false_positives,
+            'refresh_token_reuses': self.reuses
+        }
+
+revocation_list = TokenRevocationList()
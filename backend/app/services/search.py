@@ -0,0 +1,166 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Table, Column, Integer, Float, MetaData, DDL, event, func, inspect, literal_column, or_, text
+from models.user import db
+from models.task import Task
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration used by both the PostgreSQL index and queries
+PG_TEXT_CONFIG = 'english'
+
+# The FTS5 trigram tokenizer can't match substrings shorter than this
+TRIGRAM_MIN_LENGTH = 3
+
+# Kept out of db.metadata so create_all/drop_all don't treat it as a regular table
+tasks_fts = Table(
+    'tasks_fts', MetaData(),
+    Column('rowid', Integer),
+    Column('rank', Float)
+)
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS "
+    f"(to_tsvector('{PG_TEXT_CONFIG}', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_search_vector ON tasks USING GIN (search_vector)",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_title_trgm ON tasks USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_description_trgm ON tasks USING GIN (description gin_trgm_ops)",
+]
+
+# Create the search structures whenever create_all() creates the tasks table
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Task.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Task.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+event.listen(Task.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS tasks_fts').execute_if(dialect='sqlite'))
+
+class SearchBackend:
+    """
+    Interface for task title/description search.
+
+    apply() returns the filtered query and an ORDER BY clause that puts
+    the best matches first (or None if the backend can't rank).
+    """
+    name = None
+
+    def apply(self, query, term):
+        raise NotImplementedError
+
+class LikeSearchBackend(SearchBackend):
+    """Unindexed LIKE '%term%' matching; the fallback for any database."""
+    name = 'like'
+
+    def apply(self, query, term):
+        search_filter = or_(
+            Task.title.contains(term),
+            Task.description.contains(term)
+        )
+        return query.filter(search_filter), None
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 trigram index: indexed substring matching ranked by bm25."""
+    name = 'sqlite_fts5'
+
+    def apply(self, query, term):
+        if len(term) < TRIGRAM_MIN_LENGTH:
+            return LikeSearchBackend().apply(query, term)
+
+        # Quote as an FTS5 phrase so the term is matched literally
+        phrase = '"' + term.replace('"', '""') + '"'
+        query = query.join(tasks_fts, tasks_fts.c.rowid == Task.id) \
+            .filter(literal_column('tasks_fts').op('MATCH')(phrase))
+
+        # FTS5 rank is bm25, where lower is a better match
+        return query, tasks_fts.c.rank.asc()
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector/GIN for word matches plus pg_trgm GIN indexes for substrings."""
+    name = 'postgresql'
+
+    def apply(self, query, term):
+        search_vector = literal_column('tasks.search_vector')
+        ts_query = func.plainto_tsquery(PG_TEXT_CONFIG, term)
+        pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+        query = query.filter(or_(
+            search_vector.op('@@')(ts_query),
+            Task.title.ilike(pattern, escape='\\'),
+            Task.description.ilike(pattern, escape='\\')
+        ))
+
+        rank = func.ts_rank(search_vector, ts_query) + func.similarity(Task.title, term)
+        return query, rank.desc()
+
+def _choose_backend(app):
+    configured = app.config.get('SEARCH_BACKEND', 'auto')
+    if configured == 'like':
+        return LikeSearchBackend()
+
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        if 'search_vector' in {column['name'] for column in inspect(db.engine).get_columns('tasks')}:
+            return PostgresSearchBackend()
+    elif dialect == 'sqlite':
+        if inspect(db.engine).has_table('tasks_fts'):
+            return SQLiteSearchBackend()
+
+    if dialect in ('postgresql', 'sqlite'):
+        logger.warning('Search index missing; falling back to LIKE search. Run `flask rebuild-search-index`.')
+    return LikeSearchBackend()
+
+def get_search_backend():
+    """
+    Get the search backend for the current app, chosen once per app.
+
+    Returns:
+        SearchBackend: Indexed backend for the database dialect, or LIKE if unavailable
+    """
+    backend = current_app.extensions.get('task_search')
+    if backend is None:
+        backend = current_app.extensions['task_search'] = _choose_backend(current_app)
+    return backend
+
+def install_search_index(db: SQLAlchemy):
+    """
+    Create (or repair) the search index for the current database and repopulate it.
+
+    Returns:
+        str: Name of the backend the index was installed for
+    """
+    dialect = db.engine.dialect.name
+
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            db.session.execute(text(statement))
+        db.session.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+        backend = SQLiteSearchBackend
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            db.session.execute(text(statement))
+        backend = PostgresSearchBackend
+    else:
+        backend = LikeSearchBackend
+
+    db.session.commit()
+    current_app.extensions.pop('task_search', None)
+    return backend.name
@@ -0,0 +1,188 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_sqlalchemy import SQLAlchemy
+from models.task import Task
+from models.task_counter import TaskCounter
+from sqlalchemy import func, insert, delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+def task_counter_key(task):
+    """Return the (user_id, status, priority) counter key for a task."""
+    return (task.user_id, task.status, task.priority)
+
+def adjust_task_counter(db: SQLAlchemy, key, delta: int):
+    """
+    Add delta to the counter for key inside the current transaction.
+
+    Uses an atomic INSERT ... ON CONFLICT DO UPDATE on SQLite and
+    PostgreSQL so concurrent writers never lose an increment.
+
+    Args:
+        db (SQLAlchemy): Database instance
+        key (tuple): (user_id, status, priority)
+        delta (int): Amount to add (negative to subtract)
+    """
+    user_id, status, priority = key
+    values = {'user_id': user_id, 'status': status, 'priority': priority, 'count': delta}
+    stmt = _upsert_statement(db)
+
+    if stmt is not None:
+        db.session.execute(stmt.values(**values))
+        return
+
+    # Generic fallback: update in place, insert if the row doesn't exist yet
+    result = db.session.execute(
+        update(TaskCounter)
+        .where(TaskCounter.user_id == user_id,
+               TaskCounter.status == status,
+               TaskCounter.priority == priority)
+        .values(count=TaskCounter.count + delta)
+    )
+    if result.rowcount == 0:
+        db.session.execute(insert(TaskCounter).values(**values))
+
+def _upsert_statement(db: SQLAlchemy):
+    """INSERT ... ON CONFLICT DO UPDATE adding to count, or None if the dialect lacks it."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        return None
+
+    dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+    stmt = dialect_insert(TaskCounter)
+    return stmt.on_conflict_do_update(
+        index_elements=['user_id', 'status', 'priority'],
+        set_={'count': TaskCounter.count + stmt.excluded.count}
+    )
+
+def record_task_change(db: SQLAlchemy, before=None, after=None):
+    """
+    Move a task between counters.
+
+    Call with only after for a create, only before for a delete, and both
+    for an update. Must run before the task write is committed so the
+    counters change in the same transaction.
+
+    Args:
+        db (SQLAlchemy): Database instance
+        before (tuple): Counter key before the change (optional)
+        after (tuple): Counter key after the change (optional)
+    """
+    if before == after:
+        return
+    if before is not None:
+        adjust_task_counter(db, before, -1)
+    if after is not None:
+        adjust_task_counter(db, after, 1)
+
+def record_task_changes(db: SQLAlchemy, changes):
+    """
+    Apply many task moves with one counter adjustment per affected key.
+
+    Used by bulk writes: the deltas are summed per (user, status,
+    priority) key and sent as one executemany upsert, so the statement
+    count does not grow with the number of tasks or keys.
+
+    Args:
+        db (SQLAlchemy): Database instance
+        changes (iterable): (before, after) key pairs as for record_task_change
+    """
+    deltas = {}
+    for before, after in changes:
+        if before == after:
+            continue
+        if before is not None:
+            deltas[before] = deltas.get(before, 0) - 1
+        if after is not None:
+            deltas[after] = deltas.get(after, 0) + 1
+
+    # Sorted so concurrent bulk writes lock counter rows in the same order
+    rows = [
+        {'user_id': user_id, 'status': status, 'priority': priority, 'count': delta}
+        for (user_id, status, priority), delta in sorted(deltas.items()) if delta
+    ]
+    if not rows:
+        return
+
+    stmt = _upsert_statement(db)
+    if stmt is not None:
+        db.session.execute(stmt, rows)
+        return
+
+    for row in rows:
+        adjust_task_counter(db, (row['user_id'], row['status'], row['priority']), row['count'])
+
+def get_counter_rows(db: SQLAlchemy, user_id: int = None):
+    """
+    Read grouped task counts from the counters table.
+
+    Costs O(#groups) rather than O(#tasks).
+
+    Args:
+        db (SQLAlchemy): Database instance
+        user_id (int): Restrict the counts to this user's tasks (optional)
+
+    Returns:
+        list: (status, priority, count) rows with non-zero counts
+    """
+    query = db.session.query(
+        TaskCounter.status,
+        TaskCounter.priority,
+        func.sum(TaskCounter.count)
+    )
+
+    if user_id is not None:
+        query = query.filter(TaskCounter.user_id == user_id)
+
+    query = query.group_by(TaskCounter.status, TaskCounter.priority)
+    return [(status, priority, int(count)) for status, priority, count in query.all() if count]
+
+def _live_counts(db: SQLAlchemy):
+    """Count tasks per counter key directly from the tasks table."""
+    rows = db.session.query(
+        Task.user_id,
+        Task.status,
+        Task.priority,
+        func.count(Task.id)
+    ).group_by(Task.user_id, Task.status, Task.priority).all()
+
+    return {(user_id, status, priority): count for user_id, status, priority, count in rows}
+
+def reconcile_task_counters(db: SQLAlchemy):
+    """
+    Compare the counters table with a live count of the tasks table.
+
+    Returns:
+        dict: {key: (counter_value, live_value)} for every key that differs
+    """
+    live = _live_counts(db)
+    stored = {
+        (counter.user_id, counter.status, counter.priority): counter.count
+        for counter in TaskCounter.query.all()
+    }
+
+    mismatches = {}
+    for key in set(live) | set(stored):
+        if live.get(key, 0) != stored.get(key, 0):
+            mismatches[key] = (stored.get(key, 0), live.get(key, 0))
+
+    return mismatches
+
+def rebuild_task_counters(db: SQLAlchemy):
+    """
+    Recompute the counters table from the tasks table and commit.
+
+    Returns:
+        int: Number of counter rows written
+    """
+    db.session.execute(delete(TaskCounter))
+    result = db.session.execute(
+        insert(TaskCounter).from_select(
+            ['user_id', 'status', 'priority', 'count'],
+            select(Task.user_id, Task.status, Task.priority, func.count(Task.id))
+            .group_by(Task.user_id, Task.status, Task.priority)
+        )
+    )
+    db.session.commit()
+    return result.rowcount
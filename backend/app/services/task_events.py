@@ -0,0 +1,386 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from services.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('task.created', 'task.updated', 'task.deleted')
+
+def event_key(event_id):
+    """Sort key for an event id ('<epoch ms>-<sequence>'); raises ValueError for anything else."""
+    epoch, sequence = event_id.split('-')
+    return int(epoch), int(sequence)
+
+def format_event(event):
+    """One event as a Server-Sent Events message."""
+    data = dumps({'type': event['type'], 'task': event['task']}).decode()
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+class TaskEventBackend:
+    """
+    Interface for task event delivery and the event log.
+
+    The default MemoryTaskEventBackend is per-process: a stream only sees
+    writes served by its own worker. A shared backend (e.g. Redis) relays
+    every worker's events to every stream; implement these three methods
+    and select it with TASK_EVENTS_BACKEND.
+    """
+
+    def publish(self, event):
+        """Append event to the log and deliver it to listeners; return its id."""
+        raise NotImplementedError
+
+    def since(self, event_id):
+        """
+        Logged events after event_id, oldest first.
+
+        Returns:
+            list: The events, or None if the log no longer reaches back to
+            event_id (or never held it)
+        """
+        raise NotImplementedError
+
+    def listen(self, deliver):
+        """Call deliver(event) for every event published from now on, by any process."""
+        raise NotImplementedError
+
+    def start(self):
+        """
+        Begin delivering to listeners in the calling process.
+
+        Called before every subscription or listener is added, so it must
+        be cheap once running. Backends that need a reader thread start it
+        here rather than in listen(), which runs at app setup: a thread
+        started then, in a gunicorn master with preload_app, does not
+        survive the fork into the workers.
+        """
+
+class MemoryTaskEventBackend(TaskEventBackend):
+    """In-process delivery, logging the last log_size events."""
+
+    def __init__(self, log_size=1000):
+        # Ids restart with each process; the epoch tells a resuming client its id is from another one
+        self.epoch = int(time.time() * 1000)
+        self._sequence = 0
+        self._log = deque(maxlen=log_size)
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        with self._lock:
+            self._sequence += 1
+            event = {**event, 'id': f'{self.epoch}-{self._sequence}'}
+            self._log.append(event)
+            listeners = list(self._listeners)
+
+        for deliver in listeners:
+            deliver(event)
+        return event['id']
+
+    def since(self, event_id):
+        epoch, sequence = event_key(event_id)
+        with self._lock:
+            if epoch != self.epoch or sequence > self._sequence:
+                return None
+            oldest = self._sequence - len(self._log) + 1
+            if sequence < oldest - 1:
+                return None
+            return list(self._log)[sequence - oldest + 1:]
+
+    def listen(self, deliver):
+        with self._lock:
+            self._listeners.append(deliver)
+
+class RedisTaskEventBackend(TaskEventBackend):
+    """
+    Events shared by every worker through a Redis stream (requires the optional `redis` package).
+
+    The stream, capped near log_size entries, is the event log; its entry
+    ids are the event ids. Each process reads it on one background thread,
+    started by its first subscriber, and relays new entries to its own
+    streams.
+    """
+
+    def __init__(self, url, log_size=1000, key='task_events'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('TASK_EVENTS_BACKEND=redis requires the redis package')
+
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self.log_size = log_size
+        self.key = key
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._reader_pid = None  # process whose reader thread is running; a forked child starts its own
+
+    @staticmethod
+    def _decode(entry_id, fields):
+        return {**json.loads(fields['event']), 'id': entry_id}
+
+    def publish(self, event):
+        return self._client.xadd(self.key, {'event': json.dumps(event)}, maxlen=self.log_size, approximate=True)
+
+    def since(self, event_id):
+        after = event_key(event_id)
+        oldest = self._client.xrange(self.key, count=1)
+        # Trimmed entries could lie between event_id and the oldest one kept
+        if not oldest or event_key(oldest[0][0]) > after:
+            return None
+        return [self._decode(*entry) for entry in self._client.xrange(self.key, min=f'({event_id}', max='+')]
+
+    def listen(self, deliver):
+        with self._lock:
+            self._listeners.append(deliver)
+
+    def start(self):
+        with self._lock:
+            if self._reader_pid == os.getpid():
+                return
+            try:
+                # Read on from the newest entry now, so nothing published before the thread's first read is lost
+                newest = self._client.xrevrange(self.key, count=1)
+                last_id = newest[0][0] if newest else '0-0'
+            except Exception:
+                logger.exception('Reading the newest task event from Redis failed')
+                last_id = '$'
+            threading.Thread(target=self._read, args=(last_id,), name='task-events', daemon=True).start()
+            self._reader_pid = os.getpid()
+
+    def _read(self, last_id):
+        while True:
+            try:
+                for _, entries in self._client.xread({self.key: last_id}, block=5000) or []:
+                    for entry_id, fields in entries:
+                        last_id = entry_id
+                        event = self._decode(entry_id, fields)
+                        for deliver in list(self._listeners):
+                            deliver(event)
+            except Exception:
+                logger.exception('Reading task events from Redis failed; retrying')
+                time.sleep(1)
+
+class Subscription:
+    """
+    One stream's pending events, bounded to max_events.
+
+    When a slow client lets the buffer fill, later events are dropped and
+    overflowed is set; the stream then ends so that the client reconnects
+    and resumes from the event log with Last-Event-ID.
+    """
+
+    def __init__(self, user_id, is_admin, max_events, notify=None):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.max_events = max_events
+        self.overflowed = False
+        # Called after each push, e.g. to wake an event loop; blocking readers use wait()
+        self.notify = notify
+        self._events = deque()
+        self._ready = threading.Condition()
+
+    def matches(self, event):
+        return self.is_admin or event['user_id'] == self.user_id
+
+    def push(self, event):
+        with self._ready:
+            if len(self._events) >= self.max_events:
+                self.overflowed = True
+            else:
+                self._events.append(event)
+            self._ready.notify()
+        if self.notify is not None:
+            self.notify()
+
+    def drain(self):
+        """Take every pending event."""
+        with self._ready:
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+    def wait(self, timeout):
+        """Take every pending event, waiting up to timeout seconds for one."""
+        with self._ready:
+            if not self._events and not self.overflowed:
+                self._ready.wait(timeout)
+        return self.drain()
+
+class TaskStream:
+    """
+    One client's change feed as Server-Sent Events text.
+
+    Nothing happens until opening(), which the blocking iterator calls
+    first. It subscribes before reading the log, so nothing written in
+    between is missed; events seen in both are sent once. A Last-Event-ID
+    the log no longer covers gets a `reset` event, telling the client to
+    reload its task list.
+    """
+
+    def __init__(self, broker, user_id, is_admin, last_event_id=None, notify=None):
+        self.broker = broker
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.last_event_id = last_event_id
+        self.notify = notify
+        self.subscription = None
+        self._last_key = None
+
+    def opening(self):
+        """Subscribe; return the reconnection delay, then a reset or the missed events."""
+        self.subscription = self.broker.subscribe(self.user_id, self.is_admin, self.notify)
+        chunk = f'retry: {self.broker.retry_ms}\n\n'
+        if not self.last_event_id:
+            return chunk
+
+        try:
+            replay = self.broker.backend.since(self.last_event_id)
+        except ValueError:
+            replay = None
+        if replay is None:
+            return chunk + 'event: reset\ndata: {}\n\n'
+
+        self._last_key = event_key(self.last_event_id)
+        return chunk + self.take(replay)
+
+    def take(self, events):
+        """SSE text for the events this client may see and has not been sent yet."""
+        chunks = []
+        for event in events:
+            key = event_key(event['id'])
+            if self._last_key is not None and key <= self._last_key:
+                continue
+            self._last_key = key
+            if self.subscription.matches(event):
+                chunks.append(format_event(event))
+        return ''.join(chunks)
+
+    def __iter__(self):
+        """Blocking generator for a WSGI response: events as they arrive, comments as heartbeats."""
+        try:
+            yield self.opening()
+            while not self.subscription.overflowed:
+                events = self.subscription.wait(self.broker.heartbeat)
+                yield self.take(events) if events else ': keep-alive\n\n'
+            yield self.take(self.subscription.drain())
+        finally:
+            self.close()
+
+    def close(self):
+        if self.subscription is not None:
+            self.broker.unsubscribe(self.subscription)
+
+class TaskEventBroker:
+    """
+    Publishes task writes to the open change feeds (GET /api/tasks/stream).
+
+    The write routes call publish() after their commit. The backend logs
+    each event and delivers it to every process; this broker hands it to
+    the matching local subscriptions: the owner's, and every admin's.
+    Settings are TASK_EVENTS_*; TASK_EVENTS_BACKEND=none disables the feed.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self._subscriptions = set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure the backend from the TASK_EVENTS_* settings."""
+        backend = app.config.get('TASK_EVENTS_BACKEND', 'memory')
+        log_size = app.config.get('TASK_EVENTS_LOG_SIZE', 1000)
+        self.buffer_size = app.config.get('TASK_EVENTS_BUFFER', 100)
+        self.heartbeat = app.config.get('TASK_EVENTS_HEARTBEAT', 15)
+        self.retry_ms = app.config.get('TASK_EVENTS_RETRY_MS', 3000)
+
+        if backend == 'none':
+            self.backend = None
+        elif backend == 'redis':
+            self.backend = RedisTaskEventBackend(app.config['TASK_EVENTS_URL'], log_size)
+        else:
+            self.backend = MemoryTaskEventBackend(log_size)
+
+        with self._lock:
+            self._subscriptions = set()
+            self._listeners = []
+        if self.backend is not None:
+            self.backend.listen(self._deliver)
+        app.extensions['task_events'] = self
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def publish(self, event_type, task, user_id):
+        """
+        Announce a committed task write.
+
+        Args:
+            event_type (str): One of EVENT_TYPES
+            task (dict): The task as the API returns it ({'id': ...} for deletions)
+            user_id (int): The task's owner
+        """
+        if self.backend is None:
+            return
+
+        try:
+            self.backend.publish({'type': event_type, 'user_id': user_id, 'task': task})
+        except Exception:
+            # The write is committed; a client that misses the event catches up on its next reload
+            logger.exception('Publishing %s for task %s failed', event_type, task.get('id'))
+
+    def subscribe(self, user_id, is_admin, notify=None):
+        self.backend.start()
+        subscription = Subscription(user_id, is_admin, self.buffer_size, notify)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def add_listener(self, callback):
+        """Call callback(event) for every event this process receives, whoever owns the task."""
+        if self.backend is not None:
+            self.backend.start()
+        with self._lock:
+            self._listeners.append(callback)
+
+    def _deliver(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception('Task event listener %r failed', callback)
+        for subscription in subscriptions:
+            if subscription.matches(event):
+                subscription.push(event)
+
+    def stats(self):
+        """
+        Get feed counters for monitoring.
+
+        Returns:
+            dict: Backend name and open streams in this process
+        """
+        with self._lock:
+            return {
+                'backend': type(self.backend).__name__ if self.backend else None,
+                'streams': len(self._subscriptions)
+            }
+
+task_events = TaskEventBroker()
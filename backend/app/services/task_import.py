@@ -0,0 +1,205 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csv
+import io
+import json
+from datetime import datetime
+from flask_sqlalchemy import SQLAlchemy
+from models.task import Task
+from routes.tasks import validate_task_data, parse_due_date
+from services.task_counters import record_task_changes
+from services.task_trends import record_trend_changes, trend_key
+from services.cache import analytics_cache
+from sqlalchemy import insert
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+
+# Fields taken from each record; anything else (id, user_id, timestamps from an export) is ignored
+IMPORT_FIELDS = ('title', 'description', 'status', 'priority', 'due_date')
+
+COPY_COLUMNS = ('title', 'description', 'status', 'priority', 'due_date', 'user_id', 'created_at', 'updated_at')
+
+def read_ndjson(stream):
+    """
+    Read newline-delimited JSON records from a binary stream one line at a time.
+
+    Yields:
+        tuple: (line_number, record, error) where error is None if the line parsed
+    """
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError:
+            yield line_number, None, 'Invalid JSON'
+
+def read_csv(stream):
+    """
+    Read CSV records (with a header line) from a binary stream one row at a time.
+
+    Yields:
+        tuple: (line_number, record, error) where error is None if the row parsed
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    for record in reader:
+        yield reader.line_num, record, None
+
+IMPORT_READERS = {
+    'ndjson': read_ndjson,
+    'csv': read_csv
+}
+
+def clean_record(record):
+    """
+    Validate one imported record with the same rules as POST /api/tasks.
+
+    Empty values are treated as missing so CSV columns can be left blank.
+    Anything the database would reject (an over-long title, a NUL
+    character) is caught here, since one bad row would otherwise fail the
+    whole batch's COPY or INSERT.
+
+    Returns:
+        tuple: (task data, error message or None)
+    """
+    if not isinstance(record, dict):
+        return None, 'Record must be an object'
+
+    data = {}
+    for field in IMPORT_FIELDS:
+        value = record.get(field)
+        if value is None or value == '':
+            continue
+        if not isinstance(value, str):
+            return None, f'{field} must be a string'
+        if '\x00' in value:
+            return None, f'{field} must not contain NUL characters'
+        data[field] = value
+
+    is_valid, error_message = validate_task_data(data)
+    if not is_valid:
+        return None, error_message
+
+    return data, None
+
+def task_row(data, user_id):
+    """Column values for a new task built from cleaned import data; insert_batch sets the timestamps."""
+    return {
+        'title': data['title'],
+        'description': data.get('description', ''),
+        'status': data.get('status', 'pending'),
+        'priority': data.get('priority', 'medium'),
+        'due_date': parse_due_date(data['due_date']) if data.get('due_date') else None,
+        'user_id': user_id
+    }
+
+def _copy_rows(db: SQLAlchemy, rows):
+    """Load rows with COPY ... FROM STDIN on the session's PostgreSQL connection."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in COPY_COLUMNS])
+    buffer.seek(0)
+
+    # Unquoted empty fields would otherwise load as NULL
+    sql = (f"COPY tasks ({', '.join(COPY_COLUMNS)}) FROM STDIN "
+           "WITH (FORMAT csv, FORCE_NOT_NULL (title, description, status, priority))")
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(sql, buffer)
+    finally:
+        cursor.close()
+
+def insert_batch(db: SQLAlchemy, rows, user_id: int):
+    """
+    Insert one batch of task rows, update the counters and trend rollups and commit.
+
+    Uses COPY on PostgreSQL and a single executemany INSERT elsewhere.
+    Rows are stamped with the time of their own batch, as a single write
+    would be: an import-wide timestamp would date late batches before syncs
+    that ran while earlier ones committed (so incremental sync never
+    returned them), and put every row on the import's first day in the
+    trend rollups.
+
+    Args:
+        db (SQLAlchemy): Database instance
+        rows (list): Column dicts from task_row
+        user_id (int): Owner of every row
+    """
+    now = datetime.utcnow()
+    for row in rows:
+        row['created_at'] = row['updated_at'] = now
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        _copy_rows(db, rows)
+    else:
+        # Core insert on the table: one DBAPI executemany per batch (the ORM bulk
+        # path splits batches whenever the set of non-NULL columns changes)
+        db.session.execute(insert(Task.__table__), rows)
+
+    record_task_changes(db, [(None, (user_id, row['status'], row['priority'])) for row in rows])
+    record_trend_changes(db, [(None, trend_key(user_id, row['status'], row['created_at'], row['updated_at'], row['due_date']))
+                              for row in rows])
+    db.session.commit()
+    analytics_cache.invalidate_user(user_id)
+
+def import_tasks(db: SQLAlchemy, records, user_id: int, batch_size: int = 5000):
+    """
+    Validate and insert imported records in batches, committing each batch.
+
+    Runs as a generator so callers can stream progress while the input is
+    still being read; only one batch of rows is held in memory at a time.
+    Events are dicts with a 'type' of:
+        error    - {'line', 'message'} for a record that was skipped
+        progress - {'processed', 'imported', 'failed'} after each committed batch
+        summary  - {'processed', 'imported', 'failed'} once, last; includes
+                   'error' if a batch could not be written (earlier batches stay committed)
+
+    Args:
+        db (SQLAlchemy): Database instance
+        records (iterable): (line_number, record, error) tuples from a reader
+        user_id (int): Owner of the imported tasks
+        batch_size (int): Rows per INSERT/COPY and per commit
+
+    Yields:
+        dict: Import events
+    """
+    processed = imported = failed = 0
+    rows = []
+
+    def counts(event_type):
+        return {'type': event_type, 'processed': processed, 'imported': imported, 'failed': failed}
+
+    try:
+        for line_number, record, error in records:
+            processed += 1
+            if error is None:
+                data, error = clean_record(record)
+
+            if error:
+                failed += 1
+                yield {'type': 'error', 'line': line_number, 'message': error}
+                continue
+
+            rows.append(task_row(data, user_id))
+            if len(rows) >= batch_size:
+                insert_batch(db, rows, user_id)
+                imported += len(rows)
+                rows = []
+                yield counts('progress')
+
+        if rows:
+            insert_batch(db, rows, user_id)
+            imported += len(rows)
+            yield counts('progress')
+
+    except Exception as e:
+        db.session.rollback()
+        summary = counts('summary')
+        summary['error'] = str(e)
+        yield summary
+        return
+
+    yield counts('summary')
@@ -0,0 +1,154 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import base64
+import json
+from datetime import datetime, timedelta
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, insert, tuple_
+from models.task import Task
+from models.task_deletion import TaskDeletion
+from services.serialization import TASK_FIELDS, rows_to_dicts
+
+
+class InvalidSyncTokenError(ValueError):
+    """Raised when a sync token cannot be decoded."""
+
+
+class SyncTokenExpiredError(ValueError):
+    """Raised when a sync token predates the retained deletion log."""
+
+
+def encode_sync_token(tasks_position, deletions_position):
+    """
+    Encode the positions reached in the tasks and the deletion log into an opaque token.
+
+    Args:
+        tasks_position (tuple): (updated_at, id) of the last task sent, or None before the first
+        deletions_position (tuple): (deleted_at, id) of the last tombstone sent
+
+    Returns:
+        str: URL-safe sync token
+    """
+    updated_at, task_id = tasks_position or (None, 0)
+    deleted_at, deletion_id = deletions_position
+    payload = json.dumps([updated_at and updated_at.isoformat(), task_id, deleted_at.isoformat(), deletion_id],
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_sync_token(token):
+    """
+    Decode a token produced by encode_sync_token.
+
+    Returns:
+        tuple: (tasks_position or None, deletions_position)
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        updated_at, task_id, deleted_at, deletion_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        tasks_position = (datetime.fromisoformat(updated_at), int(task_id)) if updated_at else None
+        return tasks_position, (datetime.fromisoformat(deleted_at), int(deletion_id))
+    except (ValueError, TypeError):
+        raise InvalidSyncTokenError('Invalid sync token')
+
+
+def record_task_deletions(db: SQLAlchemy, tasks):
+    """
+    Add tombstones for deleted tasks, committed with the delete itself.
+
+    Args:
+        db (SQLAlchemy): Database instance
+        tasks (iterable): (task_id, user_id) pairs
+    """
+    now = datetime.utcnow()
+    rows = [{'task_id': task_id, 'user_id': user_id, 'deleted_at': now} for task_id, user_id in tasks]
+    if rows:
+        db.session.execute(insert(TaskDeletion), rows)
+
+
+def prune_task_deletions(db: SQLAlchemy, retention_days):
+    """
+    Delete tombstones older than the retention period; sync tokens older than that get 410.
+
+    Returns:
+        int: Rows deleted
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    result = db.session.execute(delete(TaskDeletion).where(TaskDeletion.deleted_at < cutoff))
+    db.session.commit()
+    return result.rowcount
+
+
+def task_changes(db: SQLAlchemy, user_id, token=None, limit=500, settle_seconds=5, retention_days=30):
+    """
+    Tasks created or updated, and tombstones for tasks deleted, since a sync token.
+
+    Both are read in (timestamp, id) order from an index range scan that
+    starts at the token's position, so a sync costs O(changes) rather
+    than O(tasks). Without a token every task is returned (the initial
+    sync) and only deletions from then on.
+
+    A write can commit a little after its timestamp was taken, so the
+    token that ends a sync points settle_seconds back from now instead of
+    at the last change: the next sync sends the most recent changes again
+    rather than risk skipping a late commit. Clients apply changes as
+    upserts, so repeats are harmless.
+
+    Args:
+        db (SQLAlchemy): Database instance
+        user_id (int): Only this user's tasks, or None for every user's (admins)
+        token (str): Token from the previous response, or None
+        limit (int): Most changes and tombstones to return together
+        settle_seconds (float): How far back a completed sync's token points
+        retention_days (float): Age of the oldest tombstone kept; 0 if never pruned
+
+    Returns:
+        dict: changes, deleted, sync_token and has_more (call again at once with the new token)
+    """
+    now = datetime.utcnow()
+    if token:
+        tasks_position, deletions_position = decode_sync_token(token)
+        if retention_days and deletions_position[0] < now - timedelta(days=retention_days):
+            raise SyncTokenExpiredError('Sync token expired; download all tasks again')
+    else:
+        tasks_position, deletions_position = None, (now - timedelta(seconds=settle_seconds), 0)
+
+    # One extra row from each source tells whether another page exists
+    query = db.session.query(*[getattr(Task, field) for field in TASK_FIELDS])
+    if user_id is not None:
+        query = query.filter(Task.user_id == user_id)
+    if tasks_position:
+        query = query.filter(tuple_(Task.updated_at, Task.id) > tuple_(*tasks_position))
+    tasks = query.order_by(Task.updated_at, Task.id).limit(limit + 1).all()
+
+    query = db.session.query(TaskDeletion.id, TaskDeletion.task_id, TaskDeletion.deleted_at)
+    if user_id is not None:
+        query = query.filter(TaskDeletion.user_id == user_id)
+    query = query.filter(tuple_(TaskDeletion.deleted_at, TaskDeletion.id) > tuple_(*deletions_position))
+    deletions = query.order_by(TaskDeletion.deleted_at, TaskDeletion.id).limit(limit + 1).all()
+
+    # Oldest first across both, so a page never skips past a change it leaves out
+    merged = sorted([(task.updated_at, 0, task) for task in tasks] + [(row.deleted_at, 1, row) for row in deletions],
+                    key=lambda item: item[:2])
+    has_more = len(merged) > limit
+    page = merged[:limit]
+
+    changes = [task for _, source, task in page if source == 0]
+    deleted = [row for _, source, row in page if source == 1]
+    if has_more:
+        if changes:
+            tasks_position = (changes[-1].updated_at, changes[-1].id)
+        if deleted:
+            deletions_position = (deleted[-1].deleted_at, deleted[-1].id)
+    else:
+        settled = (now - timedelta(seconds=settle_seconds), 0)
+        tasks_position = deletions_position = settled
+
+    return {
+        'changes': rows_to_dicts(changes, TASK_FIELDS),
+        'deleted': [{'id': row.task_id, 'deleted_at': row.deleted_at} for row in deleted],
+        'sync_token': encode_sync_token(tasks_position, deletions_position),
+        'has_more': has_more
+    }
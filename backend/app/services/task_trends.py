@@ -0,0 +1,307 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, datetime, timedelta
+from flask_sqlalchemy import SQLAlchemy
+from models.task import Task
+from models.task_trend import TaskDailyStat, TaskDailyTotal
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+try:
+    import numpy
+except ImportError:  # optional; the pure-Python bucketing returns the same series, only slower
+    numpy = None
+
+# Rollup columns, in the order used by keys and delta rows
+METRICS = ('created', 'completed', 'overdue')
+
+TREND_BUCKETS = ('day', 'week')
+
+# Range returned when from= is omitted
+DEFAULT_BUCKETS = {'day': 30, 'week': 12}
+
+class InvalidTrendRangeError(ValueError):
+    """Raised when trend parameters are malformed or cover too many days."""
+
+def trend_key(user_id, status, created_at, updated_at, due_date):
+    """
+    Return the rollup days a task counts towards.
+
+    A task counts as created on the day of created_at; once completed, as
+    completed on the day of updated_at; and while not completed, on the
+    day of its due date (reported as overdue once that day has passed,
+    see get_task_trends). Tasks have no completion time, so the completed
+    day is that of the last update: editing a completed task moves it.
+
+    Returns:
+        tuple: (user_id, created day, completed day or None, overdue day or None)
+    """
+    completed = status == 'completed'
+    return (
+        user_id,
+        created_at.date(),
+        updated_at.date() if completed else None,
+        due_date.date() if due_date is not None and not completed else None
+    )
+
+def task_trend_key(task):
+    """Return the trend key for a task (or a row with the same columns); its timestamps must be set."""
+    return trend_key(task.user_id, task.status, task.created_at, task.updated_at, task.due_date)
+
+def _trend_deltas(changes):
+    """Sum (before, after) key pairs into [created, completed, overdue] deltas per (user_id, day)."""
+    deltas = {}
+    for before, after in changes:
+        if before == after:
+            continue
+        for key, sign in ((before, -1), (after, 1)):
+            if key is None:
+                continue
+            for metric, day in enumerate(key[1:]):
+                if day is not None:
+                    deltas.setdefault((key[0], day), [0, 0, 0])[metric] += sign
+    return {key: row for key, row in deltas.items() if any(row)}
+
+def _upsert_statement(db: SQLAlchemy, model, index_elements):
+    """INSERT ... ON CONFLICT DO UPDATE adding to every metric, or None if the dialect lacks it."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        return None
+
+    dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+    stmt = dialect_insert(model)
+    return stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={metric: getattr(model, metric) + getattr(stmt.excluded, metric) for metric in METRICS}
+    )
+
+def _add_rows(db: SQLAlchemy, model, index_elements, rows):
+    stmt = _upsert_statement(db, model, index_elements)
+    if stmt is not None:
+        db.session.execute(stmt, rows)
+        return
+
+    # Generic fallback: update in place, insert if the row doesn't exist yet
+    for row in rows:
+        result = db.session.execute(
+            update(model)
+            .where(*[getattr(model, column) == row[column] for column in index_elements])
+            .values(**{metric: getattr(model, metric) + row[metric] for metric in METRICS})
+        )
+        if result.rowcount == 0:
+            db.session.execute(insert(model).values(**row))
+
+def _apply_deltas(db: SQLAlchemy, deltas):
+    """Add per (user_id, day) deltas to the user rollup and, summed per day, to the totals rollup."""
+    if not deltas:
+        return
+
+    totals = {}
+    for (_, day), row in deltas.items():
+        total = totals.setdefault(day, [0, 0, 0])
+        for metric, count in enumerate(row):
+            total[metric] += count
+
+    # Sorted so concurrent writers lock rollup rows in the same order
+    _add_rows(db, TaskDailyStat, ('user_id', 'day'), [
+        {'user_id': user_id, 'day': day, **dict(zip(METRICS, row))}
+        for (user_id, day), row in sorted(deltas.items())
+    ])
+    total_rows = [{'day': day, **dict(zip(METRICS, row))} for day, row in sorted(totals.items()) if any(row)]
+    if total_rows:
+        _add_rows(db, TaskDailyTotal, ('day',), total_rows)
+
+def record_trend_change(db: SQLAlchemy, before=None, after=None):
+    """
+    Move a task between daily rollup rows.
+
+    Call with only after for a create, only before for a delete, and both
+    for an update, before the task write is committed, as for
+    record_task_change. Costs two statements when a day changes (the user
+    and the totals rollup) and none otherwise.
+
+    Args:
+        db (SQLAlchemy): Database instance
+        before (tuple): Trend key before the change (optional)
+        after (tuple): Trend key after the change (optional)
+    """
+    _apply_deltas(db, _trend_deltas([(before, after)]))
+
+def record_trend_changes(db: SQLAlchemy, changes):
+    """
+    Apply many task moves with one executemany upsert per rollup table.
+
+    Args:
+        db (SQLAlchemy): Database instance
+        changes (iterable): (before, after) key pairs as for record_trend_change
+    """
+    _apply_deltas(db, _trend_deltas(changes))
+
+def _live_trend_batches(db: SQLAlchemy, batch_size):
+    """Yield rollup deltas computed from the tasks table, batch_size tasks at a time in id order."""
+    last_id = 0
+    while True:
+        rows = db.session.query(Task.id, Task.user_id, Task.status, Task.created_at, Task.updated_at, Task.due_date) \
+            .filter(Task.id > last_id).order_by(Task.id).limit(batch_size).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield _trend_deltas((None, task_trend_key(row)) for row in rows)
+
+def rebuild_task_trends(db: SQLAlchemy, batch_size=5000):
+    """
+    Recompute both rollup tables from the tasks table and commit.
+
+    Tasks are read and aggregated batch_size at a time, so memory does not
+    grow with the table; the whole rebuild is one transaction, so readers
+    never see a partly filled rollup. As with rebuild_task_counters, writes
+    made while it runs can be counted twice: run it when writes are paused,
+    then check with `flask rebuild-task-trends --check`.
+
+    Returns:
+        int: Number of user rollup rows written
+    """
+    db.session.execute(delete(TaskDailyStat))
+    db.session.execute(delete(TaskDailyTotal))
+    rows = set()
+    for deltas in _live_trend_batches(db, batch_size):
+        _apply_deltas(db, deltas)
+        rows.update(deltas)
+    db.session.commit()
+    return len(rows)
+
+def reconcile_task_trends(db: SQLAlchemy, batch_size=5000):
+    """
+    Compare both rollup tables with the tasks table.
+
+    Returns:
+        dict: {(user_id, day): (stored, live)} for every row that differs, with
+            user_id None for the totals rollup and [created, completed, overdue] values
+    """
+    live = {}
+    for deltas in _live_trend_batches(db, batch_size):
+        for (user_id, day), row in deltas.items():
+            for key in ((user_id, day), (None, day)):
+                counts = live.setdefault(key, [0, 0, 0])
+                for metric, count in enumerate(row):
+                    counts[metric] += count
+
+    stored = {(row.user_id, row.day): [row.created, row.completed, row.overdue] for row in TaskDailyStat.query.all()}
+    stored.update({(None, row.day): [row.created, row.completed, row.overdue] for row in TaskDailyTotal.query.all()})
+
+    mismatches = {}
+    for key in set(live) | set(stored):
+        if live.get(key, [0, 0, 0]) != stored.get(key, [0, 0, 0]):
+            mismatches[key] = (stored.get(key, [0, 0, 0]), live.get(key, [0, 0, 0]))
+    return mismatches
+
+def _parse_day(value, name):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise InvalidTrendRangeError(f'{name} must be a date (YYYY-MM-DD)')
+
+def trend_range(bucket='day', start=None, end=None, max_days=1100):
+    """
+    Validate trend parameters and resolve the days they cover.
+
+    Weekly ranges are widened to whole ISO weeks (Monday to Sunday).
+
+    Args:
+        bucket (str): 'day' or 'week'
+        start (str): First day (YYYY-MM-DD); defaults to the last 30 days or 12 weeks
+        end (str): Last day (YYYY-MM-DD); defaults to today (UTC)
+        max_days (int): Most days a range may cover
+
+    Returns:
+        tuple: (first day, last day)
+    """
+    if bucket not in TREND_BUCKETS:
+        raise InvalidTrendRangeError(f"bucket must be one of: {', '.join(TREND_BUCKETS)}")
+
+    width = 7 if bucket == 'week' else 1
+    end = _parse_day(end, 'to') if end else datetime.utcnow().date()
+    start = _parse_day(start, 'from') if start else end - timedelta(days=DEFAULT_BUCKETS[bucket] * width - 1)
+    if bucket == 'week':
+        start -= timedelta(days=start.weekday())
+        end += timedelta(days=6 - end.weekday())
+
+    if start > end:
+        raise InvalidTrendRangeError('from must not be after to')
+    if (end - start).days + 1 > max_days:
+        raise InvalidTrendRangeError(f'Range covers more than {max_days} days')
+    return start, end
+
+def _bucket_series(offsets, counts, days, width):
+    """
+    Sum daily counts into buckets of width days.
+
+    Args:
+        offsets (list): Day index of each count row, from 0
+        counts (list): [created, completed, overdue] per row
+        days (int): Days in the range, a multiple of width
+        width (int): Days per bucket
+
+    Returns:
+        list: One list of bucket totals per metric
+    """
+    if numpy is not None:
+        series = numpy.zeros((days, len(METRICS)), dtype=numpy.int64)
+        if offsets:
+            series[numpy.asarray(offsets)] = numpy.asarray(counts, dtype=numpy.int64)
+        return series.reshape(-1, width, len(METRICS)).sum(axis=1).T.tolist()
+
+    series = [[0] * (days // width) for _ in METRICS]
+    for offset, row in zip(offsets, counts):
+        for metric, count in enumerate(row):
+            series[metric][offset // width] += count
+    return series
+
+def get_task_trends(db: SQLAlchemy, start, end, bucket='day', user_id: int = None, today=None):
+    """
+    Tasks created, completed and overdue per day or week.
+
+    Reads one rollup row per day with data from task_daily_totals (every
+    user) or task_daily_stats (one user) by primary key range, so a
+    two-year global trend reads at most 731 rows however many tasks and
+    users there are; the tasks table is not touched. The rollups count
+    open tasks by due day whether or not it has passed; only days before
+    today are reported as overdue.
+
+    Args:
+        db (SQLAlchemy): Database instance
+        start (date): First day, from trend_range
+        end (date): Last day, from trend_range
+        bucket (str): 'day' or 'week'
+        user_id (int): Restrict the trend to this user's tasks (optional)
+        today (date): First day not yet overdue; defaults to today (UTC)
+
+    Returns:
+        dict: bucket, from, to, the start day of each bucket, one series per
+            metric aligned with them, and totals over the range
+    """
+    model = TaskDailyTotal if user_id is None else TaskDailyStat
+    query = db.session.query(model.day, model.created, model.completed, model.overdue) \
+        .filter(model.day >= start, model.day <= end)
+    if user_id is not None:
+        query = query.filter(model.user_id == user_id)
+    rows = query.all()
+
+    today = today or datetime.utcnow().date()
+    counts = [(row.created, row.completed, row.overdue if row.day < today else 0) for row in rows]
+
+    days = (end - start).days + 1
+    width = 7 if bucket == 'week' else 1
+    first = start.toordinal()
+    series = _bucket_series([row.day.toordinal() - first for row in rows], counts, days, width)
+
+    return {
+        'bucket': bucket,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'buckets': [(start + timedelta(days=offset)).isoformat() for offset in range(0, days, width)],
+        **dict(zip(METRICS, series)),
+        'totals': {metric: sum(values) for metric, values in zip(METRICS, series)}
+    }
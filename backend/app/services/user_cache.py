@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+from flask_sqlalchemy import SQLAlchemy
+from models.user import User
+from services.cache import MemoryCacheBackend, _MISSING
+
+class UserCache:
+    """
+    In-process cache of user profiles keyed by id, with version checks.
+
+    Each entry holds the user's to_dict() and `version`. A profile change
+    bumps User.version and drops the entry in the process that made it.
+    Access tokens carry the version they were issued at (`ver`), so a
+    token newer than a cached entry forces a reload; otherwise staleness
+    on other workers is bounded by USER_CACHE_TTL.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 0
+        self._lock = threading.Lock()
+        self._reset_stats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure from USER_CACHE_TTL and USER_CACHE_SIZE; a TTL of 0 disables caching."""
+        self.ttl = app.config.get('USER_CACHE_TTL', 30)
+        self.backend = MemoryCacheBackend(app.config.get('USER_CACHE_SIZE', 10000)) if self.ttl > 0 else None
+        self._reset_stats()
+        app.extensions['user_cache'] = self
+
+    def _reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(user_id):
+        return f'user:{user_id}'
+
+    def get_user(self, db: SQLAlchemy, user_id, min_version=None):
+        """
+        Get a user's profile, loading it on a miss or when the entry is too old.
+
+        Args:
+            db (SQLAlchemy): Database instance
+            user_id (int): User ID
+            min_version (int): Version the caller knows of (the token's `ver`), if any
+
+        Returns:
+            dict: {'user': to_dict(), 'version': int}, or None if the user does not exist
+        """
+        key = self._key(user_id)
+        if self.backend is not None:
+            entry = self.backend.get(key)
+            if entry is not _MISSING and (min_version is None or entry['version'] >= min_version):
+                with self._lock:
+                    self.hits += 1
+                return entry
+
+        with self._lock:
+            self.misses += 1
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+
+        return self.store(user)
+
+    def store(self, user):
+        """Cache a freshly loaded or updated user; returns the cached entry."""
+        entry = {'user': user.to_dict(), 'version': user.version}
+        if self.backend is not None:
+            self.backend.set(self._key(user.id), entry, self.ttl)
+        return entry
+
+    def invalidate(self, user_id):
+        """Drop a user's entry after a change."""
+        if self.backend is None:
+            return
+        self.backend.delete(self._key(user_id))
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self):
+        """
+        Get cache counters for monitoring.
+
+        Returns:
+            dict: Entry count, TTL, hits, misses, invalidations and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.backend) if self.backend else 0,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0
+        }
+
+user_cache = UserCache()
@@ -0,0 +1,14 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import create_app
+from models.user import db
+
+# Production entry point: gunicorn --config gunicorn.conf.py wsgi:app
+app = create_app()
+
+# create_app() opens database connections for its startup work. Close them
+# before gunicorn forks (preload_app) so workers never share a socket.
+with app.app_context():
+    db.engine.dispose()
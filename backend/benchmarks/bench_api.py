@@ -0,0 +1,355 @@
+"""
+Benchmark latency and throughput of every auth, tasks and analytics route.
+
+For each dataset size, seeds users and tasks with datagen.py, then sends
+--requests requests per scenario and records p50/p95/p99 latency and
+throughput. By default requests go through the Flask test client
+against a throwaway SQLite database per size, which also records SQL
+statements per request. With --url they go to a running server over
+keep-alive HTTP connections from --concurrency threads; the server must
+use the same DATABASE_URL as this script, which seeds it directly (the
+database is reset between sizes, so point it at a scratch database).
+Start that server with RATE_LIMIT_ENABLED=false, or its per-user and
+per-IP limits will reject most of this single client's requests.
+
+Results are written as JSON (with the git commit) for compare.py.
+
+Usage:
+    python benchmarks/bench_api.py [--sizes 1000,10000,100000] [--requests 200]
+        [--scenarios list,get,...] [--url http://localhost:5000 --concurrency 16] [--output results.json]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from datagen import USER_PASSWORD, default_users, reset_database, seed_database
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+BULK_SIZE = 100
+
+
+class TestClientTransport:
+    """Requests through the Flask test client, in this process."""
+
+    def __init__(self, app):
+        self.app = app
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        payload = {'data': body} if isinstance(body, bytes) else {'json': body}
+        response = self.client.open(path, method=method, headers=headers or {}, **payload)
+        data = response.get_data()
+        return response.status_code, _decode(response.content_type, data)
+
+
+class HTTPTransport:
+    """Requests to a running server, one keep-alive connection per thread."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+
+        headers = {'Content-Type': 'application/json', **(headers or {})}
+        payload = body if isinstance(body, bytes) else json.dumps(body) if body is not None else None
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self.local.conn = None
+            return None, None
+        return response.status, _decode(response.getheader('Content-Type', ''), data)
+
+
+def _decode(content_type, data):
+    if data and content_type.startswith('application/json'):
+        return json.loads(data)
+    return None
+
+
+class Session:
+    """Logged-in state shared by the scenarios of one dataset size."""
+
+    def __init__(self, transport, user_ids):
+        self.transport = transport
+        self.user = self.login(f'bench_{len(user_ids) // 2 + 1}')  # a typical, not the heaviest, owner
+        self.admin = self.login('admin', 'admin123')
+        status, data = transport.request('GET', '/api/tasks?pagination=cursor&per_page=100', headers=self.user)
+        self.task_ids = [task['id'] for task in data['tasks']] or [0]
+        self.created = []  # ids made by create scenarios, consumed by delete scenarios
+        self.registered = 0
+        self.lock = threading.Lock()
+
+    def login(self, username, password=USER_PASSWORD):
+        status, data = self.transport.request('POST', '/api/auth/login', {'username': username, 'password': password})
+        if status != 200:
+            raise SystemExit(f'Login as {username} failed ({status}): {data}')
+        return {'Authorization': f"Bearer {data['access_token']}"}
+
+    def take_created(self, count):
+        with self.lock:
+            taken, self.created[:count] = self.created[:count], []
+        return taken
+
+    def next_registration(self):
+        with self.lock:
+            self.registered += 1
+            return f'bench_new_{os.getpid()}_{self.registered}'
+
+
+def scenarios(session):
+    """
+    Named scenarios as (route group, zero-argument function returning (status, response data)).
+
+    Write scenarios run after reads; delete scenarios consume tasks made by
+    the create scenarios before them.
+    """
+    def call(method, path, body=None, admin=False):
+        return session.transport.request(method, path, body, session.admin if admin else session.user)
+
+    def register():
+        name = session.next_registration()
+        return session.transport.request('POST', '/api/auth/register', {
+            'username': name, 'email': f'{name}@example.com', 'password': USER_PASSWORD
+        })
+
+    def create():
+        status, data = call('POST', '/api/tasks', {'title': 'Benchmark create', 'priority': 'high'})
+        if status == 201:
+            with session.lock:
+                session.created.append(data['task']['id'])
+        return status, data
+
+    def bulk_create():
+        status, data = call('POST', '/api/tasks/bulk', {'tasks': [
+            {'title': f'Benchmark bulk {i}', 'priority': random.choice(['low', 'medium', 'high'])} for i in range(BULK_SIZE)
+        ]})
+        if status == 201:
+            with session.lock:
+                session.created.extend(result['id'] for result in data['results'])
+        return status, data
+
+    def delete():
+        ids = session.take_created(1)
+        return call('DELETE', f'/api/tasks/{ids[0] if ids else 0}')
+
+    def bulk_delete():
+        return call('DELETE', '/api/tasks/bulk', {'ids': session.take_created(BULK_SIZE)})
+
+    import_body = ''.join(json.dumps({'title': f'Imported {i}', 'status': 'pending'}) + '\n' for i in range(BULK_SIZE))
+
+    return {
+        'health': ('health', lambda: session.transport.request('GET', '/health')),
+        'login': ('auth', lambda: session.transport.request('POST', '/api/auth/login', {
+            'username': 'bench_1', 'password': USER_PASSWORD
+        })),
+        'profile': ('auth', lambda: call('GET', '/api/auth/profile')),
+        'list': ('tasks', lambda: call('GET', '/api/tasks?per_page=20')),
+        'list_deep_offset': ('tasks', lambda: call('GET', '/api/tasks?page=50&per_page=20', admin=True)),
+        'list_cursor': ('tasks', lambda: call('GET', '/api/tasks?pagination=cursor&per_page=100')),
+        'list_filtered': ('tasks', lambda: call('GET', '/api/tasks?status=pending&priority=high&per_page=20')),
+        'list_search': ('tasks', lambda: call('GET', '/api/tasks?search=report&per_page=20')),
+        'list_sparse': ('tasks', lambda: call('GET', '/api/tasks?fields=id,title,status&per_page=100')),
+        'list_admin': ('tasks', lambda: call('GET', '/api/tasks?per_page=20', admin=True)),
+        'get': ('tasks', lambda: call('GET', f'/api/tasks/{random.choice(session.task_ids)}')),
+        'export': ('tasks', lambda: call('GET', '/api/tasks/export?format=ndjson')),
+        'statistics': ('analytics', lambda: call('GET', '/api/analytics/statistics')),
+        'statistics_admin': ('analytics', lambda: call('GET', '/api/analytics/statistics', admin=True)),
+        'priority': ('analytics', lambda: call('GET', '/api/analytics/priority')),
+        'status': ('analytics', lambda: call('GET', '/api/analytics/status')),
+        'summary': ('analytics', lambda: call('GET', '/api/analytics/summary')),
+        'summary_admin': ('analytics', lambda: call('GET', '/api/analytics/summary', admin=True)),
+        'cache': ('analytics', lambda: call('GET', '/api/analytics/cache', admin=True)),
+        'register': ('auth', register),
+        'profile_update': ('auth', lambda: call('PUT', '/api/auth/profile', {'email': f'typical_{random.random()}@example.com'})),
+        'create': ('tasks', create),
+        'update': ('tasks', lambda: call('PUT', f'/api/tasks/{random.choice(session.task_ids)}', {
+            'status': random.choice(['pending', 'in_progress', 'completed'])
+        })),
+        'bulk_create': ('tasks', bulk_create),
+        'bulk_update': ('tasks', lambda: call('PUT', '/api/tasks/bulk', {'tasks': [
+            {'id': task_id, 'priority': random.choice(['low', 'medium', 'high'])}
+            for task_id in random.sample(session.task_ids, min(BULK_SIZE, len(session.task_ids)))
+        ]})),
+        'import': ('tasks', lambda: call('POST', '/api/tasks/import?format=ndjson', import_body.encode())),
+        'delete': ('tasks', delete),
+        'bulk_delete': ('tasks', bulk_delete),
+    }
+
+
+def run_scenario(func, requests, concurrency, count_queries=None):
+    """Send requests calls of func from concurrency threads; return latencies (ms), errors and elapsed seconds."""
+    latencies = []
+    errors = [0]
+    statements = []
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def worker():
+        local, local_errors = [], 0
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    break
+            begin = time.perf_counter()
+            status, _ = func()
+            local.append((time.perf_counter() - begin) * 1000)
+            if status is None or status >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    begin = time.perf_counter()
+    if count_queries is not None:
+        # Single thread, so the statements counted are this scenario's
+        with count_queries() as statements:
+            worker()
+    else:
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return latencies, errors[0], time.perf_counter() - begin, len(statements)
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def git_commit():
+    """Short commit hash of the working tree, with +dirty for local changes, or None."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+dirty' if dirty else '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Task counts, e.g. 1000,100000,5000000')
+    parser.add_argument('--users', type=int, help='Users per size (default: tasks / 1000, at least 10)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--scenarios', help='Comma-separated subset (default: all)')
+    parser.add_argument('--url', help='Benchmark a running server instead of the test client')
+    parser.add_argument('--concurrency', type=int, default=16, help='Client threads with --url')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/api-<commit>-<time>.json)')
+    args = parser.parse_args()
+
+    db_file = None
+    if args.url:
+        if not os.environ.get('DATABASE_URL'):
+            raise SystemExit('--url needs DATABASE_URL set to the database the server uses')
+    else:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from main import create_app
+    from models.user import db
+    from services.migrations import upgrade_database
+    from services.query_budget import count_queries
+
+    app = create_app()
+    # Measure the routes, not admission control (which would see a single client address)
+    app.config['RATE_LIMIT_ENABLED'] = False
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'mode': 'server' if args.url else 'test_client',
+        'url': args.url,
+        'concurrency': args.concurrency if args.url else 1,
+        'requests_per_scenario': args.requests,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sizes': []
+    }
+
+    try:
+        with app.app_context():
+            upgrade_database(db)
+            report['database'] = db.engine.dialect.name
+
+        for size in [int(size) for size in args.sizes.split(',')]:
+            users = args.users or default_users(size)
+            with app.app_context():
+                reset_database(db)
+                begin = time.perf_counter()
+                user_ids = seed_database(db, users, size, seed=args.seed)
+                seed_seconds = time.perf_counter() - begin
+                engine = db.engine
+
+            random.seed(args.seed)
+            transport = HTTPTransport(args.url) if args.url else TestClientTransport(app)
+            session = Session(transport, user_ids)
+            available = scenarios(session)
+            names = args.scenarios.split(',') if args.scenarios else list(available)
+
+            print(f'{size:,} tasks, {users:,} users (seeded in {seed_seconds:.1f}s), {args.requests} requests per scenario')
+            print(f"  {'scenario':<18} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'queries':>8}")
+            results = []
+            for name in names:
+                group, func = available[name]
+                latencies, errors, elapsed, statements = run_scenario(
+                    func, args.requests, args.concurrency,
+                    count_queries=None if args.url else (lambda: count_queries(engine))
+                )
+                latencies.sort()
+                result = {
+                    'scenario': name,
+                    'group': group,
+                    'requests': len(latencies),
+                    'errors': errors,
+                    'rps': round(len(latencies) / elapsed, 1),
+                    'mean_ms': round(sum(latencies) / len(latencies), 3),
+                    'p50_ms': round(percentile(latencies, 0.50), 3),
+                    'p95_ms': round(percentile(latencies, 0.95), 3),
+                    'p99_ms': round(percentile(latencies, 0.99), 3),
+                    'max_ms': round(latencies[-1], 3),
+                }
+                if not args.url:
+                    result['queries_per_request'] = round(statements / len(latencies), 2)
+                results.append(result)
+                print(f"  {name:<18} {result['rps']:>9.0f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                      f"{result['p99_ms']:>8.2f} {errors:>7} {result.get('queries_per_request', ''):>8}")
+
+            report['sizes'].append({'tasks': size, 'users': users, 'seed_seconds': round(seed_seconds, 2), 'results': results})
+    finally:
+        if db_file:
+            os.unlink(db_file.name)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"api-{commit or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as results_file:
+        json.dump(report, results_file, indent=2)
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
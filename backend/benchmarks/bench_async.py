@@ -0,0 +1,243 @@
+"""
+Benchmark the sync (gunicorn, wsgi.py) and async (uvicorn, asgi.py) servers on the read routes at high concurrency.
+
+Seeds one database with datagen.py, then for each --modes entry starts
+that server on it with the same number of --workers processes (sync
+workers get --threads threads each) and, for every --concurrency level,
+keeps that many keep-alive connections busy with each read scenario for
+--duration seconds. The client is a single asyncio event loop, so it
+can hold thousands of connections without becoming the bottleneck.
+
+The async path pays off when requests spend their time waiting on the
+database. A local SQLite file answers in microseconds, so for numbers
+that reflect production set DATABASE_URL to a scratch PostgreSQL
+database (reset and seeded by this script), ideally over the network.
+Needs gunicorn, uvicorn, SQLAlchemy's asyncio extra (greenlet) and
+aiosqlite or asyncpg. Both servers run with RATE_LIMIT_ENABLED=false.
+
+Usage:
+    python benchmarks/bench_async.py [--tasks 10000] [--modes sync,async] [--workers 2] [--threads 4]
+        [--concurrency 16,128,512] [--duration 10] [--scenarios list,get,summary] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(BACKEND_DIR, 'app'))
+
+from bench_api import RESULTS_DIR, git_commit, percentile
+from datagen import USER_PASSWORD, default_users, reset_database, seed_database
+
+
+def server_command(mode, port, workers):
+    """Command line starting the sync or async server from the backend directory."""
+    if mode == 'sync':
+        return [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}',
+                '--access-logfile', os.devnull, 'wsgi:app']
+    return [sys.executable, '-m', 'uvicorn', '--app-dir', 'app', '--host', '127.0.0.1', '--port', str(port),
+            '--workers', str(workers), '--no-access-log', 'asgi:app']
+
+
+def start_server(mode, port, workers, threads):
+    """Start a server and wait for /health; return the process."""
+    env = {**os.environ, 'RATE_LIMIT_ENABLED': 'false', 'WEB_CONCURRENCY': str(workers),
+           'GUNICORN_THREADS': str(threads), 'GUNICORN_LOG_LEVEL': 'warning'}
+    process = subprocess.Popen(server_command(mode, port, workers), cwd=BACKEND_DIR, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'The {mode} server exited with code {process.returncode}')
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f'The {mode} server did not start within 30s')
+
+
+async def http_request(reader, writer, path, token):
+    """One GET on a keep-alive connection; return the status code."""
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer {token}\r\n\r\n'.encode())
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def run_level(port, token, make_path, concurrency, duration):
+    """Keep concurrency connections busy for duration seconds; return latencies (ms) and error count."""
+    deadline = time.perf_counter() + duration
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            while time.perf_counter() < deadline:
+                begin = time.perf_counter()
+                try:
+                    status = await http_request(reader, writer, make_path(), token)
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                    errors += 1
+                    writer.close()
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                    continue
+                latencies.append((time.perf_counter() - begin) * 1000)
+                if status >= 400:
+                    errors += 1
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def login(port, username):
+    """Access token for a seeded user."""
+    request = urllib.request.Request(
+        f'http://127.0.0.1:{port}/api/auth/login', method='POST',
+        data=json.dumps({'username': username, 'password': USER_PASSWORD}).encode(),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())['access_token']
+
+
+def first_page_ids(port, token):
+    """IDs for the get scenario: the benchmark user's newest tasks."""
+    request = urllib.request.Request(f'http://127.0.0.1:{port}/api/tasks?pagination=cursor&per_page=100',
+                                     headers={'Authorization': f'Bearer {token}'})
+    with urllib.request.urlopen(request) as response:
+        return [task['id'] for task in json.loads(response.read())['tasks']] or [0]
+
+
+def scenarios(task_ids):
+    """Named read scenarios, each a function returning the next path to request."""
+    return {
+        'list': lambda: '/api/tasks?per_page=20',
+        'list_cursor': lambda: '/api/tasks?pagination=cursor&per_page=100',
+        'list_filtered': lambda: '/api/tasks?status=pending&priority=high&per_page=20',
+        'get': lambda: f'/api/tasks/{random.choice(task_ids)}',
+        'statistics': lambda: '/api/analytics/statistics',
+        'summary': lambda: '/api/analytics/summary',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--modes', default='sync,async')
+    parser.add_argument('--workers', type=int, default=2, help='Server processes for every mode')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per sync worker (GUNICORN_THREADS)')
+    parser.add_argument('--concurrency', default='16,128,512', help='Open connections, e.g. 64,1024')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per scenario and level')
+    parser.add_argument('--scenarios', default='list,get,summary')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/async-<commit>-<time>.json)')
+    args = parser.parse_args()
+
+    db_file = None
+    if not os.environ.get('DATABASE_URL'):
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from main import create_app
+    from models.user import db
+    from services.migrations import upgrade_database
+
+    app = create_app()
+    commit = git_commit()
+    levels = [int(level) for level in args.concurrency.split(',')]
+    users = default_users(args.tasks)
+    report = {
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'tasks': args.tasks,
+        'users': users,
+        'workers': args.workers,
+        'threads': args.threads,
+        'duration': args.duration,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'modes': []
+    }
+
+    try:
+        with app.app_context():
+            upgrade_database(db)
+            reset_database(db)
+            seed_database(db, users, args.tasks, seed=args.seed)
+            report['database'] = db.engine.dialect.name
+            db.engine.dispose()
+
+        for mode in args.modes.split(','):
+            process = start_server(mode, args.port, args.workers, args.threads)
+            try:
+                token = login(args.port, f'bench_{users // 2 + 1}')
+                available = scenarios(first_page_ids(args.port, token))
+
+                print(f'{mode}: {args.workers} workers' + (f' x {args.threads} threads' if mode == 'sync' else '')
+                      + f', {args.tasks:,} tasks on {report["database"]}')
+                print(f"  {'scenario':<14} {'conns':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+                results = []
+                for name in args.scenarios.split(','):
+                    for concurrency in levels:
+                        random.seed(args.seed)
+                        latencies, errors = asyncio.run(
+                            run_level(args.port, token, available[name], concurrency, args.duration)
+                        )
+                        latencies.sort()
+                        result = {
+                            'scenario': name,
+                            'concurrency': concurrency,
+                            'requests': len(latencies),
+                            'errors': errors,
+                            'rps': round(len(latencies) / args.duration, 1),
+                            'p50_ms': round(percentile(latencies, 0.50), 3) if latencies else None,
+                            'p99_ms': round(percentile(latencies, 0.99), 3) if latencies else None,
+                            'max_ms': round(latencies[-1], 3) if latencies else None,
+                        }
+                        results.append(result)
+                        print(f"  {name:<14} {concurrency:>6} {result['rps']:>9.0f} {result['p50_ms'] or 0:>8.1f} "
+                              f"{result['p99_ms'] or 0:>8.1f} {result['max_ms'] or 0:>8.1f} {errors:>7}")
+                report['modes'].append({'mode': mode, 'results': results})
+            finally:
+                process.terminate()
+                process.wait()
+    finally:
+        if db_file:
+            os.unlink(db_file.name)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"async-{commit or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as results_file:
+        json.dump(report, results_file, indent=2)
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
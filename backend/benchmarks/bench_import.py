@@ -0,0 +1,113 @@
+"""
+Benchmark import throughput (rows per second) for POST /api/tasks/import.
+
+Generates an NDJSON and a CSV file in memory and uploads each to a
+throwaway SQLite database through the Flask test client, once per batch
+size. Run against PostgreSQL by setting BENCH_DATABASE_URL (tasks are
+deleted between runs) to measure the COPY path.
+
+Usage:
+    python benchmarks/bench_import.py [--tasks 200000] [--batch-sizes 1000,5000,20000]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+STATUSES = ['pending', 'in_progress', 'completed']
+PRIORITIES = ['low', 'medium', 'high']
+FIELDS = ['title', 'description', 'status', 'priority', 'due_date']
+
+
+def generate(count):
+    """Return (ndjson bytes, csv bytes) for count random tasks."""
+    rng = random.Random(42)
+    records = [
+        {
+            'title': f'Imported task {i}',
+            'description': 'Legacy task ' * rng.randint(1, 8),
+            'status': rng.choice(STATUSES),
+            'priority': rng.choice(PRIORITIES),
+            'due_date': f'2030-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T09:00:00' if rng.random() < 0.5 else ''
+        }
+        for i in range(count)
+    ]
+
+    ndjson = ''.join(json.dumps(record) + '\n' for record in records)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(records)
+    return ndjson.encode(), buffer.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=200000)
+    parser.add_argument('--batch-sizes', default='1000,5000,20000')
+    args = parser.parse_args()
+
+    db_file = None
+    if os.environ.get('BENCH_DATABASE_URL'):
+        os.environ['DATABASE_URL'] = os.environ['BENCH_DATABASE_URL']
+    else:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from flask_jwt_extended import create_access_token
+    from main import create_app
+    from models.user import db, User
+    from models.task import Task
+    from services.migrations import upgrade_database
+    from services.task_counters import rebuild_task_counters
+
+    app = create_app()
+    # Measure the routes, not admission control (which would see a single client address)
+    app.config['RATE_LIMIT_ENABLED'] = False
+    try:
+        with app.app_context():
+            upgrade_database(db)
+            user = User.query.filter_by(username='bench').first()
+            if not user:
+                user = User(username='bench', email='bench@example.com')
+                user.set_password('Bench1234')
+                db.session.add(user)
+                db.session.commit()
+            token = create_access_token(identity=user.id)
+            dialect = db.engine.dialect.name
+
+        headers = {'Authorization': f'Bearer {token}'}
+        client = app.test_client()
+        payloads = dict(zip(('ndjson', 'csv'), generate(args.tasks)))
+
+        print(f'{args.tasks} rows per run on {dialect}')
+        for batch_size in [int(size) for size in args.batch_sizes.split(',')]:
+            app.config['IMPORT_BATCH_SIZE'] = batch_size
+            for import_format, body in payloads.items():
+                with app.app_context():
+                    db.session.query(Task).delete()
+                    db.session.commit()
+                    rebuild_task_counters(db)
+
+                begin = time.perf_counter()
+                response = client.post(f'/api/tasks/import?format={import_format}', headers=headers, data=body)
+                summary = json.loads(response.get_data(as_text=True).splitlines()[-1])
+                elapsed = time.perf_counter() - begin
+
+                assert summary['imported'] == args.tasks, summary
+                print(f'  batch={batch_size:<6} {import_format:<7} {elapsed:7.2f}s {args.tasks / elapsed:12,.0f} rows/s')
+    finally:
+        if db_file:
+            os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark JWT sign and verify throughput for each signing algorithm.
+
+Tokens are created and decoded through flask-jwt-extended with the same
+claims login issues, so the numbers include its claim handling. Keys for
+RS256, ES256 and EdDSA are generated for the run (these need the
+cryptography package; algorithms that cannot run are skipped). Each
+asymmetric algorithm is measured twice: with the key objects
+services/jwt_keys.py caches, and with PEM text handed to PyJWT on every
+call, which is what configuring keys as plain strings costs.
+
+Usage:
+    python benchmarks/bench_jwt.py [--algorithms HS256,RS256,ES256,EdDSA] [--operations 2000]
+        [--threads 1] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from bench_api import RESULTS_DIR, git_commit, percentile
+
+
+def generate_keys(algorithm):
+    """PEM private and public keys for an asymmetric algorithm."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    if algorithm.startswith(('RS', 'PS')):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == 'ES256':
+        key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == 'EdDSA':
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f'No key generator for {algorithm}')
+    private_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                    serialization.NoEncryption())
+    public_pem = key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return private_pem.decode(), public_pem.decode()
+
+
+def measure(app, func, operations, threads):
+    """Run func operations times across threads (each in an app context); return ops/s and latency percentiles (µs)."""
+    latencies = []
+    lock = threading.Lock()
+    remaining = iter(range(operations))
+
+    def worker():
+        local = []
+        with app.app_context():
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                begin = time.perf_counter()
+                func()
+                local.append((time.perf_counter() - begin) * 1e6)
+        with lock:
+            latencies.extend(local)
+
+    begin = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - begin
+
+    latencies.sort()
+    return {
+        'ops_per_second': round(operations / elapsed, 1),
+        'p50_us': round(percentile(latencies, 0.50), 1),
+        'p99_us': round(percentile(latencies, 0.99), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--algorithms', default='HS256,RS256,ES256,EdDSA')
+    parser.add_argument('--operations', type=int, default=2000, help='Signs and verifies per algorithm')
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/jwt-<commit>-<time>.json)')
+    args = parser.parse_args()
+
+    # No database access; keep create_app from opening the default one
+    os.environ['DATABASE_URL'] = 'sqlite://'
+
+    from flask_jwt_extended import create_access_token, decode_token
+    from main import create_app
+    from services.jwt_keys import is_asymmetric, signing_keys
+
+    app = create_app()
+    commit = git_commit()
+    claims = {'role': 'user', 'ver': 1, 'fam': 'f' * 32}
+    report = {
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'operations': args.operations,
+        'threads': args.threads,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': []
+    }
+
+    print(f'{args.operations} operations per measurement, {args.threads} thread(s)')
+    print(f"  {'algorithm':<10} {'keys':<7} {'sign/s':>9} {'sign p50 µs':>12} {'verify/s':>9} {'verify p50 µs':>14} {'token bytes':>12}")
+    for algorithm in args.algorithms.split(','):
+        pem = None
+        if is_asymmetric(algorithm):
+            try:
+                pem = generate_keys(algorithm)
+            except ImportError:
+                print(f'  {algorithm:<10} skipped: needs the cryptography package')
+                continue
+        app.config.update(JWT_ALGORITHM=algorithm, JWT_PRIVATE_KEY=pem[0] if pem else None)
+        signing_keys.init_app(app)
+
+        modes = [('cached', None)] + ([('pem', pem)] if pem else [])
+
+        for mode, keys in modes:
+            if keys:
+                # Plain strings: PyJWT parses the key again on every call
+                manager = app.extensions['flask-jwt-extended']
+                manager.encode_key_loader(lambda identity: keys[0])
+                manager.decode_key_loader(lambda header, payload: keys[1])
+            with app.app_context():
+                token = create_access_token(identity=1, additional_claims=claims)
+            sign = measure(app, lambda: create_access_token(identity=1, additional_claims=claims),
+                           args.operations, args.threads)
+            verify = measure(app, lambda: decode_token(token), args.operations, args.threads)
+            result = {'algorithm': algorithm, 'keys': mode, 'token_bytes': len(token), 'sign': sign, 'verify': verify}
+            report['results'].append(result)
+            print(f"  {algorithm:<10} {mode:<7} {sign['ops_per_second']:>9.0f} {sign['p50_us']:>12.1f} "
+                  f"{verify['ops_per_second']:>9.0f} {verify['p50_us']:>14.1f} {len(token):>12}")
+        signing_keys.init_app(app)  # restore the cached key loaders
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"jwt-{commit or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as results_file:
+        json.dump(report, results_file, indent=2)
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
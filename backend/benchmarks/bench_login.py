@@ -0,0 +1,216 @@
+"""
+Benchmark login throughput and latency under concurrent sign-ins.
+
+Seeds --users users with datagen.py (sharing one password hash), then for
+each --concurrency level sends --requests logins from that many threads,
+cycling through the users. Meanwhile a probe thread requests /health
+every --probe-interval ms, showing how much a login burst slows other
+requests on the same server. Rejected logins (503 from a full password
+hashing queue) are counted separately from other errors.
+
+Without --url, requests go through the Flask test client against a
+throwaway SQLite database, and each --methods entry (werkzeug method
+syntax) is benchmarked in turn, e.g. scrypt,scrypt:16384:8:1,pbkdf2:sha256:600000.
+With --url they go to a running server using the same DATABASE_URL
+(which is reset and seeded directly, so use a scratch database) and
+started with RATE_LIMIT_ENABLED=false; the server's own
+PASSWORD_HASH_METHOD applies and pool counters are read from
+/api/internal/auth. --seed-method stores the users' hashes with another
+method, so the first logins also measure rehash-on-login.
+
+Usage:
+    python benchmarks/bench_login.py [--users 50] [--concurrency 1,4,16,64] [--requests 200]
+        [--methods scrypt,pbkdf2:sha256:600000] [--seed-method pbkdf2:sha256:1000]
+        [--url http://localhost:5000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from bench_api import RESULTS_DIR, HTTPTransport, TestClientTransport, git_commit, percentile
+from datagen import USER_PASSWORD, reset_database, seed_database
+
+
+def run_level(transport, users, requests, concurrency, probe_interval):
+    """Send requests logins from concurrency threads while probing /health; return the measurements."""
+    latencies, probes = [], []
+    outcomes = {'ok': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+    done = threading.Event()
+
+    def worker():
+        local, counts = [], {'ok': 0, 'rejected': 0, 'errors': 0}
+        while True:
+            with lock:
+                n = next(remaining, None)
+            if n is None:
+                break
+            begin = time.perf_counter()
+            status, _ = transport.request('POST', '/api/auth/login', {
+                'username': f'bench_{n % users + 1}', 'password': USER_PASSWORD
+            })
+            local.append((time.perf_counter() - begin) * 1000)
+            counts['ok' if status == 200 else 'rejected' if status == 503 else 'errors'] += 1
+        with lock:
+            latencies.extend(local)
+            for key, count in counts.items():
+                outcomes[key] += count
+
+    def probe():
+        while not done.is_set():
+            begin = time.perf_counter()
+            transport.request('GET', '/health')
+            probes.append((time.perf_counter() - begin) * 1000)
+            done.wait(probe_interval / 1000)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    begin = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - begin
+    done.set()
+    prober.join()
+
+    latencies.sort()
+    probes.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        **outcomes,
+        'logins_per_second': round(outcomes['ok'] / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(latencies[-1], 3),
+        'probe_requests': len(probes),
+        'probe_p50_ms': round(percentile(probes, 0.50), 3) if probes else None,
+        'probe_p95_ms': round(percentile(probes, 0.95), 3) if probes else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--concurrency', default='1,4,16,64', help='Client thread counts, e.g. 1,8,32')
+    parser.add_argument('--requests', type=int, default=200, help='Logins per concurrency level')
+    parser.add_argument('--methods', help='Hash methods to compare without --url (default: PASSWORD_HASH_METHOD)')
+    parser.add_argument('--seed-method', help='Method for the seeded hashes, to include rehash-on-login')
+    parser.add_argument('--probe-interval', type=float, default=10, help='Milliseconds between /health probes')
+    parser.add_argument('--url', help='Benchmark a running server instead of the test client')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/login-<commit>-<time>.json)')
+    args = parser.parse_args()
+
+    db_file = None
+    if args.url:
+        if not os.environ.get('DATABASE_URL'):
+            raise SystemExit('--url needs DATABASE_URL set to the database the server uses')
+        if args.methods:
+            raise SystemExit('--methods only applies without --url; set PASSWORD_HASH_METHOD on the server')
+    else:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from main import create_app
+    from models.user import db
+    from services.migrations import upgrade_database
+    from services.passwords import password_hasher
+
+    app = create_app()
+    # Measure the routes, not admission control (which would see a single client address)
+    app.config['RATE_LIMIT_ENABLED'] = False
+    commit = git_commit()
+    levels = [int(level) for level in args.concurrency.split(',')]
+    methods = args.methods.split(',') if args.methods else [None]
+    report = {
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'mode': 'server' if args.url else 'test_client',
+        'url': args.url,
+        'users': args.users,
+        'requests_per_level': args.requests,
+        'seed_method': args.seed_method,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'methods': []
+    }
+
+    try:
+        with app.app_context():
+            upgrade_database(db)
+            report['database'] = db.engine.dialect.name
+
+        for method in methods:
+            if method:
+                app.config['PASSWORD_HASH_METHOD'] = method
+                password_hasher.init_app(app)
+
+            # Seed with --seed-method when given, then restore the configured method for the logins
+            configured = app.config['PASSWORD_HASH_METHOD']
+            if args.seed_method:
+                password_hasher.method = args.seed_method
+            with app.app_context():
+                reset_database(db)
+                seed_database(db, args.users, 0)
+            password_hasher.method = configured
+
+            transport = HTTPTransport(args.url) if args.url else TestClientTransport(app)
+            if args.url:
+                status, data = transport.request('POST', '/api/auth/login', {'username': 'admin', 'password': 'admin123'})
+                if status != 200:
+                    raise SystemExit(f'Login as admin failed ({status}): {data}')
+                admin = {'Authorization': f"Bearer {data['access_token']}"}
+                method = 'server'
+            else:
+                method = configured
+                password_hasher.init_app(app)  # fresh counters
+
+            print(f'{method}: {args.users} users, {args.requests} logins per level')
+            print(f"  {'threads':>7} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                  f"{'503s':>5} {'errors':>6} {'health p50':>10} {'health p95':>10}")
+            results = []
+            for concurrency in levels:
+                result = run_level(transport, args.users, args.requests, concurrency, args.probe_interval)
+                results.append(result)
+                print(f"  {concurrency:>7} {result['logins_per_second']:>9.1f} {result['p50_ms']:>8.2f} "
+                      f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['rejected']:>5} {result['errors']:>6} "
+                      f"{result['probe_p50_ms'] or 0:>10.2f} {result['probe_p95_ms'] or 0:>10.2f}")
+
+            if args.url:
+                status, data = transport.request('GET', '/api/internal/auth', headers=admin)
+                pool = data.get('password_hashing') if status == 200 else None
+            else:
+                pool = password_hasher.stats()
+            if pool:
+                print(f"  hashing pool: {pool['workers']} workers, peak queue {pool['max_queued']}, "
+                      f"avg wait {pool['wait_ms_avg']:.1f} ms, avg hash {pool['hash_ms_avg']:.1f} ms")
+            report['methods'].append({'method': method, 'pool': pool, 'results': results})
+    finally:
+        if db_file:
+            os.unlink(db_file.name)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"login-{commit or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as results_file:
+        json.dump(report, results_file, indent=2)
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
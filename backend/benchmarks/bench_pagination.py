@@ -0,0 +1,111 @@
+"""
+Benchmark offset vs cursor pagination on GET /api/tasks.
+
+Seeds a throwaway SQLite database and times page 1 and page 5,000 in
+both modes through the Flask test client.
+
+Usage:
+    python benchmarks/bench_pagination.py [--per-page 10] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+DEEP_PAGE = 5000
+
+
+def seed(db, Task, User, per_page):
+    """Insert enough tasks to reach the deep page, with one owner."""
+    user = User(username='bench', email='bench@example.com', role='admin')
+    user.set_password('Bench1234')
+    db.session.add(user)
+    db.session.commit()
+
+    count = DEEP_PAGE * per_page + per_page
+    start = datetime(2020, 1, 1)
+    rows = [
+        {
+            'title': f'Task {i}',
+            'description': 'Benchmark task',
+            'status': 'pending',
+            'priority': 'medium',
+            'user_id': user.id,
+            # Seconds resolution so many rows share a created_at and exercise the id tie-break
+            'created_at': start + timedelta(seconds=i // 3),
+            'updated_at': start + timedelta(seconds=i // 3),
+        }
+        for i in range(count)
+    ]
+    db.session.execute(db.insert(Task), rows)
+    db.session.commit()
+    return user.id, count
+
+
+def timed(client, url, headers, repeat):
+    """Return the median latency of a GET request in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        response = client.get(url, headers=headers)
+        samples.append((time.perf_counter() - begin) * 1000)
+        assert response.status_code == 200, response.get_json()
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--per-page', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from flask_jwt_extended import create_access_token
+    from main import create_app
+    from models.user import db, User
+    from models.task import Task
+    from services.migrations import upgrade_database
+    from services.pagination import encode_cursor
+
+    app = create_app()
+    # Measure the routes, not admission control (which would see a single client address)
+    app.config['RATE_LIMIT_ENABLED'] = False
+    try:
+        with app.app_context():
+            upgrade_database(db)
+            user_id, count = seed(db, Task, User, args.per_page)
+            token = create_access_token(identity=user_id, additional_claims={'role': 'admin'})
+
+            # Cursor pointing at the last row of page DEEP_PAGE - 1, i.e. the start of DEEP_PAGE
+            last = Task.query.order_by(Task.created_at.desc(), Task.id.desc()) \
+                .offset((DEEP_PAGE - 1) * args.per_page - 1).first()
+            deep_cursor = encode_cursor(last.created_at, last.id)
+
+        headers = {'Authorization': f'Bearer {token}'}
+        client = app.test_client()
+        per_page = args.per_page
+
+        results = {
+            'offset page 1': f'/api/tasks?page=1&per_page={per_page}',
+            f'offset page {DEEP_PAGE}': f'/api/tasks?page={DEEP_PAGE}&per_page={per_page}',
+            'cursor page 1': f'/api/tasks?pagination=cursor&per_page={per_page}',
+            f'cursor page {DEEP_PAGE}': f'/api/tasks?cursor={deep_cursor}&per_page={per_page}',
+        }
+
+        print(f'{count} tasks, per_page={per_page}, median of {args.repeat} requests')
+        for label, url in results.items():
+            print(f'  {label:<20} {timed(client, url, headers, args.repeat):8.2f} ms')
+    finally:
+        os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark LIKE vs indexed search on GET /api/tasks?search=.
+
+Seeds a throwaway SQLite database (the FTS5 index is maintained by
+triggers during the load) and times a set of search terms with each
+backend through the Flask test client.
+
+Usage:
+    python benchmarks/bench_search.py [--tasks 1000000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+WORDS = (
+    'report budget deploy review invoice meeting client design release backlog '
+    'migrate database server refactor customer onboarding hiring roadmap audit '
+    'security patch newsletter website campaign contract renewal payroll survey'
+).split()
+
+# Common word, rare word, substring, and no match
+TERMS = ['report', 'payroll', 'nboard', 'zzzzzz']
+
+# Topic words appear in a minority of tasks; the rest of the text is filler
+TOPIC_RATE = 0.1
+FILLER_SIZE = 5000
+
+BATCH_SIZE = 50000
+
+
+def seed(db, Task, User, count):
+    """Insert count tasks with random word titles and descriptions."""
+    user = User(username='bench', email='bench@example.com', role='admin')
+    user.set_password('Bench1234')
+    db.session.add(user)
+    db.session.commit()
+
+    rng = random.Random(42)
+    filler = [''.join(rng.choices('abcdefghijklmnopqrstuvwxy', k=rng.randint(3, 9))) for _ in range(FILLER_SIZE)]
+
+    def text(length):
+        return ' '.join(rng.choice(WORDS) if rng.random() < TOPIC_RATE else rng.choice(filler)
+                        for _ in range(length))
+
+    start = datetime(2020, 1, 1)
+    for offset in range(0, count, BATCH_SIZE):
+        rows = [
+            {
+                'title': text(3),
+                'description': text(rng.randint(5, 25)),
+                'status': 'pending',
+                'priority': 'medium',
+                'user_id': user.id,
+                'created_at': start + timedelta(seconds=i),
+                'updated_at': start + timedelta(seconds=i),
+            }
+            for i in range(offset, min(offset + BATCH_SIZE, count))
+        ]
+        db.session.execute(db.insert(Task), rows)
+        db.session.commit()
+    return user.id
+
+
+def timed(client, url, headers, repeat):
+    """Return the median latency of a GET request in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        response = client.get(url, headers=headers)
+        samples.append((time.perf_counter() - begin) * 1000)
+        assert response.status_code == 200, response.get_json()
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from flask_jwt_extended import create_access_token
+    from main import create_app
+    from models.user import db, User
+    from models.task import Task
+    from services.migrations import upgrade_database
+
+    app = create_app()
+    # Measure the routes, not admission control (which would see a single client address)
+    app.config['RATE_LIMIT_ENABLED'] = False
+    try:
+        with app.app_context():
+            upgrade_database(db)
+            begin = time.perf_counter()
+            user_id = seed(db, Task, User, args.tasks)
+            print(f'Seeded {args.tasks} tasks in {time.perf_counter() - begin:.1f}s')
+            token = create_access_token(identity=user_id, additional_claims={'role': 'admin'})
+
+        headers = {'Authorization': f'Bearer {token}'}
+        client = app.test_client()
+
+        print(f'median of {args.repeat} requests, per_page=10 (includes the total count)')
+        for backend in ('like', 'auto'):
+            app.config['SEARCH_BACKEND'] = backend
+            app.extensions.pop('task_search', None)
+            with app.app_context():
+                from services.search import get_search_backend
+                name = get_search_backend().name
+            for term in TERMS:
+                latency = timed(client, f'/api/tasks?search={term}&per_page=10', headers, args.repeat)
+                print(f'  {name:<12} {term!r:<10} {latency:10.2f} ms')
+    finally:
+        os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Microbenchmark task list serialization: Task.to_dict() vs column projection.
+
+Times building one page of tasks (query + dicts + JSON encoding) with the
+previous ORM path and with the projected path using orjson and the stdlib
+encoder, then times the full GET /api/tasks request through the test client.
+
+Usage:
+    python benchmarks/bench_serialization.py [--tasks 10000] [--per-page 100] [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+
+def seed(db, Task, User, count):
+    """Insert count tasks with every field populated."""
+    user = User(username='bench', email='bench@example.com')
+    user.set_password('Bench1234')
+    db.session.add(user)
+    db.session.commit()
+
+    start = datetime(2020, 1, 1)
+    db.session.execute(db.insert(Task), [
+        {
+            'title': f'Task {i}',
+            'description': 'Benchmark task description ' * 3,
+            'status': 'pending',
+            'priority': 'medium',
+            'due_date': start + timedelta(days=i % 365),
+            'user_id': user.id,
+            'created_at': start + timedelta(seconds=i),
+            'updated_at': start + timedelta(seconds=i),
+        }
+        for i in range(count)
+    ])
+    db.session.commit()
+    return user.id
+
+
+def median_us(func, repeat):
+    """Median wall time of func() in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - begin) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from flask import jsonify
+    from flask_jwt_extended import create_access_token
+    from main import create_app
+    from models.user import db, User
+    from models.task import Task
+    from services.migrations import upgrade_database
+    import services.serialization as serialization
+
+    orjson = serialization.orjson
+    app = create_app()
+    # Measure the routes, not admission control (which would see a single client address)
+    app.config['RATE_LIMIT_ENABLED'] = False
+    try:
+        with app.app_context():
+            upgrade_database(db)
+            user_id = seed(db, Task, User, args.tasks)
+            token = create_access_token(identity=user_id)
+
+        def to_dict_page():
+            tasks = Task.query.order_by(Task.created_at.desc()).limit(args.per_page).all()
+            jsonify({'tasks': [task.to_dict() for task in tasks]}).get_data()
+            db.session.expunge_all()
+
+        def projected_page(fields):
+            rows = db.session.query(*serialization.task_columns(fields)) \
+                .order_by(Task.created_at.desc()).limit(args.per_page).all()
+            serialization.json_response({'tasks': serialization.rows_to_dicts(rows, fields)}).get_data()
+
+        def with_encoder(encoder, func, *func_args):
+            serialization.orjson = encoder
+            try:
+                return median_us(lambda: func(*func_args), args.repeat)
+            finally:
+                serialization.orjson = orjson
+
+        sparse = ('id', 'title', 'status')
+        print(f'per_page={args.per_page}, median of {args.repeat} (microseconds per page)')
+        with app.test_request_context():
+            results = [
+                ('to_dict + jsonify', median_us(to_dict_page, args.repeat)),
+                ('projection + stdlib json', with_encoder(None, projected_page, serialization.TASK_FIELDS)),
+            ]
+            if orjson is not None:
+                results.append(('projection + orjson', with_encoder(orjson, projected_page, serialization.TASK_FIELDS)))
+                results.append(('projection + orjson, 3 fields', with_encoder(orjson, projected_page, sparse)))
+            else:
+                print('  (orjson not installed)')
+            for name, latency in results:
+                print(f'  {name:<32} {latency:10.1f}')
+
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        print('GET /api/tasks through the test client')
+        for query in ('', '&fields=id,title,status'):
+            url = f'/api/tasks?per_page={args.per_page}{query}'
+            latency = median_us(lambda: client.get(url, headers=headers).get_data(), args.repeat)
+            print(f'  {url:<48} {latency:10.1f}')
+    finally:
+        os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
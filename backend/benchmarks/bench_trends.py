@@ -0,0 +1,119 @@
+"""
+Benchmark GET /api/analytics/trends over two years of tasks.
+
+Seeds a throwaway SQLite database with tasks spread over two years and
+many users, backfills the daily rollups with `rebuild_task_trends`, and
+times two-year trends for every user and for one user, per day and per
+week, through the Flask test client.
+
+Usage:
+    python benchmarks/bench_trends.py [--tasks 1000000] [--users 1000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+BATCH_SIZE = 50000
+
+START = datetime(2023, 1, 1)
+END = datetime(2024, 12, 31)
+
+
+def seed(db, Task, User, count, users):
+    """Insert users and count tasks created at random times between START and END."""
+    db.session.execute(db.insert(User), [
+        {'username': f'bench{i}', 'email': f'bench{i}@example.com', 'password_hash': 'x', 'role': 'user'}
+        for i in range(users)
+    ])
+    db.session.commit()
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).all()]
+
+    rng = random.Random(42)
+    span = int((END - START).total_seconds())
+    for offset in range(0, count, BATCH_SIZE):
+        rows = []
+        for _ in range(offset, min(offset + BATCH_SIZE, count)):
+            created = START + timedelta(seconds=rng.randrange(span))
+            status = rng.choice(('pending', 'in_progress', 'completed'))
+            rows.append({
+                'title': 'Task',
+                'description': '',
+                'status': status,
+                'priority': 'medium',
+                'due_date': created + timedelta(days=rng.randint(1, 30)),
+                'user_id': rng.choice(user_ids),
+                'created_at': created,
+                'updated_at': created + timedelta(hours=rng.randint(0, 240)) if status == 'completed' else created,
+            })
+        db.session.execute(db.insert(Task), rows)
+        db.session.commit()
+    return user_ids[0]
+
+
+def timed(client, url, headers, repeat):
+    """Return the median latency of a GET request in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        response = client.get(url, headers=headers)
+        samples.append((time.perf_counter() - begin) * 1000)
+        assert response.status_code == 200, response.get_json()
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from flask_jwt_extended import create_access_token
+    from main import create_app
+    from models.user import db, User
+    from models.task import Task
+    from services import task_trends
+    from services.migrations import upgrade_database
+
+    app = create_app()
+    # Measure the queries, not admission control or the analytics cache
+    app.config['RATE_LIMIT_ENABLED'] = False
+    app.config['ANALYTICS_CACHE_BACKEND'] = 'none'
+    app.extensions['analytics_cache'].init_app(app)
+    try:
+        with app.app_context():
+            upgrade_database(db)
+            begin = time.perf_counter()
+            user_id = seed(db, Task, User, args.tasks, args.users)
+            print(f'Seeded {args.tasks} tasks for {args.users} users in {time.perf_counter() - begin:.1f}s')
+            begin = time.perf_counter()
+            rows = task_trends.rebuild_task_trends(db)
+            print(f'Backfilled {rows} user-day rollup rows in {time.perf_counter() - begin:.1f}s')
+            admin_token = create_access_token(identity=0, additional_claims={'role': 'admin'})
+            user_token = create_access_token(identity=user_id)
+
+        client = app.test_client()
+        print(f"median of {args.repeat} requests, 2023-01-01..2024-12-31, "
+              f"bucketing with {'NumPy' if task_trends.numpy is not None else 'pure Python'}")
+        for scope, token in (('all users', admin_token), ('one user', user_token)):
+            for bucket in ('day', 'week'):
+                url = f'/api/analytics/trends?bucket={bucket}&from={START.date()}&to={END.date()}'
+                latency = timed(client, url, {'Authorization': f'Bearer {token}'}, args.repeat)
+                print(f'  {scope:<10} {bucket:<5} {latency:10.2f} ms')
+    finally:
+        os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare two bench_api.py result files and flag latency regressions.
+
+Matches scenarios by dataset size and name, prints p50/p95 latency and
+throughput for both runs with the relative change, and exits with
+status 1 if any p50 got slower by more than --threshold (default 10%)
+and by at least --min-delta-ms, so sub-millisecond noise is not flagged.
+
+Usage:
+    python benchmarks/compare.py BASELINE.json CANDIDATE.json [--threshold 0.10] [--min-delta-ms 0.5] [--metric p50_ms]
+"""
+import argparse
+import json
+
+
+def load(path):
+    """Results keyed by (tasks, scenario)."""
+    with open(path) as results_file:
+        report = json.load(results_file)
+    results = {
+        (size['tasks'], result['scenario']): result
+        for size in report['sizes'] for result in size['results']
+    }
+    return report, results
+
+
+def change(before, after):
+    return (after - before) / before if before else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed relative slowdown')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='Ignore smaller absolute slowdowns')
+    parser.add_argument('--metric', default='p50_ms', help='Latency field checked against the threshold')
+    args = parser.parse_args()
+
+    base_report, base = load(args.baseline)
+    head_report, head = load(args.candidate)
+    if (base_report['mode'], base_report.get('database')) != (head_report['mode'], head_report.get('database')):
+        print(f"warning: comparing {base_report['mode']}/{base_report.get('database')} "
+              f"with {head_report['mode']}/{head_report.get('database')}")
+
+    print(f"{base_report['commit']} -> {head_report['commit']} ({args.metric}, threshold {args.threshold:.0%})")
+    print(f"  {'tasks':>9} {'scenario':<18} {'base':>9} {'head':>9} {'change':>8} {'base rps':>9} {'head rps':>9}")
+
+    regressions = []
+    for key in sorted(set(base) & set(head)):
+        before, after = base[key][args.metric], head[key][args.metric]
+        delta = change(before, after)
+        flag = ''
+        if delta > args.threshold and after - before >= args.min_delta_ms:
+            flag = '  REGRESSION'
+            regressions.append(key)
+        print(f"  {key[0]:>9,} {key[1]:<18} {before:>9.2f} {after:>9.2f} {delta:>+8.1%} "
+              f"{base[key]['rps']:>9.0f} {head[key]['rps']:>9.0f}{flag}")
+
+    missing = sorted(set(base) ^ set(head))
+    if missing:
+        print(f'  ({len(missing)} scenario(s) only in one run, not compared)')
+
+    if regressions:
+        print(f'{len(regressions)} regression(s) over {args.threshold:.0%}')
+        raise SystemExit(1)
+    print('No regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Seed a database with N users and M tasks with realistic distributions.
+
+Task ownership is skewed (a few users own most tasks), creation dates
+lean recent, status follows age (older tasks are more often completed),
+most tasks have a due date spread around their creation, and titles and
+descriptions come from a small vocabulary so search terms hit a
+realistic fraction of rows. Output is deterministic for a given --seed
+(dates are relative to the start of today).
+
+Every generated user has the password USER_PASSWORD. Used by
+bench_api.py; also runnable on its own against DATABASE_URL:
+
+Usage:
+    python benchmarks/datagen.py --tasks 1000000 [--users 1000] [--seed 42] [--reset]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+USER_PASSWORD = 'Bench1234'
+BATCH_SIZE = 20000
+
+STATUS_WEIGHTS = {'pending': 0.40, 'in_progress': 0.20, 'completed': 0.40}
+PRIORITY_WEIGHTS = {'low': 0.30, 'medium': 0.50, 'high': 0.20}
+DUE_DATE_RATE = 0.7
+DESCRIPTION_RATE = 0.6
+
+VERBS = ['Review', 'Write', 'Update', 'Fix', 'Plan', 'Prepare', 'Call', 'Email', 'Schedule', 'Refactor',
+         'Test', 'Deploy', 'Design', 'Research', 'Organize', 'Book', 'Pay', 'Clean', 'Order', 'Draft']
+NOUNS = ['report', 'invoice', 'meeting', 'budget', 'roadmap', 'presentation', 'contract', 'release',
+         'dashboard', 'newsletter', 'onboarding', 'proposal', 'backlog', 'migration', 'interview',
+         'workshop', 'survey', 'campaign', 'audit', 'checklist']
+FILLER = ['with', 'for', 'the', 'team', 'client', 'before', 'next', 'week', 'quarterly', 'notes', 'follow',
+          'up', 'on', 'feedback', 'from', 'latest', 'review', 'and', 'share', 'summary']
+
+
+def default_users(tasks):
+    """Users for a dataset of this many tasks when --users is not given."""
+    return max(10, tasks // 1000)
+
+
+def owner_weights(users):
+    """Zipf-like weights: the user of rank k owns roughly 1 / k**0.8 of the tasks."""
+    return [1 / (rank ** 0.8) for rank in range(1, users + 1)]
+
+
+def generate_tasks(user_ids, count, rng, now):
+    """Yield count task rows (dicts for insert) owned by user_ids."""
+    owners = rng.choices(user_ids, weights=owner_weights(len(user_ids)), k=count)
+    statuses, status_weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    priorities, priority_weights = list(PRIORITY_WEIGHTS), list(PRIORITY_WEIGHTS.values())
+
+    for owner in owners:
+        # Skewed towards recent: age in days over the last year
+        age = timedelta(days=365 * rng.random() ** 2, seconds=rng.randrange(86400))
+        created_at = now - age
+
+        status = rng.choices(statuses, weights=status_weights)[0]
+        if status != 'completed' and age > timedelta(days=90) and rng.random() < 0.6:
+            status = 'completed'
+
+        due_date = None
+        if rng.random() < DUE_DATE_RATE:
+            due_date = (created_at + timedelta(days=rng.randint(1, 60))).replace(hour=17, minute=0, second=0, microsecond=0)
+
+        description = None
+        if rng.random() < DESCRIPTION_RATE:
+            description = ' '.join(rng.choices(FILLER + NOUNS, k=rng.randint(4, 30))).capitalize()
+
+        yield {
+            'title': f'{rng.choice(VERBS)} {rng.choice(NOUNS)} {rng.randint(1, 999)}',
+            'description': description,
+            'status': status,
+            'priority': rng.choices(priorities, weights=priority_weights)[0],
+            'due_date': due_date,
+            'user_id': owner,
+            'created_at': created_at,
+            'updated_at': min(now, created_at + timedelta(days=30 * rng.random() ** 3)),
+        }
+
+
+def reset_database(db):
+    """Delete every task, counter and non-admin user."""
+    from models.user import User
+    from models.task import Task
+    from models.task_counter import TaskCounter
+
+    db.session.query(Task).delete()
+    db.session.query(TaskCounter).delete()
+    db.session.query(User).filter(User.role != 'admin').delete()
+    db.session.commit()
+
+
+def seed_database(db, users, tasks, seed=42, batch_size=BATCH_SIZE, progress=None):
+    """
+    Insert users and tasks inside an app context, then rebuild the counters.
+
+    Users are named bench_<n>; bench_1 owns the most tasks. The password
+    is hashed once (with the app's PASSWORD_HASH_METHOD) and shared, since
+    hashing dominates for many users.
+
+    Returns:
+        list: The new users' ids, heaviest owner first
+    """
+    from models.user import User
+    from models.task import Task
+    from services.task_counters import rebuild_task_counters
+    from services.passwords import password_hasher
+
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    password_hash = password_hasher.hash(USER_PASSWORD)
+
+    for offset in range(0, users, batch_size):
+        db.session.execute(db.insert(User), [
+            {'username': f'bench_{n}', 'email': f'bench_{n}@example.com', 'password_hash': password_hash,
+             'role': 'user', 'created_at': now, 'updated_at': now}
+            for n in range(offset + 1, min(offset + batch_size, users) + 1)
+        ])
+    db.session.commit()
+
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).filter(User.username.like('bench\\_%', escape='\\'))
+                .order_by(User.id)]
+
+    batch = []
+    inserted = 0
+    for row in generate_tasks(user_ids, tasks, rng, now):
+        batch.append(row)
+        if len(batch) == batch_size:
+            db.session.execute(db.insert(Task), batch)
+            db.session.commit()
+            inserted += len(batch)
+            batch = []
+            if progress:
+                progress(inserted)
+    if batch:
+        db.session.execute(db.insert(Task), batch)
+        db.session.commit()
+        inserted += len(batch)
+
+    rebuild_task_counters(db)
+    if progress:
+        progress(inserted)
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, required=True)
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help='Delete existing tasks and non-admin users first')
+    args = parser.parse_args()
+
+    from main import create_app
+    from models.user import db
+    from services.migrations import upgrade_database
+
+    users = args.users or default_users(args.tasks)
+    app = create_app()
+    with app.app_context():
+        upgrade_database(db)
+        if args.reset:
+            reset_database(db)
+
+        begin = time.perf_counter()
+        seed_database(db, users, args.tasks, seed=args.seed,
+                      progress=lambda done: print(f'\r  {done:,} / {args.tasks:,} tasks', end='', flush=True))
+        print(f'\nSeeded {users:,} users and {args.tasks:,} tasks in {time.perf_counter() - begin:.1f}s '
+              f'(password {USER_PASSWORD!r})')
+
+
+if __name__ == '__main__':
+    main()
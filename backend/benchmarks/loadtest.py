@@ -0,0 +1,158 @@
+"""
+Load-test a running server and report requests/sec and latency percentiles.
+
+Point it at a server started with the production profile (gunicorn
+--config gunicorn.conf.py wsgi:app) and compare runs with different
+WEB_CONCURRENCY / GUNICORN_THREADS values. Unless admission control is
+what is being tested, start it with RATE_LIMIT_ENABLED=false. Each
+client thread keeps one HTTP/1.1 keep-alive connection open, like a
+browser or a proxy would.
+
+Registers (or logs in as) a load-test user and seeds tasks for it before
+the run. Uses only the standard library.
+
+Usage:
+    python benchmarks/loadtest.py [--url http://localhost:5000] [--concurrency 32]
+        [--duration 10] [--scenarios health,list,get,summary,create] [--json results.json]
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+USERNAME = 'loadtest'
+PASSWORD = 'LoadTest1234'
+
+
+def request(conn, method, path, body=None, token=None):
+    """Send one request on a keep-alive connection; return (status, decoded JSON or None)."""
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, json.loads(data) if data else None
+
+
+def setup(url, seed_tasks):
+    """Log in as the load-test user (registering it first if needed) and seed tasks."""
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+
+    request(conn, 'POST', '/api/auth/register',
+            {'username': USERNAME, 'email': f'{USERNAME}@example.com', 'password': PASSWORD})
+    status, data = request(conn, 'POST', '/api/auth/login', {'username': USERNAME, 'password': PASSWORD})
+    if status != 200:
+        raise SystemExit(f'Login failed ({status}): {data}')
+    token = data['access_token']
+
+    task_ids = []
+    for offset in range(0, seed_tasks, 1000):
+        tasks = [{'title': f'Load test task {i}', 'priority': random.choice(['low', 'medium', 'high'])}
+                 for i in range(offset, min(offset + 1000, seed_tasks))]
+        status, data = request(conn, 'POST', '/api/tasks/bulk', {'tasks': tasks}, token)
+        if status != 201:
+            raise SystemExit(f'Seeding failed ({status}): {data}')
+        task_ids.extend(result['id'] for result in data['results'])
+
+    conn.close()
+    return token, task_ids
+
+
+def scenarios(task_ids):
+    """Named request generators: each returns (method, path, body)."""
+    return {
+        'health': lambda: ('GET', '/health', None),
+        'list': lambda: ('GET', '/api/tasks?per_page=100', None),
+        'list_cursor': lambda: ('GET', '/api/tasks?pagination=cursor&per_page=100', None),
+        'get': lambda: ('GET', f'/api/tasks/{random.choice(task_ids)}', None),
+        'summary': lambda: ('GET', '/api/analytics/summary', None),
+        'create': lambda: ('POST', '/api/tasks', {'title': 'Load test create'}),
+    }
+
+
+def run(url, token, make_request, concurrency, duration):
+    """Run concurrency client threads for duration seconds; return latencies (ms) and error count."""
+    parts = urlsplit(url)
+    deadline = time.perf_counter() + duration
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client():
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        local = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            method, path, body = make_request()
+            begin = time.perf_counter()
+            try:
+                status, _ = request(conn, method, path, body, token)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+                status = None
+            local.append((time.perf_counter() - begin) * 1000)
+            if status is None or status >= 400:
+                local_errors += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--seed-tasks', type=int, default=1000)
+    parser.add_argument('--scenarios', default='health,list,get,summary,create')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    token, task_ids = setup(args.url, args.seed_tasks)
+    available = scenarios(task_ids)
+
+    results = []
+    print(f'{args.url}: {args.concurrency} connections, {args.duration:g}s per scenario')
+    print(f"  {'scenario':<12} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+    for name in args.scenarios.split(','):
+        latencies, errors = run(args.url, token, available[name], args.concurrency, args.duration)
+        latencies.sort()
+        result = {
+            'scenario': name,
+            'requests': len(latencies),
+            'rps': len(latencies) / args.duration,
+            'p50_ms': percentile(latencies, 0.50),
+            'p99_ms': percentile(latencies, 0.99),
+            'max_ms': latencies[-1],
+            'errors': errors,
+        }
+        results.append(result)
+        print(f"  {name:<12} {result['requests']:>9} {result['rps']:>9.0f} {result['p50_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {result['max_ms']:>8.1f} {errors:>7}")
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'url': args.url, 'concurrency': args.concurrency, 'duration': args.duration,
+                       'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
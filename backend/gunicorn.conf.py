@@ -0,0 +1,39 @@
+"""
+Gunicorn settings for production (see the Dockerfile).
+
+Run from the backend directory:
+    gunicorn --config gunicorn.conf.py wsgi:app
+
+Every setting can be overridden from the environment; pick worker and
+thread counts with benchmarks/loadtest.py against the target machine.
+"""
+import multiprocessing
+import os
+
+# Import the app from backend/app
+pythonpath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app')
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+
+# Processes x threads: threads overlap database and network waits, processes use more cores
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import the app once in the master and fork workers from it, sharing its memory copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+# Keep client connections open between requests (set above the load balancer's idle timeout)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Kill workers stuck longer than timeout; on SIGTERM let in-flight requests finish for graceful_timeout
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers periodically (with jitter so they don't restart together) to bound memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
@@ -0,0 +1,7 @@
+-- Composite indexes for keyset (cursor) pagination on GET /api/tasks
+
+-- Admin listing: ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at_id ON tasks(created_at, id);
+
+-- Per-user listing: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_tasks_user_id_created_at_id ON tasks(user_id, created_at, id);
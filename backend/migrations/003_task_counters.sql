@@ -0,0 +1,17 @@
+-- Materialized task counts per (user, status, priority) for analytics
+
+CREATE TABLE IF NOT EXISTS task_counters (
+    user_id INTEGER NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    priority VARCHAR(20) NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, status, priority),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Backfill from existing tasks (same as `flask rebuild-task-counters`)
+INSERT INTO task_counters (user_id, status, priority, count)
+SELECT user_id, status, priority, COUNT(*)
+FROM tasks
+GROUP BY user_id, status, priority
+ON CONFLICT (user_id, status, priority) DO UPDATE SET count = EXCLUDED.count;
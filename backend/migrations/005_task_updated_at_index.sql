@@ -0,0 +1,4 @@
+-- Index for conditional GET validators on GET /api/tasks
+
+-- Per-user list ETag: SELECT max(updated_at), count(id) WHERE user_id = ? (index-only)
+CREATE INDEX IF NOT EXISTS idx_tasks_user_id_updated_at ON tasks(user_id, updated_at);
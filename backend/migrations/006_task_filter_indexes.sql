@@ -0,0 +1,8 @@
+-- Match the indexes declared on the Task model
+
+-- Per-user status filter: WHERE user_id = ? AND status = ?
+CREATE INDEX IF NOT EXISTS idx_tasks_user_id_status ON tasks(user_id, status);
+
+-- Covered by the leading columns of idx_tasks_user_id_created_at_id and idx_tasks_created_at_id
+DROP INDEX IF EXISTS idx_tasks_user_id;
+DROP INDEX IF EXISTS idx_tasks_created_at;
@@ -0,0 +1,17 @@
+-- Incremental sync, GET /api/tasks/changes (services/task_sync.py)
+
+-- Admins' changes since a sync token: WHERE updated_at > ? ORDER BY updated_at, id
+-- (a user's own use idx_tasks_user_id_updated_at from 005)
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_at_id ON tasks(updated_at, id);
+
+-- Tombstones for deleted tasks, kept for TASK_DELETIONS_RETENTION_DAYS
+CREATE TABLE IF NOT EXISTS task_deletions (
+    id SERIAL PRIMARY KEY,
+    task_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_deletions_user_id_deleted_at ON task_deletions(user_id, deleted_at);
+CREATE INDEX IF NOT EXISTS idx_task_deletions_deleted_at ON task_deletions(deleted_at);
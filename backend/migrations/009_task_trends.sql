@@ -0,0 +1,22 @@
+-- Daily rollups for GET /api/analytics/trends (services/task_trends.py)
+
+-- Per user and day: tasks created, tasks completed (dated by updated_at) and tasks due that are not completed
+CREATE TABLE IF NOT EXISTS task_daily_stats (
+    user_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    created INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    overdue INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- The same summed over every user, so global trends read one row per day
+CREATE TABLE IF NOT EXISTS task_daily_totals (
+    day DATE PRIMARY KEY,
+    created INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    overdue INTEGER NOT NULL DEFAULT 0
+);
+
+-- Backfilled by `flask db-upgrade` when empty (same as `flask rebuild-task-trends`)
@@ -0,0 +1,13 @@
+-- Used refresh tokens, apart from revoked_tokens (services/revocation.py)
+
+-- One row per rotation, kept until the refresh token would have expired; looked up
+-- only by POST /api/auth/refresh, so the revocation Bloom filter stays small
+CREATE TABLE IF NOT EXISTS used_refresh_tokens (
+    jti VARCHAR(64) PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    used_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_used_refresh_tokens_expires_at ON used_refresh_tokens(expires_at);
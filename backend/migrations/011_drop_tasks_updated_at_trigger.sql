@@ -0,0 +1,7 @@
+-- Let the application own tasks.updated_at (models/task.py)
+
+-- The BEFORE UPDATE trigger from 001 replaced the value the app sets with
+-- CURRENT_TIMESTAMP (the transaction start on PostgreSQL), so sync cursors and
+-- trend rollups saw different times than the rows the app wrote.
+-- update_updated_at_column() stays: update_users_updated_at still uses it.
+DROP TRIGGER IF EXISTS update_tasks_updated_at ON tasks;
@@ -0,0 +1,249 @@
+import unittest
+import pickle
+import sys
+import os
+from contextlib import contextmanager
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from sqlalchemy import event
+from main import create_app
+from models.user import db, User
+from models.task import Task
+from services.task_counters import rebuild_task_counters
+from services.migrations import upgrade_database
+from services.cache import MemoryCacheBackend, RedisCacheBackend, _MISSING
+
+class FakeRedis:
+    """The few Redis commands RedisCacheBackend uses, in memory; it has no SCAN, so using one fails."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def smembers(self, key):
+        return set(self.data.get(key, ()))
+
+    def scard(self, key):
+        return len(self.data.get(key, ()))
+
+    def expire(self, key, ttl):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        client = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+        return Pipeline()
+
+class AnalyticsTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment."""
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            # Creates the schema and the default admin user
+            upgrade_database(db)
+
+            # Create a test user
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+
+            admin = User.query.filter_by(username='admin').first()
+
+            # Tasks for the test user and the admin
+            for status, priority in [('pending', 'high'), ('completed', 'low'),
+                                     ('completed', 'high'), ('in_progress', 'medium')]:
+                db.session.add(Task(title='User Task', status=status, priority=priority, user_id=self.user_id))
+            db.session.add(Task(title='Admin Task', status='pending', priority='low', user_id=admin.id))
+            db.session.commit()
+
+            # Tasks were inserted directly, not through the routes that maintain the counters
+            rebuild_task_counters(db)
+
+            from flask_jwt_extended import create_access_token
+            self.access_token = create_access_token(identity=self.user_id)
+            self.admin_token = create_access_token(identity=admin.id, additional_claims={'role': 'admin'})
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    @contextmanager
+    def count_queries(self):
+        """Collect the SQL statements executed inside the block."""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    def test_user_statistics(self):
+        """Test statistics scoped to a regular user."""
+        response = self.client.get('/api/analytics/statistics',
+                                  headers={'Authorization': f'Bearer {self.access_token}'})
+
+        self.assertEqual(response.status_code, 200)
+        stats = response.get_json()['statistics']
+        self.assertEqual(stats['total_tasks'], 4)
+        self.assertEqual(stats['completed_tasks'], 2)
+        self.assertEqual(stats['pending_tasks'], 1)
+        self.assertEqual(stats['in_progress_tasks'], 1)
+        self.assertEqual(stats['completion_rate'], 50.0)
+
+    def test_priority_and_status(self):
+        """Test global priority and status breakdowns."""
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+
+        response = self.client.get('/api/analytics/priority', headers=headers)
+        self.assertEqual(response.get_json()['priority_stats'], {'high': 2, 'low': 2, 'medium': 1})
+
+        response = self.client.get('/api/analytics/status', headers=headers)
+        self.assertEqual(response.get_json()['status_stats'], {'pending': 2, 'completed': 2, 'in_progress': 1})
+
+    def test_summary_single_query(self):
+        """Test that the admin summary is answered with one aggregate query."""
+        with self.count_queries() as statements:
+            response = self.client.get('/api/analytics/summary',
+                                      headers={'Authorization': f'Bearer {self.admin_token}'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['statistics']['total_tasks'], 5)
+        self.assertEqual(data['status_stats']['pending'], 2)
+        self.assertEqual(data['priority_stats']['low'], 2)
+        self.assertEqual(len(statements), 1, statements)
+
+    def test_user_summary_single_query(self):
+        """Test that a user's summary is scoped and answered with one query."""
+        with self.count_queries() as statements:
+            response = self.client.get('/api/analytics/summary',
+                                      headers={'Authorization': f'Bearer {self.access_token}'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['statistics']['user_id'], self.user_id)
+        self.assertEqual(data['statistics']['total_tasks'], 4)
+        self.assertEqual(data['priority_stats'], {'high': 2, 'low': 1, 'medium': 1})
+        self.assertEqual(len(statements), 1, statements)
+
+    def test_statistics_single_query(self):
+        """Test that /statistics no longer issues one COUNT per status."""
+        with self.count_queries() as statements:
+            self.client.get('/api/analytics/statistics',
+                           headers={'Authorization': f'Bearer {self.admin_token}'})
+
+        self.assertEqual(len(statements), 1, statements)
+
+    def test_repeated_statistics_served_from_cache(self):
+        """Test a repeated poll is answered without touching the database."""
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        first = self.client.get('/api/analytics/statistics', headers=headers).get_json()
+
+        with self.count_queries() as statements:
+            second = self.client.get('/api/analytics/statistics', headers=headers).get_json()
+
+        self.assertEqual(first, second)
+        self.assertEqual(statements, [])
+
+        response = self.client.get('/api/analytics/cache',
+                                  headers={'Authorization': f'Bearer {self.admin_token}'})
+        cache_stats = response.get_json()['cache_stats']
+        self.assertEqual(cache_stats['hits'], 1)
+        self.assertEqual(cache_stats['misses'], 1)
+
+    def test_task_write_invalidates_cache(self):
+        """Test task writes drop the owner's and the global cached entries."""
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        admin_headers = {'Authorization': f'Bearer {self.admin_token}'}
+        self.client.get('/api/analytics/statistics', headers=headers)
+        self.client.get('/api/analytics/status', headers=headers)
+        self.client.get('/api/analytics/statistics', headers=admin_headers)
+
+        response = self.client.post('/api/tasks', headers=headers, json={'title': 'New', 'status': 'completed'})
+        self.assertEqual(response.status_code, 201)
+
+        stats = self.client.get('/api/analytics/statistics', headers=headers).get_json()['statistics']
+        self.assertEqual(stats['completed_tasks'], 3)
+        status_stats = self.client.get('/api/analytics/status', headers=headers).get_json()['status_stats']
+        self.assertEqual(status_stats['completed'], 3)
+        stats = self.client.get('/api/analytics/statistics', headers=admin_headers).get_json()['statistics']
+        self.assertEqual(stats['total_tasks'], 6)
+
+    def test_cache_stats_admin_only(self):
+        """Test regular users can't read cache counters."""
+        response = self.client.get('/api/analytics/cache',
+                                  headers={'Authorization': f'Bearer {self.access_token}'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_memory_backend_lru_and_ttl(self):
+        """Test the in-process backend evicts least recently used and expired entries."""
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set('a', 1, ttl=60)
+        backend.set('b', 2, ttl=60)
+        backend.get('a')
+        backend.set('c', 3, ttl=60)
+
+        self.assertEqual(backend.get('a'), 1)
+        self.assertIs(backend.get('b'), _MISSING)
+
+        backend.delete_prefix('a')
+        self.assertIs(backend.get('a'), _MISSING)
+        self.assertEqual(backend.get('c'), 3)
+
+        backend.set('d', 4, ttl=0)
+        self.assertIs(backend.get('d'), _MISSING)
+
+    def test_redis_backend_invalidates_without_scan(self):
+        """Test the Redis backend drops a prefix's keys from its index set, leaving other prefixes alone."""
+        backend = RedisCacheBackend.__new__(RedisCacheBackend)
+        backend._pickle, backend._client = pickle, FakeRedis()
+
+        backend.set('analytics:user:1:statistics', {'total': 1}, 60, prefix='analytics:user:1:')
+        backend.set('analytics:user:1:summary', {'total': 1}, 60, prefix='analytics:user:1:')
+        backend.set('analytics:user:2:statistics', {'total': 2}, 60, prefix='analytics:user:2:')
+        self.assertEqual(len(backend), 3)
+
+        backend.delete_prefix('analytics:user:1:')
+        self.assertIs(backend.get('analytics:user:1:statistics'), _MISSING)
+        self.assertIs(backend.get('analytics:user:1:summary'), _MISSING)
+        self.assertEqual(backend.get('analytics:user:2:statistics'), {'total': 2})
+        self.assertEqual(len(backend), 1)
+
+if __name__ == '__main__':
+    unittest.main()
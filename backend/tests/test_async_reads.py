@@ -0,0 +1,240 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import asyncio
+import json
+import threading
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import create_app
+from models.user import db, User
+from models.task import Task
+from services.async_reads import AsyncReadApp, async_database_url
+
+try:
+    import aiosqlite
+    import greenlet
+except ImportError:
+    aiosqlite = None
+
+@unittest.skipIf(aiosqlite is None, 'the async read path needs aiosqlite and greenlet')
+class AsyncReadsTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a file database shared by the sync app and the async read path."""
+        self.db_dir = tempfile.mkdtemp()
+        self.database_uri = f"sqlite:///{os.path.join(self.db_dir, 'test.db')}"
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': self.database_uri})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            other = User(username='other', email='other@example.com')
+            other.set_password('testpassword')
+            db.session.add_all([user, other])
+            db.session.commit()
+
+            db.session.add_all([Task(title=f'Task {i}', priority='high' if i % 2 else 'low', user_id=user.id)
+                                for i in range(5)])
+            db.session.add(Task(title='Not yours', user_id=other.id))
+            db.session.commit()
+
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+            self.admin_headers = {'Authorization': f"Bearer {create_access_token(identity=99, additional_claims={'role': 'admin'})}"}
+            self.other_task_id = Task.query.filter_by(user_id=other.id).one().id
+
+        self.asgi = AsyncReadApp(self.app)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        asyncio.run(self.asgi.aclose())
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.engine.dispose()
+        shutil.rmtree(self.db_dir)
+
+    async def call(self, method, path, body=None, headers=None):
+        """Send one request through the ASGI app; return (status, headers, body bytes)."""
+        path, _, query = path.partition('?')
+        headers = dict(headers or {})
+        if body is not None:
+            body = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        scope = {
+            'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(), 'root_path': '',
+            'headers': [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+            'http_version': '1.1', 'scheme': 'http', 'client': ('127.0.0.1', 50000), 'server': ('testserver', 80)
+        }
+        messages = [{'type': 'http.request', 'body': body or b''}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        await self.asgi(scope, receive, send)
+        response_headers = {name.decode(): value.decode() for name, value in sent[0]['headers']}
+        return sent[0]['status'], response_headers, b''.join(message.get('body', b'') for message in sent[1:])
+
+    def request(self, *args, **kwargs):
+        return asyncio.run(self.call(*args, **kwargs))
+
+    def test_reads_match_sync_views(self):
+        """Test the async path returns what the sync views return."""
+        paths = [
+            '/api/tasks?per_page=3',
+            '/api/tasks?priority=high&fields=id,title',
+            '/api/tasks?pagination=cursor&per_page=2',
+            '/api/tasks?search=Task',
+            '/api/analytics/statistics',
+            '/api/analytics/priority',
+            '/api/analytics/status',
+            '/api/analytics/summary'
+        ]
+        for path in paths:
+            for headers in (self.headers, self.admin_headers):
+                with self.subTest(path=path, admin=headers is self.admin_headers):
+                    expected = self.client.get(path, headers=headers)
+                    status, response_headers, body = self.request('GET', path, headers=headers)
+                    self.assertEqual(status, expected.status_code)
+                    self.assertEqual(json.loads(body), expected.get_json())
+                    self.assertEqual(response_headers.get('etag'), expected.headers.get('ETag'))
+
+    def test_task_ownership_and_errors(self):
+        """Test ownership, missing tasks and authentication on the async path."""
+        status, _, body = self.request('GET', f'/api/tasks/{self.other_task_id}', headers=self.headers)
+        self.assertEqual(status, 403)
+        self.assertEqual(json.loads(body)['message'], 'Access denied')
+
+        status, _, body = self.request('GET', f'/api/tasks/{self.other_task_id}', headers=self.admin_headers)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['task']['title'], 'Not yours')
+
+        self.assertEqual(self.request('GET', '/api/tasks/9999', headers=self.headers)[0], 404)
+        self.assertEqual(self.request('GET', '/api/tasks')[0], 401)
+
+    def test_changes_since_token(self):
+        """Test incremental sync on the async path, with a token from the sync app."""
+        self.app.config['SYNC_SETTLE_SECONDS'] = 0
+        token = self.client.get('/api/tasks/changes', headers=self.headers).get_json()['sync_token']
+        self.client.put('/api/tasks/1', headers=self.headers, json={'status': 'completed'})
+
+        status, _, body = self.request('GET', f'/api/tasks/changes?since={token}', headers=self.headers)
+        self.assertEqual(status, 200)
+        self.assertEqual([(task['id'], task['status']) for task in json.loads(body)['changes']], [(1, 'completed')])
+
+    def test_conditional_get(self):
+        """Test If-None-Match is answered with 304 and no body."""
+        status, headers, _ = self.request('GET', '/api/tasks/1', headers=self.headers)
+        self.assertEqual(status, 200)
+
+        status, _, body = self.request('GET', '/api/tasks/1', headers={**self.headers, 'If-None-Match': headers['etag']})
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+
+    def test_blocking_hooks_run_off_the_loop(self):
+        """Test before_request hooks and JWT checks run on the sync threads, and the view still sees their results."""
+        threads = []
+        self.app.before_request(lambda: threads.append(threading.current_thread().name))
+        self.app.extensions['flask-jwt-extended'].token_in_blocklist_loader(
+            lambda header, payload: threads.append(threading.current_thread().name) or False)
+
+        status, _, body = self.request('GET', '/api/tasks/1', headers=self.headers)
+        self.assertEqual(status, 200, body)
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith('asgi-sync') for name in threads), threads)
+
+        status, _, _ = self.request('GET', '/api/tasks/stream', headers={**self.headers, 'Accept': 'text/event-stream'})
+        self.assertEqual(len(threads), 4)
+        self.assertTrue(all(name.startswith('asgi-sync') for name in threads), threads)
+
+    def test_other_routes_use_sync_app(self):
+        """Test writes and other routes are served by the Flask app, and reads see their changes."""
+        status, _, body = self.request('POST', '/api/tasks', {'title': 'Created over ASGI'}, headers=self.headers)
+        self.assertEqual(status, 201)
+        task_id = json.loads(body)['task']['id']
+
+        status, _, body = self.request('GET', f'/api/tasks/{task_id}', headers=self.headers)
+        self.assertEqual(json.loads(body)['task']['title'], 'Created over ASGI')
+
+        status, _, body = self.request('GET', '/health')
+        self.assertEqual(status, 200)
+        self.assertEqual(self.request('GET', '/missing')[0], 404)
+
+    def test_concurrent_reads(self):
+        """Test many reads in flight at once on one event loop."""
+        async def burst():
+            return await asyncio.gather(*(self.call('GET', '/api/tasks', headers=self.headers) for _ in range(20)))
+
+        results = asyncio.run(burst())
+        self.assertEqual({status for status, _, _ in results}, {200})
+        self.assertEqual({len(json.loads(body)['tasks']) for _, _, body in results}, {5})
+
+    def test_change_feed_on_event_loop(self):
+        """Test the task stream is served from the loop and ends when the client disconnects."""
+        async def scenario():
+            disconnect = asyncio.Event()
+            sent = []
+
+            async def receive():
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+
+            scope = {
+                'type': 'http', 'method': 'GET', 'path': '/api/tasks/stream', 'query_string': b'', 'root_path': '',
+                'headers': [(b'authorization', self.headers['Authorization'].encode())],
+                'http_version': '1.1', 'scheme': 'http', 'client': ('127.0.0.1', 50000), 'server': ('testserver', 80)
+            }
+            stream = asyncio.ensure_future(self.asgi(scope, receive, send))
+            while len(sent) < 2:
+                await asyncio.sleep(0.01)
+
+            status, _, _ = await self.call('POST', '/api/tasks', {'title': 'Pushed'}, headers=self.headers)
+            self.assertEqual(status, 201)
+            while len(sent) < 3:
+                await asyncio.sleep(0.01)
+
+            disconnect.set()
+            await asyncio.wait_for(stream, 5)
+            return sent
+
+        sent = asyncio.run(scenario())
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream; charset=utf-8'), sent[0]['headers'])
+        self.assertEqual(sent[1]['body'], b'retry: 3000\n\n')
+        self.assertIn(b'event: task.created', sent[2]['body'])
+        self.assertIn(b'"title":"Pushed"', sent[2]['body'].replace(b'": "', b'":"'))
+
+    def test_pool_metrics(self):
+        """Test the async pool is reported next to the sync one."""
+        self.request('GET', '/api/tasks', headers=self.headers)
+        response = self.client.get('/api/internal/pool', headers=self.admin_headers)
+        pool = response.get_json()['async_pool']
+        self.assertEqual(pool['pool_class'], 'InstrumentedAsyncQueuePool')
+        self.assertGreater(pool['checkouts'], 0)
+
+class AsyncDatabaseUrlTestCase(unittest.TestCase):
+    def test_driver_for_backend(self):
+        """Test the async URL swaps in the backend's asyncio driver."""
+        self.assertEqual(async_database_url({}, 'sqlite:////tmp/app.db'), 'sqlite+aiosqlite:////tmp/app.db')
+        self.assertEqual(async_database_url({}, 'postgresql+psycopg2://u:p@db/tasks'), 'postgresql+asyncpg://u:p@db/tasks')
+        self.assertEqual(async_database_url({'ASYNC_DATABASE_URL': 'postgresql+psycopg://db/x'}, 'sqlite://'),
+                         'postgresql+psycopg://db/x')
+        with self.assertRaises(RuntimeError):
+            async_database_url({}, 'mysql://db/tasks')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,19 +1,31 @@
 import unittest
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
 
 from main import create_app
 from models.user import db, User
+from models.revoked_token import RevokedToken, UsedRefreshToken
+from services.revocation import BloomFilter, revocation_list
+from services.user_cache import user_cache
+from services.cache import _MISSING
+from services.passwords import PasswordHasher, PasswordHasherBusy, password_hasher
+from services.jwt_keys import is_asymmetric, signing_keys
+
+try:
+    import cryptography
+except ImportError:
+    cryptography = None
 
 class AuthTestCase(unittest.TestCase):
     def setUp(self):
         """Set up test environment."""
-        self.app = create_app()
-        self.app.config['TESTING'] = True
-        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
         self.client = self.app.test_client()
         
         with self.app.app_context():
@@ -87,6 +99,264 @@ class AuthTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         data = response.get_json()
         self.assertIn('message', data)
+    
+    def login(self, username='testuser'):
+        """Log in (with the test password) and return auth headers."""
+        response = self.client.post('/api/auth/login', json={'username': username, 'password': 'testpassword'})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    
+    def test_login_token_claims(self):
+        """Test the token carries the claims routes authorize with."""
+        response = self.client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpassword'})
+        
+        with self.app.app_context():
+            from flask_jwt_extended import decode_token
+            claims = decode_token(response.get_json()['access_token'])
+        self.assertEqual(claims['role'], 'user')
+        self.assertEqual(claims['ver'], 1)
+    
+    def test_profile_served_from_cache(self):
+        """Test repeated profile reads skip the users table until the profile changes."""
+        headers = self.login()
+        self.client.get('/api/auth/profile', headers=headers)
+        hits = user_cache.stats()['hits']
+        
+        response = self.client.get('/api/auth/profile', headers=headers)
+        self.assertEqual(response.get_json()['user']['username'], 'testuser')
+        self.assertEqual(user_cache.stats()['hits'], hits + 1)
+        
+        # An update bumps the version and replaces the cached entry
+        response = self.client.put('/api/auth/profile', headers=headers, json={'username': 'renamed'})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/auth/profile', headers=headers)
+        self.assertEqual(response.get_json()['user']['username'], 'renamed')
+        
+        with self.app.app_context():
+            self.assertEqual(User.query.filter_by(username='renamed').one().version, 2)
+    
+    def test_profile_cache_rejects_stale_version(self):
+        """Test a token newer than the cached entry reloads the user."""
+        headers = self.login()
+        self.client.get('/api/auth/profile', headers=headers)
+        
+        # Change the row behind the cache's back, as another worker would
+        with self.app.app_context():
+            user = User.query.filter_by(username='testuser').one()
+            user.username, user.version = 'elsewhere', 2
+            db.session.commit()
+        
+        response = self.client.get('/api/auth/profile', headers=headers)
+        self.assertEqual(response.get_json()['user']['username'], 'testuser')
+        
+        headers = self.login('elsewhere')
+        response = self.client.get('/api/auth/profile', headers=headers)
+        self.assertEqual(response.get_json()['user']['username'], 'elsewhere')
+    
+    def test_profile_invalidation_keeps_other_users(self):
+        """Test invalidating user 1 drops only that entry, not user 10's."""
+        with self.app.app_context():
+            user = User.query.filter_by(username='testuser').one()
+            entry = user_cache.store(user)
+        user_cache.backend.set('user:10', entry, user_cache.ttl)
+        
+        user_cache.invalidate(user.id)
+        self.assertEqual(user_cache.backend.get('user:10'), entry)
+        self.assertIs(user_cache.backend.get(f'user:{user.id}'), _MISSING)
+    
+    def test_logout_revokes_token(self):
+        """Test a logged out token is rejected, here and after a filter reload."""
+        headers = self.login()
+        other = self.login()
+        
+        response = self.client.post('/api/auth/logout', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/auth/profile', headers=headers).status_code, 401)
+        self.assertEqual(self.client.get('/api/auth/profile', headers=other).status_code, 200)
+        
+        with self.app.app_context():
+            revocation_list.refresh()
+        self.assertEqual(self.client.get('/api/auth/profile', headers=headers).status_code, 401)
+        # The token and its login's family
+        self.assertEqual(revocation_list.stats()['filter_entries'], 2)
+    
+    def test_login_rehashes_old_hash(self):
+        """Test a hash made with another method is replaced on successful login."""
+        self.app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+        password_hasher.init_app(self.app)
+        with self.app.app_context():
+            user = User.query.filter_by(username='testuser').one()
+            self.assertTrue(user.password_hash.startswith('scrypt:'))
+        
+        response = self.client.post('/api/auth/login', json={'username': 'testuser', 'password': 'wrongpassword'})
+        self.assertEqual(response.status_code, 401)
+        with self.app.app_context():
+            self.assertTrue(User.query.filter_by(username='testuser').one().password_hash.startswith('scrypt:'))
+        
+        self.login()
+        with self.app.app_context():
+            password_hash = User.query.filter_by(username='testuser').one().password_hash
+        self.assertTrue(password_hash.startswith('pbkdf2:sha256:1000$'))
+        self.assertFalse(password_hasher.needs_rehash(password_hash))
+        self.assertEqual(self.client.post('/api/auth/login', json={
+            'username': 'testuser', 'password': 'testpassword'
+        }).status_code, 200)
+    
+    def test_login_busy_hash_pool(self):
+        """Test logins beyond the hashing pool's queue get 503 with Retry-After."""
+        self.app.config['PASSWORD_HASH_WORKERS'] = 1
+        self.app.config['PASSWORD_HASH_MAX_QUEUE'] = 0
+        password_hasher.init_app(self.app)
+        
+        # Occupy the only slot
+        release = threading.Event()
+        blocked = threading.Thread(target=password_hasher._run, args=(release.wait,))
+        blocked.start()
+        try:
+            while password_hasher.stats()['running'] < 1:
+                time.sleep(0.001)
+            response = self.client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpassword'})
+        finally:
+            release.set()
+            blocked.join()
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        self.assertEqual(password_hasher.stats()['rejected'], 1)
+        self.assertEqual(self.client.post('/api/auth/login', json={
+            'username': 'testuser', 'password': 'testpassword'
+        }).status_code, 200)
+    
+    def test_password_hasher_queue(self):
+        """Test concurrent hashes queue for the pool's threads and are counted."""
+        hasher = PasswordHasher()
+        hasher.method = 'pbkdf2:sha256:1000'
+        hasher.workers, hasher.max_queue = 2, 8
+        hasher._reset()
+        
+        with ThreadPoolExecutor(max_workers=10) as callers:
+            hashes = list(callers.map(hasher.hash, [f'password-{i}' for i in range(10)]))
+        
+        self.assertTrue(all(hasher.verify(password_hash, f'password-{i}') for i, password_hash in enumerate(hashes)))
+        stats = hasher.stats()
+        self.assertEqual((stats['completed'], stats['rejected'], stats['running'], stats['queued']), (20, 0, 0, 0))
+        self.assertLessEqual(stats['max_queued'], 10)
+        hasher.shutdown()
+    
+    def test_refresh_rotates_tokens(self):
+        """Test a refresh token yields a new pair and cannot be used twice."""
+        response = self.client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpassword'})
+        refresh_token = response.get_json()['refresh_token']
+        completed = password_hasher.stats()['completed']
+        
+        response = self.client.post('/api/auth/refresh', headers={'Authorization': f'Bearer {refresh_token}'})
+        self.assertEqual(response.status_code, 200)
+        tokens = response.get_json()
+        self.assertEqual(password_hasher.stats()['completed'], completed)
+        self.assertEqual(self.client.get('/api/auth/profile', headers={
+            'Authorization': f"Bearer {tokens['access_token']}"
+        }).status_code, 200)
+        
+        # Access tokens cannot refresh
+        response = self.client.post('/api/auth/refresh', headers={'Authorization': f"Bearer {tokens['access_token']}"})
+        self.assertEqual(response.status_code, 422)
+        
+        response = self.client.post('/api/auth/refresh', headers={'Authorization': f"Bearer {tokens['refresh_token']}"})
+        self.assertEqual(response.status_code, 200)
+    
+    def test_refresh_token_reuse_revokes_family(self):
+        """Test replaying a rotated refresh token ends every token from that login."""
+        response = self.client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpassword'})
+        stolen = {'Authorization': f"Bearer {response.get_json()['refresh_token']}"}
+        other = self.login()
+        
+        tokens = self.client.post('/api/auth/refresh', headers=stolen).get_json()
+        self.assertEqual(self.client.post('/api/auth/refresh', headers=stolen).status_code, 401)
+        
+        self.assertEqual(self.client.post('/api/auth/refresh', headers={
+            'Authorization': f"Bearer {tokens['refresh_token']}"
+        }).status_code, 401)
+        self.assertEqual(self.client.get('/api/auth/profile', headers={
+            'Authorization': f"Bearer {tokens['access_token']}"
+        }).status_code, 401)
+        self.assertEqual(self.client.get('/api/auth/profile', headers=other).status_code, 200)
+        self.assertEqual(revocation_list.stats()['refresh_token_reuses'], 1)
+    
+    def test_refresh_token_reuse_across_workers(self):
+        """Test a refresh token rotated by another worker is refused before this worker's filter reloads."""
+        response = self.client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpassword'})
+        stolen = {'Authorization': f"Bearer {response.get_json()['refresh_token']}"}
+        tokens = self.client.post('/api/auth/refresh', headers=stolen).get_json()
+        
+        # This worker's filter has not seen the rotation yet
+        with self.app.app_context():
+            revocation_list._filter = BloomFilter(1024)
+        
+        response = self.client.post('/api/auth/refresh', headers=stolen)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json()['message'], 'Refresh token has already been used')
+        self.assertEqual(self.client.get('/api/auth/profile', headers={
+            'Authorization': f"Bearer {tokens['access_token']}"
+        }).status_code, 401)
+        self.assertEqual(revocation_list.stats()['refresh_token_reuses'], 1)
+    
+    def test_refresh_rotation_stays_out_of_filter(self):
+        """Test used refresh tokens are kept apart from revocations, so rotations do not grow the filter."""
+        refresh_token = self.client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpassword'}).get_json()['refresh_token']
+        for _ in range(3):
+            response = self.client.post('/api/auth/refresh', headers={'Authorization': f'Bearer {refresh_token}'})
+            self.assertEqual(response.status_code, 200)
+            refresh_token = response.get_json()['refresh_token']
+        
+        with self.app.app_context():
+            revocation_list.refresh()
+            self.assertEqual(RevokedToken.query.count(), 0)
+            self.assertEqual(UsedRefreshToken.query.count(), 3)
+        self.assertEqual(revocation_list.stats()['filter_entries'], 0)
+    
+    def test_logout_revokes_refresh_token(self):
+        """Test logout also ends the refresh token issued with the access token."""
+        tokens = self.client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpassword'}).get_json()
+        
+        self.client.post('/api/auth/logout', headers={'Authorization': f"Bearer {tokens['access_token']}"})
+        response = self.client.post('/api/auth/refresh', headers={'Authorization': f"Bearer {tokens['refresh_token']}"})
+        self.assertEqual(response.status_code, 401)
+    
+    def test_decode_key_follows_algorithm(self):
+        """Test HS* tokens are only ever checked against the secret."""
+        self.assertTrue(is_asymmetric('RS256') and is_asymmetric('EdDSA') and is_asymmetric('ES256'))
+        self.assertFalse(is_asymmetric('HS256'))
+        self.assertEqual(signing_keys._decode_key({'alg': 'HS256'}, {}), self.app.config['JWT_SECRET_KEY'])
+        self.assertIsNone(signing_keys._decode_key({'alg': 'RS256'}, {}))
+    
+    @unittest.skipIf(cryptography is None, 'cryptography is not installed')
+    def test_asymmetric_signing(self):
+        """Test EdDSA tokens are signed with the cached private key and verified with the public key."""
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ed25519
+        
+        private_key = ed25519.Ed25519PrivateKey.generate()
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        app.config.update(TESTING=True, JWT_ALGORITHM='EdDSA', JWT_PRIVATE_KEY=private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ).decode())
+        signing_keys.init_app(app)
+        
+        with app.app_context():
+            from flask_jwt_extended import create_access_token, decode_token
+            import jwt
+            token = create_access_token(identity=1)
+            self.assertEqual(jwt.get_unverified_header(token)['alg'], 'EdDSA')
+            self.assertEqual(decode_token(token)['sub'], 1)
+    
+    def test_bloom_filter(self):
+        """Test the filter has no false negatives and few false positives."""
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'token-{i}')
+        
+        self.assertTrue(all(f'token-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
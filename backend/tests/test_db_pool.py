@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from sqlalchemy import create_engine, exc, text
+from main import create_app
+from models.user import db, User
+from services.db_pool import InstrumentedQueuePool, pool_options
+from services.migrations import upgrade_database
+
+class DatabasePoolTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment."""
+        self.db_dir = tempfile.mkdtemp()
+        self.database_uri = f"sqlite:///{os.path.join(self.db_dir, 'test.db')}"
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': self.database_uri})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            # Creates the schema and the default admin user
+            upgrade_database(db)
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+            admin = User.query.filter_by(username='admin').first()
+
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+            self.admin_headers = {'Authorization': f"Bearer {create_access_token(identity=admin.id, additional_claims={'role': 'admin'})}"}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.engine.dispose()
+        shutil.rmtree(self.db_dir)
+
+    def test_pool_configured_from_config(self):
+        """Test the app engine uses the configured, instrumented pool."""
+        with self.app.app_context():
+            pool = db.engine.pool
+            self.assertIsInstance(pool, InstrumentedQueuePool)
+            self.assertEqual(pool.size(), self.app.config['DB_POOL_SIZE'])
+            self.assertEqual(pool._pre_ping, self.app.config['DB_POOL_PRE_PING'])
+
+        options = pool_options({**self.app.config, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        self.assertNotIn('pool_size', options)
+
+    def test_sqlite_pragmas(self):
+        """Test file databases run in WAL mode with synchronous=NORMAL and mmap."""
+        with self.app.app_context():
+            self.assertEqual(db.session.execute(text('PRAGMA journal_mode')).scalar(), 'wal')
+            self.assertEqual(db.session.execute(text('PRAGMA synchronous')).scalar(), 1)
+            self.assertEqual(db.session.execute(text('PRAGMA mmap_size')).scalar(), self.app.config['SQLITE_MMAP_SIZE'])
+
+    def test_pool_metrics_counters(self):
+        """Test checkouts, overflow hits and timeouts are counted."""
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        engine = create_engine(f'sqlite:///{db_file.name}', poolclass=InstrumentedQueuePool,
+                               pool_size=1, max_overflow=1, pool_timeout=0.05)
+        try:
+            first = engine.connect()
+            second = engine.connect()
+            with self.assertRaises(exc.TimeoutError):
+                engine.connect()
+
+            metrics = engine.pool.metrics()
+            self.assertEqual(metrics['checked_out'], 2)
+            self.assertEqual(metrics['checkouts'], 2)
+            self.assertEqual(metrics['overflow_checkouts'], 1)
+            self.assertEqual(metrics['timeouts'], 1)
+
+            # The timed out checkout waited pool_timeout, raising the recent average load shedding reads
+            self.assertGreater(engine.pool.recent_wait(), 0.005)
+            self.assertEqual(engine.pool.recent_wait(window=0), 0.0)
+
+            first.close()
+            second.close()
+            self.assertEqual(engine.pool.metrics()['checked_out'], 0)
+        finally:
+            engine.dispose()
+            os.unlink(db_file.name)
+
+    def test_pool_endpoint_admin_only(self):
+        """Test the pool metrics endpoint."""
+        response = self.client.get('/api/internal/pool', headers=self.headers)
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.get('/api/internal/pool', headers=self.admin_headers)
+        self.assertEqual(response.status_code, 200)
+        pool = response.get_json()['pool']
+        self.assertEqual(pool['pool_class'], 'InstrumentedQueuePool')
+        self.assertGreater(pool['checkouts'], 0)
+        self.assertIn('wait_ms_max', pool)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import create_app
+from models.user import db, User
+from models.task import Task
+from services.due_dates import DueDateScheduler, DueEventSink, FileDueEventSink
+from services.task_events import task_events
+
+class ListSink(DueEventSink):
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+class DueDateSchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up a scheduler on a controllable clock, following this app's task events."""
+        self.app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'DUE_REMINDER_MINUTES': 30,
+            'DUE_SCHEDULER_LOOKAHEAD_HOURS': 2,
+            'DUE_SCHEDULER_CATCHUP_MINUTES': 60
+        })
+        self.client = self.app.test_client()
+        self.now = datetime(2030, 1, 1, 12, 0)
+
+        self.scheduler = DueDateScheduler(self.app, db)
+        self.scheduler.clock = lambda: self.now
+        self.scheduler.sink = self.sink = ListSink()
+        task_events.add_listener(self.scheduler.on_task_event)
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def insert(self, title, due_in=None, status='pending'):
+        """Add a task directly (no event), due due_in after the test clock's now."""
+        with self.app.app_context():
+            task = Task(title=title, status=status, user_id=self.user_id)
+            task.due_date = self.now + due_in if due_in is not None else None
+            db.session.add(task)
+            db.session.commit()
+            return task.id
+
+    def advance(self, delta):
+        """Move the clock forward and run the scheduler; return the event types fired as (type, title)."""
+        self.now += delta
+        self.scheduler.tick()
+        fired = [(event['type'], event['title']) for event in self.sink.events]
+        self.sink.events.clear()
+        return fired
+
+    def test_reminder_then_overdue(self):
+        """Test each task gets a reminder before its due date and an overdue event at it, once."""
+        self.insert('Soon', timedelta(minutes=40))
+        self.insert('Later', timedelta(minutes=90))
+        self.insert('Done', timedelta(minutes=40), status='completed')
+        self.insert('Undated')
+
+        self.assertEqual(self.advance(timedelta(0)), [])
+        self.assertEqual(self.advance(timedelta(minutes=10)), [('task.reminder', 'Soon')])
+        self.assertEqual(self.advance(timedelta(minutes=30)), [('task.overdue', 'Soon')])
+        self.assertEqual(self.advance(timedelta(minutes=20)), [('task.reminder', 'Later')])
+        self.assertEqual(self.advance(timedelta(minutes=30)), [('task.overdue', 'Later')])
+        self.assertEqual(self.advance(timedelta(minutes=10)), [])
+
+    def test_event_fields(self):
+        """Test events carry a stable id, the task and both times."""
+        task_id = self.insert('Soon', timedelta(minutes=10))
+        self.advance(timedelta(0))
+        self.now += timedelta(minutes=10)
+        self.scheduler.tick()
+
+        [event] = self.sink.events
+        due_date = datetime(2030, 1, 1, 12, 10)
+        self.assertEqual(event, {
+            'id': f'task.overdue:{task_id}:{due_date.isoformat()}',
+            'type': 'task.overdue',
+            'task_id': task_id,
+            'user_id': self.user_id,
+            'title': 'Soon',
+            'due_date': due_date,
+            'fired_at': self.now
+        })
+
+    def test_writes_reschedule(self):
+        """Test created, moved, completed and deleted tasks update the schedule without a rescan."""
+        self.advance(timedelta(0))
+        due = lambda minutes: (self.now + timedelta(minutes=minutes)).isoformat()
+
+        created = self.client.post('/api/tasks', headers=self.headers, json={'title': 'Created', 'due_date': due(20)})
+        self.assertEqual(created.status_code, 201)
+        moved = self.client.post('/api/tasks', headers=self.headers, json={'title': 'Moved', 'due_date': due(20)})
+        completed = self.client.post('/api/tasks', headers=self.headers, json={'title': 'Completed', 'due_date': due(20)})
+        deleted = self.client.post('/api/tasks', headers=self.headers, json={'title': 'Deleted', 'due_date': due(20)})
+
+        self.client.put(f"/api/tasks/{moved.get_json()['task']['id']}", headers=self.headers, json={'due_date': due(100)})
+        self.client.put(f"/api/tasks/{completed.get_json()['task']['id']}", headers=self.headers, json={'status': 'completed'})
+        self.client.delete(f"/api/tasks/{deleted.get_json()['task']['id']}", headers=self.headers)
+
+        self.assertEqual(self.advance(timedelta(0)), [('task.reminder', 'Created')])
+        self.assertEqual(self.advance(timedelta(minutes=20)), [('task.overdue', 'Created')])
+        self.assertEqual(self.advance(timedelta(minutes=50)), [('task.reminder', 'Moved')])
+
+    def test_window_is_extended(self):
+        """Test tasks due beyond the loaded window are scanned in as time passes."""
+        self.insert('Next day', timedelta(hours=20))
+        self.advance(timedelta(0))
+        self.assertNotIn('Next day', [state[2] for state in self.scheduler._tasks.values()])
+
+        self.assertEqual(self.advance(timedelta(hours=19, minutes=30)), [('task.reminder', 'Next day')])
+
+    def test_rescan_catches_missed_writes(self):
+        """Test the periodic rescan picks up writes the scheduler had no event for."""
+        self.advance(timedelta(0))
+        self.insert('Unannounced', timedelta(minutes=20))
+
+        self.assertEqual(self.advance(timedelta(minutes=1)), [])
+        self.assertEqual(self.advance(timedelta(minutes=5)), [('task.reminder', 'Unannounced')])
+
+    def test_rescan_catches_writes_due_before_it(self):
+        """Test a write with no event that falls due between two rescans still fires, once."""
+        self.advance(timedelta(0))
+        self.insert('Unannounced', timedelta(minutes=2))
+
+        self.assertEqual(self.advance(timedelta(minutes=1)), [])
+        self.assertEqual(self.advance(timedelta(minutes=5)), [('task.overdue', 'Unannounced')])
+        self.assertEqual(self.advance(timedelta(minutes=5)), [])
+
+    def test_restart_rescans_bounded_window(self):
+        """Test a new scheduler sends missed overdue events from the catch-up window only."""
+        self.insert('Missed recently', -timedelta(minutes=30))
+        self.insert('Missed long ago', -timedelta(hours=3))
+        self.insert('Upcoming', timedelta(minutes=10))
+
+        self.assertEqual(self.advance(timedelta(0)), [('task.overdue', 'Missed recently'), ('task.reminder', 'Upcoming')])
+        self.assertEqual(self.advance(timedelta(minutes=1)), [])
+
+    def test_background_thread(self):
+        """Test the scheduler thread wakes for a new task's events and stops on request."""
+        self.now = datetime.utcnow()
+        self.scheduler.start()
+        self.client.post('/api/tasks', headers=self.headers, json={'title': 'Overdue', 'due_date': self.now.isoformat()})
+
+        deadline = time.monotonic() + 5
+        while not self.sink.events and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.scheduler.stop()
+        self.scheduler._thread.join(5)
+
+        self.assertEqual([(event['type'], event['title']) for event in self.sink.events], [('task.overdue', 'Overdue')])
+        self.assertFalse(self.scheduler._thread.is_alive())
+
+    def test_command_requires_shared_events(self):
+        """Test run-due-scheduler refuses to start on per-process task events unless told to."""
+        result = self.app.test_cli_runner().invoke(args=['run-due-scheduler'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('TASK_EVENTS_BACKEND=memory', result.output)
+        self.assertIn('--rescan-only', result.output)
+
+    def test_file_sink(self):
+        """Test the file sink appends one JSON line per event."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'events.ndjson')
+            self.scheduler.sink = FileDueEventSink(path)
+            self.insert('Soon', timedelta(minutes=10))
+            self.advance(timedelta(0))
+            self.advance(timedelta(minutes=10))
+
+            with open(path) as events_file:
+                events = [json.loads(line) for line in events_file]
+        self.assertEqual([(event['type'], event['title']) for event in events],
+                         [('task.reminder', 'Soon'), ('task.overdue', 'Soon')])
+        self.assertEqual(events[1]['due_date'], '2030-01-01T12:10:00')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from sqlalchemy import inspect, text
+from main import create_app
+from models.user import db, User
+from models.task import Task
+from services.migrations import upgrade_database, migration_files
+
+class MigrationsTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment."""
+        self.db_dir = tempfile.mkdtemp()
+        self.database_uri = f"sqlite:///{os.path.join(self.db_dir, 'test.db')}"
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': self.database_uri})
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.engine.dispose()
+        shutil.rmtree(self.db_dir)
+
+    def test_startup_does_no_ddl(self):
+        """Test create_app leaves an empty database untouched."""
+        with self.app.app_context():
+            db.drop_all()
+            create_app({'SQLALCHEMY_DATABASE_URI': self.database_uri})
+            self.assertNotIn('tasks', inspect(db.engine).get_table_names())
+
+    def test_upgrade_creates_declared_indexes(self):
+        """Test upgrading an existing database adds missing indexes and is idempotent."""
+        with self.app.app_context():
+            db.create_all()
+            db.session.execute(text('DROP INDEX idx_tasks_user_id_status'))
+            db.session.commit()
+
+            self.assertIn('idx_tasks_user_id_status', upgrade_database(db))
+            self.assertEqual(upgrade_database(db), [])
+
+            indexes = {index['name'] for index in inspect(db.engine).get_indexes('tasks')}
+            self.assertTrue({index.name for index in Task.__table__.indexes} <= indexes)
+            self.assertEqual(User.query.filter_by(username='admin').count(), 1)
+
+    def test_upgrade_command(self):
+        """Test the db-upgrade command creates the schema and the admin user."""
+        with self.app.app_context():
+            db.drop_all()
+
+        result = self.app.test_cli_runner().invoke(args=['db-upgrade'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Database is up to date', result.output)
+        with self.app.app_context():
+            self.assertIn('tasks_fts', inspect(db.engine).get_table_names())
+            self.assertIsNotNone(User.query.filter_by(username='admin').first())
+
+    def test_migration_files_ordered(self):
+        """Test SQL migrations are discovered in version order."""
+        versions = [version for version, _ in migration_files()]
+        self.assertEqual(versions, sorted(versions))
+        self.assertEqual(versions[0], '001_initial_schema')
+
+    def test_tasks_updated_at_trigger_dropped(self):
+        """Test the last migration touching update_tasks_updated_at drops it for good."""
+        touching = []
+        for version, path in migration_files():
+            with open(path) as f:
+                sql = f.read()
+            if 'update_tasks_updated_at' in sql:
+                touching.append((version, sql))
+        version, sql = touching[-1]
+        self.assertNotEqual(version, '001_initial_schema')
+        self.assertIn('DROP TRIGGER IF EXISTS update_tasks_updated_at ON tasks', sql)
+        self.assertNotIn('CREATE TRIGGER update_tasks_updated_at', sql)
+
+if __name__ == '__main__':
+    unittest.main()
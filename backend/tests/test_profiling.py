@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import glob
+import shutil
+import tempfile
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import create_app
+from models.user import db, User
+from services.profiling import fingerprint, request_profiler
+
+class ProfilingTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment with profiling enabled."""
+        self.profile_dir = tempfile.mkdtemp()
+        self.app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'PROFILING_ENABLED': True,
+            'SLOW_QUERY_MS': 0,
+            'PROFILE_DIR': self.profile_dir
+        })
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        shutil.rmtree(self.profile_dir)
+
+    def test_disabled_by_default(self):
+        """Test /metrics is not served unless profiling is enabled."""
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        self.assertFalse(app.config['PROFILING_ENABLED'])
+        response = app.test_client().get('/metrics')
+        self.assertEqual(response.status_code, 404)
+
+    def test_server_timing_header(self):
+        """Test a request reports its SQL, serialization, JWT and total time."""
+        self.client.post('/api/tasks', headers=self.headers, json={'title': 'Profiled'})
+        response = self.client.get('/api/tasks', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        timings = dict(part.strip().split(';dur=') for part in response.headers['Server-Timing'].split(','))
+        self.assertEqual(set(timings), {'sql', 'serialize', 'jwt', 'total'})
+        self.assertGreater(float(timings['sql']), 0)
+        self.assertGreater(float(timings['serialize']), 0)
+        self.assertGreater(float(timings['jwt']), 0)
+
+    def test_aggregates_per_endpoint(self):
+        """Test requests, query counts and durations are aggregated by endpoint."""
+        for _ in range(3):
+            self.client.get('/api/tasks', headers=self.headers)
+        self.client.get('/api/tasks/999', headers=self.headers)
+
+        endpoints = request_profiler.snapshot()['endpoints']
+        stats = endpoints[('tasks.get_tasks', 'GET')]
+        self.assertEqual(stats['count'], 3)
+        self.assertEqual(stats['statuses'], {200: 3})
+        self.assertGreaterEqual(stats['queries'], 6)
+        self.assertEqual(stats['buckets'][-1], 3)
+        self.assertEqual(endpoints[('tasks.get_task', 'GET')]['statuses'], {404: 1})
+
+    def test_metrics_prometheus_format(self):
+        """Test /metrics renders counters, histograms and slow queries."""
+        self.client.get('/api/tasks', headers=self.headers)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+
+        body = response.get_data(as_text=True)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_requests_total{endpoint="tasks.get_tasks",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{endpoint="tasks.get_tasks",method="GET"} 1', body)
+        self.assertIn('http_request_sql_queries_total{endpoint="tasks.get_tasks",method="GET"}', body)
+        # SLOW_QUERY_MS=0 disables the slow-query log
+        self.assertNotIn('db_slow_queries_total{', body)
+        # /metrics itself is not profiled
+        self.assertNotIn('endpoint="metrics"', body)
+
+    def test_metrics_token(self):
+        """Test METRICS_TOKEN guards /metrics."""
+        request_profiler.metrics_token = 'scrape-secret'
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_slow_queries_logged_by_fingerprint(self):
+        """Test statements over the threshold are logged and counted by fingerprint."""
+        request_profiler.slow_query_seconds = 1e-9
+        with self.assertLogs('services.profiling', level='WARNING') as logs:
+            self.client.get('/api/tasks/1', headers=self.headers)
+            self.client.get('/api/tasks/2', headers=self.headers)
+
+        self.assertTrue(any('Slow query' in line for line in logs.output))
+        slow = request_profiler.snapshot()['slow_queries']
+        by_statement = {entry['statement']: entry['count'] for entry in slow.values()}
+        # Both lookups share one fingerprint
+        self.assertIn(2, by_statement.values())
+
+    def test_fingerprint(self):
+        """Test literals, parameters and value lists are normalized."""
+        self.assertEqual(
+            fingerprint("SELECT * FROM tasks WHERE id IN (1, 2, 3) AND title = 'it''s'  AND user_id = ?"),
+            'SELECT * FROM tasks WHERE id IN (?+) AND title = ? AND user_id = ?'
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM tasks WHERE id = %(id_1)s LIMIT %s'),
+            fingerprint('SELECT * FROM tasks WHERE id = :id_1 LIMIT 10')
+        )
+        self.assertEqual(fingerprint('SELECT x::text FROM tasks_fts'), 'SELECT x::text FROM tasks_fts')
+
+    def test_sampled_cprofile(self):
+        """Test requests to PROFILE_ENDPOINT are captured at the sample rate."""
+        request_profiler.profile_endpoint = 'tasks.get_tasks'
+        request_profiler.profile_sample_rate = 1.0
+        self.client.get('/api/tasks', headers=self.headers)
+        self.client.get('/api/tasks/1', headers=self.headers)
+
+        files = glob.glob(os.path.join(self.profile_dir, '*.prof'))
+        self.assertEqual(len(files), 1)
+        self.assertTrue(os.path.basename(files[0]).startswith('tasks.get_tasks-'))
+
+        request_profiler.profile_sample_rate = 0.0
+        self.client.get('/api/tasks', headers=self.headers)
+        self.assertEqual(request_profiler.snapshot()['profiles_captured'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from flask import Response, stream_with_context
+from main import create_app
+from models.user import db, User
+from models.task import Task
+from services.migrations import upgrade_database
+from services.query_budget import QueryBudgetExceeded, assert_max_queries, budget_chunks, query_budget
+
+class QueryBudgetTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment."""
+        self.db_dir = tempfile.mkdtemp()
+        self.database_uri = f"sqlite:///{os.path.join(self.db_dir, 'test.db')}"
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': self.database_uri})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            upgrade_database(db)
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+            admin = User.query.filter_by(username='admin').first()
+
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+            self.admin_headers = {'Authorization': f"Bearer {create_access_token(identity=admin.id, additional_claims={'role': 'admin'})}"}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.engine.dispose()
+        shutil.rmtree(self.db_dir)
+
+    def test_every_route_declares_a_budget(self):
+        """Test every view is wrapped in @query_budget."""
+        missing = [
+            endpoint for endpoint, view in self.app.view_functions.items()
+            if endpoint != 'static' and not hasattr(view, 'query_budget')
+        ]
+        self.assertEqual(missing, [])
+
+    def test_every_route_within_budget(self):
+        """Test one request to each route stays within its budget (enforced under TESTING)."""
+        client, headers = self.client, self.headers
+
+        self.assertEqual(client.get('/').status_code, 200)
+        self.assertEqual(client.get('/health').status_code, 200)
+
+        self.assertEqual(client.post('/api/auth/register', json={
+            'username': 'another', 'email': 'another@example.com', 'password': 'Password123'
+        }).status_code, 201)
+        login = client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpassword'})
+        self.assertEqual(login.status_code, 200)
+        self.assertEqual(client.post('/api/auth/refresh', headers={
+            'Authorization': f"Bearer {login.get_json()['refresh_token']}"
+        }).status_code, 200)
+        self.assertEqual(client.get('/api/auth/profile', headers=headers).status_code, 200)
+        self.assertEqual(client.put('/api/auth/profile', headers=headers, json={
+            'username': 'renamed', 'email': 'renamed@example.com'
+        }).status_code, 200)
+
+        created = client.post('/api/tasks', headers=headers, json={'title': 'Budgeted', 'priority': 'high'})
+        self.assertEqual(created.status_code, 201)
+        task_id = created.get_json()['task']['id']
+        etag = created.headers['ETag']
+
+        self.assertEqual(client.get('/api/tasks?search=budget', headers=headers).status_code, 200)
+        self.assertEqual(client.get('/api/tasks?cursor=', headers=headers).status_code, 200)
+        self.assertEqual(client.get(f'/api/tasks/{task_id}', headers={**headers, 'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(client.get('/api/tasks/export', headers=headers).status_code, 200)
+        stream = client.get('/api/tasks/stream', headers=headers, buffered=False)
+        self.assertEqual(stream.status_code, 200)
+        stream.close()
+        changes = client.get('/api/tasks/changes', headers=headers)
+        self.assertEqual(changes.status_code, 200)
+        self.assertEqual(client.get(f"/api/tasks/changes?since={changes.get_json()['sync_token']}",
+                                    headers=headers).status_code, 200)
+        self.assertEqual(client.put(f'/api/tasks/{task_id}', headers={**headers, 'If-Match': etag},
+                                    json={'status': 'completed', 'priority': 'low'}).status_code, 200)
+
+        bulk = client.post('/api/tasks/bulk', headers=headers, json={'tasks': [
+            {'title': f'Bulk {i}', 'status': status, 'priority': priority}
+            for i, (status, priority) in enumerate([('pending', 'low'), ('in_progress', 'high'), ('completed', 'medium')])
+        ]})
+        self.assertEqual(bulk.status_code, 201)
+        ids = [result['id'] for result in bulk.get_json()['results']]
+        self.assertEqual(client.put('/api/tasks/bulk', headers=headers, json={'tasks': [
+            {'id': task_id, 'status': 'completed'} for task_id in ids
+        ]}).status_code, 200)
+        self.assertEqual(client.delete('/api/tasks/bulk', headers=headers, json={'ids': ids}).status_code, 200)
+        self.assertEqual(client.post('/api/tasks/import', headers=headers, data=b'{"title": "Imported"}\n').status_code, 200)
+        self.assertEqual(client.delete(f'/api/tasks/{task_id}', headers=headers).status_code, 200)
+
+        for path in ('statistics', 'priority', 'status', 'summary', 'trends?bucket=week', 'cache'):
+            self.assertEqual(client.get(f'/api/analytics/{path}', headers=self.admin_headers).status_code, 200)
+        self.assertEqual(client.get('/api/internal/pool', headers=self.admin_headers).status_code, 200)
+        self.assertEqual(client.get('/api/internal/auth', headers=self.admin_headers).status_code, 200)
+        self.assertEqual(client.get('/api/internal/admission', headers=self.admin_headers).status_code, 200)
+
+        # Last: revokes the token the requests above used
+        self.assertEqual(client.post('/api/auth/logout', headers=headers).status_code, 200)
+
+    def test_exceeding_budget_lists_statements(self):
+        """Test a view over budget fails with the statements it ran."""
+        @self.app.route('/over-budget')
+        @query_budget(1)
+        def over_budget():
+            for task_id in (1, 2):
+                db.session.get(Task, task_id)
+            return 'ok'
+
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            self.client.get('/over-budget')
+
+        self.assertEqual(len(raised.exception.statements), 2)
+        message = str(raised.exception)
+        self.assertIn('over_budget ran 2 SQL queries, budget is 1', message)
+        self.assertIn('  2. SELECT tasks.id', message)
+
+    def test_streamed_chunks_budgeted(self):
+        """Test a streaming view's body is held to its budget one chunk at a time."""
+        @self.app.route('/streamed')
+        @query_budget(0)
+        def streamed():
+            def generate():
+                for task_id in (1, 2):
+                    db.session.get(Task, task_id)
+                    yield 'chunk\n'
+                db.session.get(Task, 3)
+                db.session.get(Task, 4)
+                yield 'last\n'
+            return Response(stream_with_context(budget_chunks(generate(), 1, label='streamed chunk')))
+
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            self.client.get('/streamed').get_data()
+
+        self.assertIn('streamed chunk ran 2 SQL queries, budget is 1', str(raised.exception))
+
+    def test_large_import_and_export_within_chunk_budgets(self):
+        """Test import batches and export chunks stay within budget however many there are."""
+        self.app.config['IMPORT_BATCH_SIZE'] = 10
+        body = ''.join(f'{{"title": "Imported {i}", "priority": "{("low", "high")[i % 2]}"}}\n' for i in range(45))
+        response = self.client.post('/api/tasks/import', headers=self.headers, data=body.encode())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_data(as_text=True).splitlines()), 6)
+
+        with self.app.app_context():
+            self.assertEqual(Task.query.count(), 45)
+
+        response = self.client.get('/api/tasks/export?format=csv', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_data(as_text=True).splitlines()), 46)
+
+    def test_budget_not_enforced_outside_testing(self):
+        """Test budgets are only recorded unless TESTING or QUERY_BUDGET_ENFORCE is set."""
+        @self.app.route('/over-budget')
+        @query_budget(0)
+        def over_budget():
+            db.session.get(Task, 1)
+            return 'ok'
+
+        self.app.config['TESTING'] = False
+        self.assertEqual(self.client.get('/over-budget').status_code, 200)
+
+        self.app.config['QUERY_BUDGET_ENFORCE'] = True
+        self.assertEqual(self.client.get('/over-budget').status_code, 500)
+
+    def test_assert_max_queries_catches_n_plus_one(self):
+        """Test the context manager flags per-row lookups."""
+        with self.app.app_context():
+            for i in range(5):
+                db.session.add(Task(title=f'Task {i}', user_id=1))
+            db.session.commit()
+            ids = [task_id for (task_id,) in db.session.query(Task.id)]
+            db.session.expunge_all()
+
+            with self.assertRaises(QueryBudgetExceeded):
+                with assert_max_queries(db.engine, 1):
+                    [db.session.get(Task, task_id) for task_id in ids]
+
+            db.session.expunge_all()
+            with assert_max_queries(db.engine, 1) as statements:
+                Task.query.filter(Task.id.in_(ids)).all()
+            self.assertEqual(len(statements), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import sys
+import os
+import threading
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import create_app
+from models.user import db, User
+from services.rate_limit import MemoryRateLimitBackend, admission_control
+
+class RateLimitTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment with admission control enabled."""
+        self.app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'RATE_LIMIT_ENABLED': True,
+            'RATE_LIMIT_USER_RATE': 0.01,
+            'RATE_LIMIT_USER_BURST': 3,
+            'RATE_LIMIT_IP_RATE': 0.01,
+            'RATE_LIMIT_IP_BURST': 5
+        })
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def statuses(self, count, path='/api/tasks', **kwargs):
+        return [self.client.get(path, **kwargs).status_code for _ in range(count)]
+
+    def test_token_bucket(self):
+        """Test a bucket allows its burst, then refills at its rate."""
+        backend = MemoryRateLimitBackend()
+        self.assertEqual([backend.consume('k', 0.5, 2)[0] for _ in range(3)], [True, True, False])
+
+        allowed, retry_after = backend.consume('k', 0.5, 2)
+        self.assertFalse(allowed)
+        self.assertTrue(0 < retry_after <= 2)
+
+        # Two seconds later, one token has been refilled
+        tokens, updated = backend._buckets['k']
+        backend._buckets['k'] = (tokens, updated - 2)
+        self.assertEqual([backend.consume('k', 0.5, 2)[0] for _ in range(2)], [True, False])
+
+    def test_memory_backend_evicts_idle_buckets(self):
+        """Test the number of buckets is bounded."""
+        backend = MemoryRateLimitBackend(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            backend.consume(key, 1, 1)
+        self.assertEqual(len(backend), 2)
+        self.assertTrue(backend.consume('a', 1, 1)[0])
+
+    def test_user_rate_limit(self):
+        """Test authenticated requests beyond the user's burst get 429 with Retry-After."""
+        self.assertEqual(self.statuses(4, headers=self.headers), [200, 200, 200, 429])
+
+        response = self.client.get('/api/tasks', headers=self.headers)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response.headers['Retry-After']), 1)
+        self.assertEqual(admission_control.stats()['rejected']['user_rate_limit'], 2)
+
+    def test_ip_rate_limit(self):
+        """Test requests from one address share a bucket, and other addresses are unaffected."""
+        self.assertEqual(self.statuses(6, '/'), [200] * 5 + [429])
+        self.assertEqual(self.client.get('/', environ_base={'REMOTE_ADDR': '10.0.0.2'}).status_code, 200)
+        self.assertEqual(admission_control.stats()['rejected']['ip_rate_limit'], 1)
+
+    def test_forwarded_client_ip(self):
+        """Test X-Forwarded-For is used behind the configured number of proxies."""
+        admission_control.proxy_hops = 1
+        self.assertEqual(self.statuses(6, '/', headers={'X-Forwarded-For': '203.0.113.1'}), [200] * 5 + [429])
+        self.assertEqual(self.client.get('/', headers={'X-Forwarded-For': '203.0.113.2'}).status_code, 200)
+
+    def test_health_exempt(self):
+        """Test /health is never limited or shed."""
+        admission_control.max_in_flight = 1
+        admission_control.in_flight = 1
+        try:
+            self.assertEqual(self.statuses(10, '/health'), [200] * 10)
+        finally:
+            admission_control.in_flight = 0
+
+    def test_shed_when_too_many_in_flight(self):
+        """Test requests beyond the in-flight limit get 503 with Retry-After and are counted."""
+        self.app.config['LOAD_SHED_MAX_IN_FLIGHT'] = 1
+        admission_control.init_app(self.app, db)
+
+        entered, release = threading.Event(), threading.Event()
+
+        @self.app.route('/slow')
+        def slow():
+            entered.set()
+            release.wait(5)
+            return 'done'
+
+        slow_client = self.app.test_client()
+        blocked = threading.Thread(target=slow_client.get, args=('/slow',))
+        blocked.start()
+        try:
+            entered.wait(5)
+            response = self.client.get('/api/tasks', headers=self.headers)
+        finally:
+            release.set()
+            blocked.join()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        stats = admission_control.stats()
+        self.assertEqual((stats['rejected']['in_flight'], stats['in_flight']), (1, 0))
+        self.assertEqual(self.client.get('/api/tasks', headers=self.headers).status_code, 200)
+
+    def test_disabled_under_testing_by_default(self):
+        """Test admission control stays out of the way of other tests."""
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        with app.app_context():
+            self.assertFalse(admission_control.is_enabled())
+
+    def test_admission_metrics_admin_only(self):
+        """Test /api/internal/admission reports counters to admins only."""
+        self.assertEqual(self.client.get('/api/internal/admission', headers=self.headers).status_code, 403)
+
+        with self.app.app_context():
+            from flask_jwt_extended import create_access_token
+            admin_headers = {'Authorization': f"Bearer {create_access_token(identity=1, additional_claims={'role': 'admin'})}"}
+        response = self.client.get('/api/internal/admission', headers=admin_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['admission']['rejected']['user_rate_limit'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
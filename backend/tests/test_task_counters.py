@@ -0,0 +1,143 @@
+import unittest
+import random
+import sys
+import os
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from main import create_app
+from models.user import db, User
+from models.task import Task
+from models.task_counter import TaskCounter
+from services.task_counters import reconcile_task_counters, rebuild_task_counters
+
+STATUSES = ['pending', 'in_progress', 'completed']
+PRIORITIES = ['low', 'medium', 'high']
+
+class TaskCountersTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment."""
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            self.tokens = []
+            for i in range(3):
+                user = User(username=f'user{i}', email=f'user{i}@example.com')
+                user.set_password('testpassword')
+                db.session.add(user)
+                db.session.commit()
+                self.tokens.append(create_access_token(identity=user.id))
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def assertCountersConsistent(self):
+        """Assert task_counters matches a live COUNT over tasks."""
+        with self.app.app_context():
+            self.assertEqual(reconcile_task_counters(db), {})
+
+    def test_fuzz_create_update_delete(self):
+        """Test counters stay exact across random create/update/delete sequences."""
+        rng = random.Random(1234)
+        owned = {i: [] for i in range(len(self.tokens))}
+
+        for step in range(150):
+            owner = rng.randrange(len(self.tokens))
+            headers = {'Authorization': f'Bearer {self.tokens[owner]}'}
+            action = rng.choice(['create', 'create', 'update', 'delete'])
+
+            if action == 'create' or not owned[owner]:
+                response = self.client.post('/api/tasks', headers=headers, json={
+                    'title': f'Task {step}',
+                    'status': rng.choice(STATUSES),
+                    'priority': rng.choice(PRIORITIES)
+                })
+                self.assertEqual(response.status_code, 201)
+                owned[owner].append(response.get_json()['task']['id'])
+            elif action == 'update':
+                task_id = rng.choice(owned[owner])
+                data = {}
+                if rng.random() < 0.7:
+                    data['status'] = rng.choice(STATUSES)
+                if rng.random() < 0.7:
+                    data['priority'] = rng.choice(PRIORITIES)
+                response = self.client.put(f'/api/tasks/{task_id}', headers=headers, json=data or {'title': 'Renamed'})
+                self.assertEqual(response.status_code, 200)
+            else:
+                task_id = owned[owner].pop(rng.randrange(len(owned[owner])))
+                response = self.client.delete(f'/api/tasks/{task_id}', headers=headers)
+                self.assertEqual(response.status_code, 200)
+
+            if step % 10 == 0:
+                self.assertCountersConsistent()
+
+        self.assertCountersConsistent()
+
+    def test_failed_write_leaves_counters_untouched(self):
+        """Test rejected writes don't move any counter."""
+        headers = {'Authorization': f'Bearer {self.tokens[0]}'}
+        response = self.client.post('/api/tasks', headers=headers, json={'title': 'Task', 'status': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+
+        with self.app.app_context():
+            self.assertEqual(TaskCounter.query.count(), 0)
+
+    def test_writes_lock_the_task_row(self):
+        """Test update and delete read the task FOR UPDATE, so concurrent writes cannot apply counter deltas twice."""
+        headers = {'Authorization': f'Bearer {self.tokens[0]}'}
+        task_id = self.client.post('/api/tasks', headers=headers, json={'title': 'Task'}).get_json()['task']['id']
+
+        locked = []
+
+        def record_lock(state):
+            if state.is_select and state.statement._for_update_arg is not None:
+                locked.append(state.statement.compile(dialect=postgresql.dialect()).string)
+
+        event.listen(Session, 'do_orm_execute', record_lock)
+        try:
+            self.client.put(f'/api/tasks/{task_id}', headers=headers, json={'status': 'completed'})
+            self.client.delete(f'/api/tasks/{task_id}', headers=headers)
+        finally:
+            event.remove(Session, 'do_orm_execute', record_lock)
+
+        self.assertEqual(len(locked), 2)
+        self.assertTrue(all(statement.endswith('FOR UPDATE') for statement in locked))
+        self.assertCountersConsistent()
+
+    def test_rebuild_repairs_drift(self):
+        """Test rebuild and the reconcile check on a drifted table."""
+        headers = {'Authorization': f'Bearer {self.tokens[0]}'}
+        self.client.post('/api/tasks', headers=headers, json={'title': 'Task', 'priority': 'high'})
+
+        with self.app.app_context():
+            # Simulate drift from a write that bypassed the routes
+            user_id = TaskCounter.query.first().user_id
+            db.session.add(Task(title='Direct', status='completed', user_id=user_id))
+            db.session.commit()
+            self.assertEqual(reconcile_task_counters(db), {(user_id, 'completed', 'medium'): (0, 1)})
+
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=['rebuild-task-counters', '--check'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('1 counter(s) out of sync', result.output)
+
+        result = runner.invoke(args=['rebuild-task-counters'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertCountersConsistent()
+
+        with self.app.app_context():
+            self.assertEqual(rebuild_task_counters(db), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,291 @@
+import unittest
+import sys
+import os
+import json
+import queue
+import threading
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import create_app
+from models.user import db, User
+from services.task_events import MemoryTaskEventBackend, RedisTaskEventBackend, task_events
+
+def parse_events(text):
+    """(id, event type, data) for each message in SSE text; comments and the retry field are skipped."""
+    if isinstance(text, bytes):
+        text = text.decode()
+    events = []
+    for message in text.split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in message.splitlines() if line and not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields.get('id'), fields['event'], json.loads(fields['data'])))
+    return events
+
+class FakeRedisStream:
+    """The Redis stream commands RedisTaskEventBackend uses, in memory, with blocking XREAD."""
+
+    def __init__(self):
+        self.entries = []
+        self._changed = threading.Condition()
+
+    def xadd(self, key, fields, maxlen=None, approximate=False):
+        with self._changed:
+            entry_id = f'1-{len(self.entries) + 1}'
+            self.entries.append((entry_id, fields))
+            self._changed.notify_all()
+        return entry_id
+
+    def xrevrange(self, key, count=None):
+        return self.entries[::-1][:count]
+
+    def xread(self, streams, block=None):
+        [(key, last_id)] = streams.items()
+        after = len(self.entries) if last_id == '$' else int(last_id.split('-')[1])
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.entries) > after, block / 1000)
+            entries = self.entries[after:]
+        return [[key, entries]] if entries else []
+
+class TaskEventsTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment with a short heartbeat, so reads of an idle stream return quickly."""
+        self.app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'TASK_EVENTS_HEARTBEAT': 0.05
+        })
+        self.client = self.app.test_client()
+        self.streams = []
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            other = User(username='otheruser', email='other@example.com')
+            other.set_password('testpassword')
+            db.session.add_all([user, other])
+            db.session.commit()
+
+            self.user_id = user.id
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+            self.other_headers = {'Authorization': f'Bearer {create_access_token(identity=other.id)}'}
+            self.admin_headers = {'Authorization': f"Bearer {create_access_token(identity=99, additional_claims={'role': 'admin'})}"}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        for response in self.streams:
+            response.close()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def open_stream(self, headers, last_event_id=None):
+        """Open the feed; return the response and an iterator over its chunks."""
+        if last_event_id:
+            headers = {**headers, 'Last-Event-ID': last_event_id}
+        response = self.client.get('/api/tasks/stream', headers=headers, buffered=False)
+        self.streams.append(response)
+        return response, iter(response.response)
+
+    def read(self, chunks, count=1, beats=5):
+        """Events from the next chunks until count have arrived or beats heartbeats have passed."""
+        events = []
+        for chunk in chunks:
+            events.extend(parse_events(chunk))
+            beats -= chunk == b': keep-alive\n\n'
+            if len(events) >= count or beats <= 0:
+                break
+        return events
+
+    def create(self, title, headers=None):
+        response = self.client.post('/api/tasks', headers=headers or self.headers, json={'title': title})
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['task']
+
+    def test_stream_headers(self):
+        """Test the feed is an uncached event stream starting with the reconnection delay."""
+        response, chunks = self.open_stream(self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertEqual(next(chunks), b'retry: 3000\n\n')
+
+        self.assertEqual(self.client.get('/api/tasks/stream').status_code, 401)
+
+    def test_write_routes_publish(self):
+        """Test create, update and delete each push an event with the task."""
+        _, chunks = self.open_stream(self.headers)
+        next(chunks)
+
+        task = self.create('Streamed')
+        [(_, event_type, data)] = self.read(chunks)
+        self.assertEqual(event_type, 'task.created')
+        self.assertEqual(data, {'type': 'task.created', 'task': task})
+
+        updated = self.client.put(f"/api/tasks/{task['id']}", headers=self.headers, json={'status': 'completed'})
+        [(_, event_type, data)] = self.read(chunks)
+        self.assertEqual(event_type, 'task.updated')
+        self.assertEqual(data['task'], updated.get_json()['task'])
+
+        self.client.delete(f"/api/tasks/{task['id']}", headers=self.headers)
+        [(_, event_type, data)] = self.read(chunks)
+        self.assertEqual((event_type, data['task']), ('task.deleted', {'id': task['id']}))
+
+    def test_bulk_routes_publish(self):
+        """Test bulk writes push one event per task."""
+        _, chunks = self.open_stream(self.headers)
+        next(chunks)
+
+        response = self.client.post('/api/tasks/bulk', headers=self.headers, json={'tasks': [{'title': 'A'}, {'title': 'B'}]})
+        ids = [result['id'] for result in response.get_json()['results']]
+        created = self.read(chunks, count=2)
+        self.assertEqual([data['task']['id'] for _, _, data in created], ids)
+        self.assertEqual([data['task']['title'] for _, _, data in created], ['A', 'B'])
+        self.assertEqual({event_type for _, event_type, _ in created}, {'task.created'})
+
+        self.client.put('/api/tasks/bulk', headers=self.headers, json={'tasks': [{'id': i, 'priority': 'high'} for i in ids]})
+        updated = self.read(chunks, count=2)
+        self.assertEqual([(data['task']['id'], data['task']['priority']) for _, _, data in updated], [(i, 'high') for i in ids])
+
+        self.client.delete('/api/tasks/bulk', headers=self.headers, json={'ids': ids})
+        deleted = self.read(chunks, count=2)
+        self.assertEqual([(event_type, data['task']) for _, event_type, data in deleted],
+                         [('task.deleted', {'id': i}) for i in ids])
+
+    def test_visibility(self):
+        """Test users only see their own tasks' events, and admins see everyone's."""
+        _, own = self.open_stream(self.headers)
+        _, admin = self.open_stream(self.admin_headers)
+        next(own), next(admin)
+
+        self.create('Other', headers=self.other_headers)
+        self.create('Mine')
+
+        self.assertEqual([data['task']['title'] for _, _, data in self.read(own, count=2)], ['Mine'])
+        self.assertEqual([data['task']['title'] for _, _, data in self.read(admin, count=2)], ['Other', 'Mine'])
+
+    def test_resume_from_last_event_id(self):
+        """Test a reconnecting client gets the events it missed from the log, once each."""
+        _, chunks = self.open_stream(self.headers)
+        next(chunks)
+        self.create('First')
+        [(first_id, _, _)] = self.read(chunks)
+
+        self.create('Second')
+        self.create('Other', headers=self.other_headers)
+        self.create('Third')
+
+        _, resumed = self.open_stream(self.headers, last_event_id=first_id)
+        replayed = parse_events(next(resumed))
+        self.assertEqual([data['task']['title'] for _, _, data in replayed], ['Second', 'Third'])
+
+        # Then live events, without repeating the replayed ones
+        self.create('Fourth')
+        self.assertEqual([data['task']['title'] for _, _, data in self.read(resumed)], ['Fourth'])
+
+        # Also accepted as a query parameter, for clients that cannot set headers
+        response = self.client.get(f'/api/tasks/stream?last_event_id={replayed[-1][0]}', headers=self.headers,
+                                   buffered=False)
+        self.streams.append(response)
+        self.assertEqual([data['task']['title'] for _, _, data in parse_events(next(iter(response.response)))],
+                         ['Fourth'])
+
+    def test_reset_when_log_does_not_cover(self):
+        """Test unknown or compacted event ids get a reset event instead of a partial replay."""
+        self.app.config['TASK_EVENTS_LOG_SIZE'] = 2
+        task_events.init_app(self.app)
+
+        _, chunks = self.open_stream(self.headers)
+        next(chunks)
+        self.create('First')
+        [(first_id, _, _)] = self.read(chunks)
+        for title in ('Second', 'Third', 'Fourth'):
+            self.create(title)
+
+        for last_event_id in (first_id, 'not-an-id', '1-1'):
+            with self.subTest(last_event_id=last_event_id):
+                _, resumed = self.open_stream(self.headers, last_event_id=last_event_id)
+                self.assertEqual(parse_events(next(resumed)), [(None, 'reset', {})])
+
+    def test_slow_client_overflow(self):
+        """Test a full buffer ends the stream after its buffered events, so the client resumes from the log."""
+        self.app.config['TASK_EVENTS_BUFFER'] = 2
+        task_events.init_app(self.app)
+
+        _, chunks = self.open_stream(self.headers)
+        next(chunks)
+        for i in range(5):
+            self.create(f'Task {i}')
+
+        rest = [chunk for chunk in chunks]
+        self.assertEqual([data['task']['title'] for _, _, data in parse_events(b''.join(rest))], ['Task 0', 'Task 1'])
+        self.assertEqual(task_events.stats()['streams'], 0)
+
+        last_id = parse_events(b''.join(rest))[-1][0]
+        _, resumed = self.open_stream(self.headers, last_event_id=last_id)
+        self.assertEqual([data['task']['title'] for _, _, data in parse_events(next(resumed))],
+                         ['Task 2', 'Task 3', 'Task 4'])
+
+    def test_closing_unsubscribes(self):
+        """Test a closed stream stops receiving events."""
+        response, chunks = self.open_stream(self.headers)
+        next(chunks)
+        self.assertEqual(task_events.stats()['streams'], 1)
+
+        response.close()
+        self.assertEqual(task_events.stats()['streams'], 0)
+
+    def test_disabled(self):
+        """Test TASK_EVENTS_BACKEND=none turns the feed off and writes still succeed."""
+        self.app.config['TASK_EVENTS_BACKEND'] = 'none'
+        task_events.init_app(self.app)
+
+        self.assertEqual(self.client.get('/api/tasks/stream', headers=self.headers).status_code, 404)
+        self.create('Unannounced')
+
+    def test_memory_backend_log(self):
+        """Test the in-process log answers since() only while it still holds the requested id."""
+        backend = MemoryTaskEventBackend(log_size=3)
+        ids = [backend.publish({'type': 'task.created', 'user_id': 1, 'task': {'id': i}}) for i in range(5)]
+
+        self.assertEqual([event['task']['id'] for event in backend.since(ids[1])], [2, 3, 4])
+        self.assertEqual(backend.since(ids[4]), [])
+        self.assertIsNone(backend.since(ids[0]))
+        self.assertIsNone(backend.since(f'{backend.epoch + 1}-1'))
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+    def test_redis_reader_starts_in_each_process(self):
+        """Test the Redis reader starts on first use, not at setup, and again in a forked worker."""
+        backend = RedisTaskEventBackend.__new__(RedisTaskEventBackend)
+        backend._client, backend.log_size, backend.key = FakeRedisStream(), 1000, 'task_events'
+        backend._listeners, backend._lock, backend._reader_pid = [], threading.Lock(), None
+        received = queue.Queue()
+        publish = lambda task_id: backend.publish({'type': 'task.created', 'user_id': 1, 'task': {'id': task_id}})
+
+        # As in a preload_app master: listening alone starts no thread
+        backend.listen(received.put)
+        self.assertNotIn('task-events', [thread.name for thread in threading.enumerate()])
+
+        backend.start()
+        publish(1)
+        self.assertEqual(received.get(timeout=5)['task']['id'], 1)
+
+        pid = os.fork()
+        if pid == 0:
+            # The parent's reader thread does not exist here; start() must run a new one
+            status = 1
+            try:
+                backend.start()
+                publish(2)
+                status = 0 if received.get(timeout=5)['task']['id'] == 2 else 1
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+if __name__ == '__main__':
+    unittest.main()
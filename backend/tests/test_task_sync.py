@@ -0,0 +1,180 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import create_app
+from models.user import db, User
+from models.task import Task
+from models.task_deletion import TaskDeletion
+from services.task_import import import_tasks
+from services.task_sync import encode_sync_token
+
+class TaskSyncTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment; without a settle window a sync token points at the end of the changes."""
+        self.app = create_app({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+            'SYNC_SETTLE_SECONDS': 0
+        })
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            other = User(username='otheruser', email='other@example.com')
+            other.set_password('testpassword')
+            db.session.add_all([user, other])
+            db.session.commit()
+
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+            self.other_headers = {'Authorization': f'Bearer {create_access_token(identity=other.id)}'}
+            self.admin_headers = {'Authorization': f"Bearer {create_access_token(identity=99, additional_claims={'role': 'admin'})}"}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def sync(self, token=None, headers=None, **params):
+        if token:
+            params['since'] = token
+        response = self.client.get('/api/tasks/changes', headers=headers or self.headers, query_string=params)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response.get_json()
+
+    def create(self, title, headers=None):
+        response = self.client.post('/api/tasks', headers=headers or self.headers, json={'title': title})
+        return response.get_json()['task']
+
+    def test_initial_sync_then_nothing_new(self):
+        """Test the first sync returns every task, and syncing again with its token returns nothing."""
+        for title in ('First', 'Second'):
+            self.create(title)
+        self.create('Not mine', headers=self.other_headers)
+
+        data = self.sync()
+        self.assertEqual([task['title'] for task in data['changes']], ['First', 'Second'])
+        self.assertEqual(set(data['changes'][0]), {'id', 'title', 'description', 'status', 'priority',
+                                                   'due_date', 'created_at', 'updated_at', 'user_id'})
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+        again = self.sync(data['sync_token'])
+        self.assertEqual((again['changes'], again['deleted']), ([], []))
+
+    def test_changes_and_tombstones_since_token(self):
+        """Test a sync returns only what was created, updated or deleted since the token."""
+        kept = self.create('Kept')
+        edited = self.create('Edited')
+        removed = self.create('Removed')
+        token = self.sync()['sync_token']
+
+        created = self.create('Created')
+        self.client.put(f"/api/tasks/{edited['id']}", headers=self.headers, json={'status': 'completed'})
+        self.client.delete(f"/api/tasks/{removed['id']}", headers=self.headers)
+        self.create('Not mine', headers=self.other_headers)
+
+        data = self.sync(token)
+        self.assertEqual([(task['id'], task['status']) for task in data['changes']],
+                         [(created['id'], 'pending'), (edited['id'], 'completed')])
+        self.assertEqual([tombstone['id'] for tombstone in data['deleted']], [removed['id']])
+        self.assertNotIn(kept['id'], [task['id'] for task in data['changes']])
+
+        # Admins sync every user's tasks
+        admin = self.sync(token, headers=self.admin_headers)
+        self.assertEqual([task['title'] for task in admin['changes']], ['Created', 'Edited', 'Not mine'])
+
+    def test_sync_during_import(self):
+        """Test batches an import commits after a sync are returned by the next sync."""
+        with self.app.app_context():
+            user_id = User.query.filter_by(username='testuser').one().id
+            records = [(line, {'title': f'Imported {line}'}, None) for line in range(1, 5)]
+            events = import_tasks(db, records, user_id, batch_size=2)
+            next(events)
+
+            first = self.sync()
+            self.assertEqual(len(first['changes']), 2)
+            self.assertEqual(list(events)[-1]['imported'], 4)
+
+        second = self.sync(first['sync_token'])
+        self.assertEqual([task['title'] for task in second['changes']], ['Imported 3', 'Imported 4'])
+        self.assertEqual(self.sync(second['sync_token'])['changes'], [])
+
+    def test_bulk_delete_records_tombstones(self):
+        """Test bulk deletes are logged like single deletes."""
+        ids = [self.create(f'Task {i}')['id'] for i in range(3)]
+        token = self.sync()['sync_token']
+
+        self.client.delete('/api/tasks/bulk', headers=self.headers, json={'ids': ids[:2]})
+
+        self.assertEqual([tombstone['id'] for tombstone in self.sync(token)['deleted']], ids[:2])
+
+    def test_paging(self):
+        """Test a sync larger than limit continues with has_more and covers every change once."""
+        for i in range(5):
+            self.create(f'Task {i}')
+        deleted = self.create('Deleted')
+        token = self.sync()['sync_token']
+        for i in range(5):
+            self.client.put(f'/api/tasks/{i + 1}', headers=self.headers, json={'priority': 'high'})
+        self.client.delete(f"/api/tasks/{deleted['id']}", headers=self.headers)
+
+        pages = [self.sync(token, limit=2)]
+        while pages[-1]['has_more']:
+            pages.append(self.sync(pages[-1]['sync_token'], limit=2))
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual([task['id'] for page in pages for task in page['changes']], [1, 2, 3, 4, 5])
+        self.assertEqual([tombstone['id'] for page in pages for tombstone in page['deleted']], [deleted['id']])
+
+    def test_settle_window_repeats_recent_changes(self):
+        """Test changes within SYNC_SETTLE_SECONDS of a sync are sent again by the next one."""
+        self.app.config['SYNC_SETTLE_SECONDS'] = 60
+        self.create('Recent')
+
+        token = self.sync()['sync_token']
+        self.assertEqual([task['title'] for task in self.sync(token)['changes']], ['Recent'])
+
+    def test_invalid_and_expired_tokens(self):
+        """Test a malformed token is rejected and one older than the deletion log asks for a full sync."""
+        response = self.client.get('/api/tasks/changes?since=garbage', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        old = datetime.utcnow() - timedelta(days=31)
+        token = encode_sync_token((old, 1), (old, 1))
+        response = self.client.get(f'/api/tasks/changes?since={token}', headers=self.headers)
+        self.assertEqual(response.status_code, 410)
+
+        self.app.config['TASK_DELETIONS_RETENTION_DAYS'] = 0
+        self.assertEqual(self.sync(token)['changes'], [])
+
+        self.assertEqual(self.client.get('/api/tasks/changes').status_code, 401)
+
+    def test_prune_command(self):
+        """Test prune-task-deletions removes only tombstones past the retention period."""
+        with self.app.app_context():
+            user_id = User.query.filter_by(username='testuser').one().id
+            db.session.add_all([
+                TaskDeletion(1, user_id, deleted_at=datetime.utcnow() - timedelta(days=40)),
+                TaskDeletion(2, user_id)
+            ])
+            db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['prune-task-deletions'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Pruned 1 task tombstone(s)', result.output)
+        with self.app.app_context():
+            self.assertEqual([row.task_id for row in TaskDeletion.query.all()], [2])
+
+if __name__ == '__main__':
+    unittest.main()
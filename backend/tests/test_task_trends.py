@@ -0,0 +1,210 @@
+import unittest
+import random
+import sys
+import os
+from datetime import date, datetime, timedelta
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import create_app
+from models.user import db, User
+from models.task import Task
+from models.task_trend import TaskDailyStat
+from services import task_trends
+from services.task_trends import reconcile_task_trends, rebuild_task_trends
+
+STATUSES = ['pending', 'in_progress', 'completed']
+
+class TaskTrendsTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment."""
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            self.user_ids = []
+            self.headers = []
+            for i in range(2):
+                user = User(username=f'user{i}', email=f'user{i}@example.com')
+                user.set_password('testpassword')
+                db.session.add(user)
+                db.session.commit()
+                self.user_ids.append(user.id)
+                self.headers.append({'Authorization': f'Bearer {create_access_token(identity=user.id)}'})
+            self.admin_headers = {'Authorization': f"Bearer {create_access_token(identity=99, additional_claims={'role': 'admin'})}"}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def insert(self, owner, created, status='pending', updated=None, due=None):
+        """Add a task directly (bypassing the rollups) with the given timestamps."""
+        with self.app.app_context():
+            task = Task(title='Task', status=status, user_id=self.user_ids[owner])
+            task.created_at = created
+            task.updated_at = updated or created
+            task.due_date = due
+            db.session.add(task)
+            db.session.commit()
+
+    def seed_history(self):
+        """Tasks across three days in January 2024 (a Monday to a Wednesday), rolled up in small batches."""
+        self.insert(0, datetime(2024, 1, 1, 9))
+        self.insert(0, datetime(2024, 1, 1, 10), status='completed', updated=datetime(2024, 1, 3, 8))
+        self.insert(0, datetime(2024, 1, 2, 11), due=datetime(2024, 1, 3, 17))
+        self.insert(1, datetime(2024, 1, 3, 12), status='completed', updated=datetime(2024, 1, 3, 13))
+        self.insert(1, datetime(2024, 1, 9, 12), due=datetime(2024, 1, 10, 12))
+        with self.app.app_context():
+            rebuild_task_trends(db, batch_size=2)
+
+    def trends(self, headers, **params):
+        response = self.client.get('/api/analytics/trends', headers=headers, query_string=params)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response.get_json()['trends']
+
+    def test_writes_keep_rollups_exact(self):
+        """Test single, bulk and imported writes keep the rollups equal to a recount of the tasks."""
+        rng = random.Random(4321)
+        owned = {0: [], 1: []}
+        today = datetime.utcnow()
+
+        for step in range(80):
+            owner = rng.randrange(2)
+            headers = self.headers[owner]
+            action = rng.choice(['create', 'create', 'update', 'delete'])
+            due = (today + timedelta(days=rng.randint(-5, 5))).isoformat() if rng.random() < 0.6 else None
+
+            if action == 'create' or not owned[owner]:
+                response = self.client.post('/api/tasks', headers=headers, json={
+                    'title': f'Task {step}', 'status': rng.choice(STATUSES), 'due_date': due
+                })
+                self.assertEqual(response.status_code, 201)
+                owned[owner].append(response.get_json()['task']['id'])
+            elif action == 'update':
+                response = self.client.put(f'/api/tasks/{rng.choice(owned[owner])}', headers=headers,
+                                           json={'status': rng.choice(STATUSES), 'due_date': due})
+                self.assertEqual(response.status_code, 200)
+            else:
+                task_id = owned[owner].pop(rng.randrange(len(owned[owner])))
+                self.assertEqual(self.client.delete(f'/api/tasks/{task_id}', headers=headers).status_code, 200)
+
+        bulk = self.client.post('/api/tasks/bulk', headers=self.headers[0], json={'tasks': [
+            {'title': 'Bulk', 'status': status, 'due_date': today.isoformat()} for status in STATUSES
+        ]})
+        ids = [result['id'] for result in bulk.get_json()['results']]
+        self.client.put('/api/tasks/bulk', headers=self.headers[0], json={'tasks': [
+            {'id': task_id, 'status': 'completed'} for task_id in ids[:2]
+        ]})
+        self.client.delete('/api/tasks/bulk', headers=self.headers[0], json={'ids': ids[1:]})
+        self.client.post('/api/tasks/import', headers=self.headers[1],
+                         data=b'{"title": "Imported", "status": "completed"}\n{"title": "Imported 2"}\n')
+
+        with self.app.app_context():
+            self.assertEqual(reconcile_task_trends(db), {})
+            self.assertGreater(TaskDailyStat.query.count(), 0)
+
+    def test_daily_trend(self):
+        """Test per-day counts globally for admins and per user for everyone else."""
+        self.seed_history()
+
+        trend = self.trends(self.admin_headers, **{'from': '2024-01-01', 'to': '2024-01-04'})
+        self.assertEqual(trend['buckets'], ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'])
+        self.assertEqual(trend['created'], [2, 1, 1, 0])
+        self.assertEqual(trend['completed'], [0, 0, 2, 0])
+        self.assertEqual(trend['overdue'], [0, 0, 1, 0])
+        self.assertEqual(trend['totals'], {'created': 4, 'completed': 2, 'overdue': 1})
+
+        own = self.trends(self.headers[1], **{'from': '2024-01-01', 'to': '2024-01-04'})
+        self.assertEqual((own['created'], own['completed']), ([0, 0, 1, 0], [0, 0, 1, 0]))
+
+        # Users cannot widen the scope; admins can narrow it to one user
+        ignored = self.trends(self.headers[1], user_id=self.user_ids[0], **{'from': '2024-01-01', 'to': '2024-01-04'})
+        self.assertEqual(ignored['created'], own['created'])
+        narrowed = self.trends(self.admin_headers, user_id=self.user_ids[0], **{'from': '2024-01-01', 'to': '2024-01-04'})
+        self.assertEqual(narrowed['created'], [2, 1, 0, 0])
+
+    def test_weekly_trend(self):
+        """Test weekly buckets start on Monday and the range widens to whole weeks."""
+        self.seed_history()
+
+        trend = self.trends(self.admin_headers, bucket='week', **{'from': '2024-01-03', 'to': '2024-01-10'})
+        self.assertEqual((trend['from'], trend['to']), ('2024-01-01', '2024-01-14'))
+        self.assertEqual(trend['buckets'], ['2024-01-01', '2024-01-08'])
+        self.assertEqual(trend['created'], [4, 1])
+        self.assertEqual(trend['completed'], [2, 0])
+        self.assertEqual(trend['overdue'], [1, 1])
+
+    def test_overdue_only_for_past_days(self):
+        """Test open tasks due today or later are not reported as overdue, and completed ones count by their last update."""
+        today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+        for days in (-1, 0, 1):
+            self.insert(0, today - timedelta(days=3), due=today + timedelta(days=days))
+        self.insert(0, today - timedelta(days=3), status='completed', updated=today - timedelta(days=1))
+        with self.app.app_context():
+            rebuild_task_trends(db)
+
+        day = lambda days: (today + timedelta(days=days)).date().isoformat()
+        trend = self.trends(self.headers[0], **{'from': day(-3), 'to': day(1)})
+        self.assertEqual(trend['created'], [4, 0, 0, 0, 0])
+        self.assertEqual(trend['completed'], [0, 0, 1, 0, 0])
+        self.assertEqual(trend['overdue'], [0, 0, 1, 0, 0])
+        self.assertEqual(trend['totals']['overdue'], 1)
+
+    def test_default_range(self):
+        """Test the trend covers the last 30 days, or 12 weeks, up to today by default."""
+        today = datetime.utcnow().date()
+
+        daily = self.trends(self.headers[0])
+        self.assertEqual((len(daily['buckets']), daily['to']), (30, today.isoformat()))
+        weekly = self.trends(self.headers[0], bucket='week')
+        self.assertEqual(len(weekly['buckets']), 12)
+        self.assertEqual(date.fromisoformat(weekly['from']).weekday(), 0)
+
+    def test_invalid_parameters(self):
+        """Test malformed or oversized ranges are rejected."""
+        for params in ({'bucket': 'month'}, {'from': 'yesterday'}, {'from': '2024-02-01', 'to': '2024-01-01'},
+                       {'from': '2020-01-01', 'to': '2024-01-01'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/analytics/trends', headers=self.headers[0], query_string=params)
+                self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(self.client.get('/api/analytics/trends').status_code, 401)
+
+    @unittest.skipUnless(task_trends.numpy, 'NumPy is not installed')
+    def test_numpy_matches_python(self):
+        """Test the vectorized bucketing returns the same series as the pure-Python one."""
+        rng = random.Random(7)
+        offsets = sorted(rng.sample(range(731), 300))
+        counts = [[rng.randint(0, 50) for _ in range(3)] for _ in offsets]
+
+        for width in (1, 7):
+            days = 735 if width == 7 else 731
+            vectorized = task_trends._bucket_series(offsets, counts, days, width)
+            numpy_module, task_trends.numpy = task_trends.numpy, None
+            try:
+                self.assertEqual(vectorized, task_trends._bucket_series(offsets, counts, days, width))
+            finally:
+                task_trends.numpy = numpy_module
+
+    def test_rebuild_command(self):
+        """Test rebuild-task-trends --check reports drift and a rebuild removes it."""
+        self.insert(0, datetime(2024, 1, 1, 9))
+
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=['rebuild-task-trends', '--check'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('2 rollup row(s) out of sync', result.output)
+
+        result = runner.invoke(args=['rebuild-task-trends', '--batch-size', '1'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Rebuilt trend rollups: 1 user-day row(s), fixed 2 drifted row(s)', result.output)
+        self.assertEqual(runner.invoke(args=['rebuild-task-trends', '--check']).exit_code, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ import json
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
 
+from sqlalchemy import event
 from main import create_app
 from models.user import db, User
 from models.task import Task
@@ -13,9 +14,7 @@ from models.task import Task
 class TasksTestCase(unittest.TestCase):
     def setUp(self):
         """Set up test environment."""
-        self.app = create_app()
-        self.app.config['TESTING'] = True
-        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
         self.client = self.app.test_client()
         
         with self.app.app_context():
@@ -79,6 +78,15 @@ class TasksTestCase(unittest.TestCase):
         self.assertIn('task', data)
         self.assertEqual(data['task']['title'], 'New Test Task')
     
+    def test_create_task_title_too_long(self):
+        """Test titles longer than the column are rejected instead of failing in the database."""
+        response = self.client.post('/api/tasks',
+                                  headers={'Authorization': f'Bearer {self.access_token}'},
+                                  json={'title': 'x' * 201})
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['message'], 'title must be at most 200 characters')
+    
     def test_get_task_by_id(self):
         """Test getting a specific task."""
         response = self.client.get(f'/api/tasks/{self.task_id}',
@@ -113,6 +121,252 @@ class TasksTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         data = response.get_json()
         self.assertIn('message', data)
+    
+    def test_get_tasks_cursor_pagination(self):
+        """Test walking tasks with cursor pagination."""
+        with self.app.app_context():
+            for i in range(24):
+                db.session.add(Task(title=f'Task {i}', user_id=self.user_id))
+            db.session.commit()
+        
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        response = self.client.get('/api/tasks?pagination=cursor&per_page=10', headers=headers)
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertNotIn('total', data['pagination'])
+        
+        seen = [task['id'] for task in data['tasks']]
+        while data['pagination']['next_cursor']:
+            response = self.client.get(f"/api/tasks?cursor={data['pagination']['next_cursor']}&per_page=10",
+                                      headers=headers)
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()
+            seen.extend(task['id'] for task in data['tasks'])
+        
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+        self.assertFalse(data['pagination']['has_more'])
+    
+    def test_get_tasks_cursor_include_total(self):
+        """Test opting in to the total count in cursor mode."""
+        response = self.client.get('/api/tasks?pagination=cursor&include_total=true',
+                                  headers={'Authorization': f'Bearer {self.access_token}'})
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['pagination']['total'], 1)
+    
+    def test_get_tasks_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        response = self.client.get('/api/tasks?cursor=not-a-cursor',
+                                  headers={'Authorization': f'Bearer {self.access_token}'})
+        
+        self.assertEqual(response.status_code, 400)
+    
+    def test_get_tasks_per_page_clamped(self):
+        """Test a zero or negative per_page returns one task per page instead of failing."""
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        for query in ('pagination=cursor&per_page=0', 'pagination=cursor&per_page=-5', 'per_page=0'):
+            response = self.client.get(f'/api/tasks?{query}', headers=headers)
+            self.assertEqual(response.status_code, 200, query)
+            self.assertEqual(len(response.get_json()['tasks']), 1)
+    
+    def test_get_tasks_matches_to_dict(self):
+        """Test the projected list response matches Task.to_dict() with either JSON encoder."""
+        import services.serialization as serialization
+        
+        with self.app.app_context():
+            expected = db.session.get(Task, self.task_id).to_dict()
+        
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        fast = self.client.get('/api/tasks', headers=headers).get_json()['tasks']
+        
+        orjson = serialization.orjson
+        serialization.orjson = None
+        try:
+            stdlib = self.client.get('/api/tasks?pagination=cursor', headers=headers).get_json()['tasks']
+        finally:
+            serialization.orjson = orjson
+        
+        self.assertEqual(fast, [expected])
+        self.assertEqual(stdlib, [expected])
+    
+    def test_get_tasks_sparse_fields(self):
+        """Test selecting a subset of fields, including with cursor pagination."""
+        with self.app.app_context():
+            for i in range(4):
+                db.session.add(Task(title=f'Task {i}', user_id=self.user_id))
+            db.session.commit()
+        
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        response = self.client.get('/api/tasks?pagination=cursor&per_page=3&fields=title,status,title',
+                                  headers=headers)
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual([set(task) for task in data['tasks']], [{'title', 'status'}] * 3)
+        self.assertTrue(data['pagination']['has_more'])
+        
+        response = self.client.get(f"/api/tasks?cursor={data['pagination']['next_cursor']}&fields=title",
+                                  headers=headers)
+        self.assertEqual([task['title'] for task in response.get_json()['tasks']], ['Task 0', 'Test Task'])
+        
+        response = self.client.get('/api/tasks?fields=title,password_hash', headers=headers)
+        self.assertEqual(response.status_code, 400)
+    
+    def test_get_task_conditional(self):
+        """Test ETag and Last-Modified on a single task, and 304 once it is cached."""
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        response = self.client.get(f'/api/tasks/{self.task_id}', headers=headers)
+        
+        etag = response.headers['ETag']
+        last_modified = response.headers['Last-Modified']
+        self.assertTrue(etag.startswith('W/'))
+        
+        response = self.client.get(f'/api/tasks/{self.task_id}', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        
+        response = self.client.get(f'/api/tasks/{self.task_id}',
+                                  headers={**headers, 'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+        
+        self.client.put(f'/api/tasks/{self.task_id}', headers=headers, json={'status': 'completed'})
+        response = self.client.get(f'/api/tasks/{self.task_id}', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+    
+    def test_get_tasks_conditional(self):
+        """Test list ETags change on create, update and delete, and differ per page."""
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        
+        def list_etag(url='/api/tasks'):
+            response = self.client.get(url, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            return response.headers['ETag']
+        
+        etag = list_etag()
+        response = self.client.get('/api/tasks', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(list_etag('/api/tasks?per_page=5'), etag)
+        
+        task_id = self.client.post('/api/tasks', headers=headers, json={'title': 'New'}).get_json()['task']['id']
+        created = list_etag()
+        self.assertNotEqual(created, etag)
+        
+        self.client.put(f'/api/tasks/{task_id}', headers=headers, json={'title': 'Renamed'})
+        updated = list_etag()
+        self.assertNotEqual(updated, created)
+        
+        self.client.delete(f'/api/tasks/{self.task_id}', headers=headers)
+        self.assertNotEqual(list_etag(), updated)
+    
+    def test_get_tasks_cursor_conditional(self):
+        """Test cursor pages are validated by their content, without an aggregate over every task."""
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.get('/api/tasks?pagination=cursor', headers=headers)
+        finally:
+            with self.app.app_context():
+                event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([statement for statement in statements if 'count(' in statement.lower()])
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        
+        response = self.client.get('/api/tasks?pagination=cursor', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        
+        self.client.put(f'/api/tasks/{self.task_id}', headers=headers, json={'title': 'Renamed'})
+        response = self.client.get('/api/tasks?pagination=cursor', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+    
+    def test_update_delete_if_match(self):
+        """Test If-Match rejects writes based on a stale version."""
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        etag = self.client.get(f'/api/tasks/{self.task_id}', headers=headers).headers['ETag']
+        
+        response = self.client.put(f'/api/tasks/{self.task_id}', headers={**headers, 'If-Match': etag},
+                                  json={'title': 'First'})
+        self.assertEqual(response.status_code, 200)
+        current = response.headers['ETag']
+        
+        response = self.client.put(f'/api/tasks/{self.task_id}', headers={**headers, 'If-Match': etag},
+                                  json={'title': 'Second'})
+        self.assertEqual(response.status_code, 412)
+        
+        response = self.client.delete(f'/api/tasks/{self.task_id}', headers={**headers, 'If-Match': etag})
+        self.assertEqual(response.status_code, 412)
+        
+        response = self.client.delete(f'/api/tasks/{self.task_id}', headers={**headers, 'If-Match': current})
+        self.assertEqual(response.status_code, 200)
+    
+    def search(self, term):
+        """Return the ids of tasks matching a search term, in response order."""
+        response = self.client.get('/api/tasks', query_string={'search': term},
+                                  headers={'Authorization': f'Bearer {self.access_token}'})
+        self.assertEqual(response.status_code, 200)
+        return [task['id'] for task in response.get_json()['tasks']]
+    
+    def test_search_tasks(self):
+        """Test indexed search matches substrings of title and description."""
+        with self.app.app_context():
+            from services.search import get_search_backend
+            self.assertEqual(get_search_backend().name, 'sqlite_fts5')
+            
+            report = Task(title='Quarterly report', description='Draft numbers', user_id=self.user_id)
+            groceries = Task(title='Groceries', description='Buy milk for the report party', user_id=self.user_id)
+            db.session.add_all([report, groceries])
+            db.session.commit()
+            report_id, groceries_id = report.id, groceries.id
+        
+        self.assertEqual(set(self.search('report')), {report_id, groceries_id})
+        self.assertEqual(self.search('uarter'), [report_id])
+        self.assertEqual(self.search('MILK'), [groceries_id])
+        self.assertEqual(self.search('test task'), [self.task_id])
+        self.assertEqual(self.search('nothing like this'), [])
+        # Shorter than a trigram falls back to LIKE
+        self.assertIn(groceries_id, self.search('mi'))
+    
+    def test_search_ranks_best_match_first(self):
+        """Test search results are ordered by relevance."""
+        with self.app.app_context():
+            weak = Task(title='Misc', description='mentions deploy once among many other words here', user_id=self.user_id)
+            strong = Task(title='Deploy', description='deploy deploy', user_id=self.user_id)
+            db.session.add_all([strong, weak])
+            db.session.commit()
+            strong_id, weak_id = strong.id, weak.id
+        
+        self.assertEqual(self.search('deploy'), [strong_id, weak_id])
+    
+    def test_search_index_follows_updates_and_deletes(self):
+        """Test the search index tracks task writes."""
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        self.client.put(f'/api/tasks/{self.task_id}', headers=headers,
+                        json={'title': 'Renamed errand', 'description': 'Pick up parcel'})
+        
+        self.assertEqual(self.search('errand'), [self.task_id])
+        self.assertEqual(self.search('Test Task'), [])
+        
+        self.client.delete(f'/api/tasks/{self.task_id}', headers=headers)
+        self.assertEqual(self.search('errand'), [])
+    
+    def test_search_like_fallback(self):
+        """Test the LIKE backend still serves search when configured."""
+        self.app.config['SEARCH_BACKEND'] = 'like'
+        self.app.extensions.pop('task_search', None)
+        
+        self.assertEqual(self.search('est tas'), [self.task_id])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
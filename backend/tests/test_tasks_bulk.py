@@ -0,0 +1,204 @@
+import unittest
+import sys
+import os
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from main import create_app
+from models.user import db, User
+from models.task import Task
+from services.task_counters import reconcile_task_counters
+
+class TasksBulkTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment."""
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            other = User(username='otheruser', email='other@example.com')
+            other.set_password('testpassword')
+            db.session.add_all([user, other])
+            db.session.commit()
+
+            self.user_id = user.id
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+            self.other_headers = {'Authorization': f'Bearer {create_access_token(identity=other.id)}'}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def create(self, count, headers=None):
+        """Bulk create count tasks and return their ids."""
+        response = self.client.post('/api/tasks/bulk', headers=headers or self.headers,
+                                    json={'tasks': [{'title': f'Task {i}'} for i in range(count)]})
+        self.assertEqual(response.status_code, 201)
+        return [result['id'] for result in response.get_json()['results']]
+
+    def assertCountersConsistent(self):
+        with self.app.app_context():
+            self.assertEqual(reconcile_task_counters(db), {})
+
+    def test_bulk_create(self):
+        """Test creating many tasks with batched INSERTs."""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            ids = self.create(200)
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        self.assertEqual(len(set(ids)), 200)
+        task_inserts = [s for s in statements if s.startswith('INSERT INTO tasks ')]
+        self.assertLess(len(task_inserts), 10, f'{len(task_inserts)} INSERT statements for 200 tasks')
+        self.assertCountersConsistent()
+
+    def test_bulk_create_maps_ids_to_items(self):
+        """Test each result id belongs to the task built from the item at that index."""
+        titles = [f'Item {i}' for i in range(50)]
+        response = self.client.post('/api/tasks/bulk', headers=self.headers, json={'tasks': [{'title': t} for t in titles]})
+        self.assertEqual(response.status_code, 201)
+
+        with self.app.app_context():
+            for result, title in zip(response.get_json()['results'], titles):
+                self.assertEqual(db.session.get(Task, result['id']).title, title)
+
+    def test_bulk_writes_lock_rows(self):
+        """Test bulk update and delete read their tasks FOR UPDATE."""
+        ids = self.create(3)
+        locked = []
+
+        def record_lock(state):
+            if state.is_select and state.statement._for_update_arg is not None:
+                locked.append(state.statement.compile(dialect=postgresql.dialect()).string)
+
+        event.listen(Session, 'do_orm_execute', record_lock)
+        try:
+            self.client.put('/api/tasks/bulk', headers=self.headers, json={'tasks': [{'id': i, 'priority': 'high'} for i in ids]})
+            self.client.delete('/api/tasks/bulk', headers=self.headers, json={'ids': ids})
+        finally:
+            event.remove(Session, 'do_orm_execute', record_lock)
+
+        self.assertEqual(len(locked), 2)
+        self.assertTrue(all(statement.endswith('FOR UPDATE') for statement in locked))
+        self.assertCountersConsistent()
+
+    def test_bulk_create_atomic_rejects_all(self):
+        """Test an invalid item rejects the whole atomic request."""
+        response = self.client.post('/api/tasks/bulk', headers=self.headers, json={
+            'tasks': [{'title': 'Good'}, {'title': 'Bad', 'status': 'bogus'}, 'not an object']
+        })
+
+        self.assertEqual(response.status_code, 400)
+        data = response.get_json()
+        self.assertEqual([result['index'] for result in data['results']], [1, 2])
+        with self.app.app_context():
+            self.assertEqual(Task.query.count(), 0)
+
+    def test_bulk_create_partial(self):
+        """Test partial mode writes the valid items and reports the rest."""
+        response = self.client.post('/api/tasks/bulk', headers=self.headers, json={
+            'mode': 'partial',
+            'tasks': [{'title': 'Good'}, {'description': 'No title'}, {'title': 'Also good', 'priority': 'high'}]
+        })
+
+        self.assertEqual(response.status_code, 207)
+        data = response.get_json()
+        self.assertEqual([result['ok'] for result in data['results']], [True, False, True])
+        self.assertEqual(data['results'][1]['message'], 'title is required')
+        self.assertEqual((data['succeeded'], data['failed']), (2, 1))
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Task, data['results'][0]['id']).title, 'Good')
+            self.assertEqual(db.session.get(Task, data['results'][2]['id']).priority, 'high')
+        self.assertCountersConsistent()
+
+    def test_bulk_update(self):
+        """Test updating many tasks, including ownership and missing ids."""
+        mine = self.create(3)
+        theirs = self.create(1, self.other_headers)
+
+        response = self.client.put('/api/tasks/bulk', headers=self.headers, json={
+            'mode': 'partial',
+            'tasks': [
+                {'id': mine[0], 'status': 'completed'},
+                {'id': mine[1], 'priority': 'high', 'title': 'Renamed'},
+                {'id': theirs[0], 'status': 'completed'},
+                {'id': 999999, 'status': 'completed'},
+                {'id': mine[0], 'status': 'pending'},
+                {'id': mine[2], 'status': 'bogus'}
+            ]
+        })
+
+        self.assertEqual(response.status_code, 207)
+        statuses = [result['status'] for result in response.get_json()['results']]
+        self.assertEqual(statuses, [200, 200, 403, 404, 400, 400])
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Task, mine[0]).status, 'completed')
+            self.assertEqual(db.session.get(Task, mine[1]).title, 'Renamed')
+            self.assertEqual(db.session.get(Task, theirs[0]).status, 'pending')
+        self.assertCountersConsistent()
+
+    def test_bulk_update_atomic_rejects_all(self):
+        """Test one forbidden item leaves every task unchanged in atomic mode."""
+        mine = self.create(2)
+        theirs = self.create(1, self.other_headers)
+
+        response = self.client.put('/api/tasks/bulk', headers=self.headers, json={
+            'tasks': [{'id': mine[0], 'status': 'completed'}, {'id': theirs[0], 'status': 'completed'}]
+        })
+
+        self.assertEqual(response.status_code, 400)
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Task, mine[0]).status, 'pending')
+
+    def test_bulk_delete(self):
+        """Test deleting many tasks with a single statement."""
+        mine = self.create(5)
+        theirs = self.create(1, self.other_headers)
+
+        response = self.client.delete('/api/tasks/bulk', headers=self.headers,
+                                      json={'mode': 'partial', 'ids': mine + theirs})
+
+        self.assertEqual(response.status_code, 207)
+        data = response.get_json()
+        self.assertEqual((data['succeeded'], data['failed']), (5, 1))
+        with self.app.app_context():
+            self.assertEqual(Task.query.count(), 1)
+        self.assertCountersConsistent()
+
+    def test_bulk_limits(self):
+        """Test empty, oversized and malformed bulk requests are rejected."""
+        self.app.config['BULK_MAX_ITEMS'] = 3
+
+        response = self.client.post('/api/tasks/bulk', headers=self.headers,
+                                    json={'tasks': [{'title': 'x'}] * 4})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/tasks/bulk', headers=self.headers, json={'tasks': []})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.delete('/api/tasks/bulk', headers=self.headers,
+                                      json={'ids': [1], 'mode': 'sometimes'})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
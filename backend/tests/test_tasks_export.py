@@ -0,0 +1,160 @@
+import unittest
+import sys
+import os
+import csv
+import io
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import create_app
+from models.user import db, User
+from models.task import Task
+
+def current_rss():
+    """Anonymous resident memory of this process in bytes (Linux only).
+
+    File-backed pages, such as the database file mapped by SQLite's mmap_size,
+    are excluded; they are page cache, not memory held by the export.
+    """
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError('RssAnon not available')
+
+class ExportTestBase:
+    """Users and a seeding helper shared by the export test cases."""
+    database_uri = 'sqlite:///:memory:'
+
+    def setUp(self):
+        """Set up test environment."""
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': self.database_uri})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            other = User(username='otheruser', email='other@example.com')
+            other.set_password('testpassword')
+            db.session.add_all([user, other])
+            db.session.commit()
+
+            self.user_id = user.id
+            self.other_id = other.id
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def seed(self, count, user_id, status='pending'):
+        """Insert count tasks for user_id in batches."""
+        start = datetime(2024, 1, 1)
+        with self.app.app_context():
+            for offset in range(0, count, 10000):
+                db.session.execute(db.insert(Task), [
+                    {
+                        'title': f'Task {i}',
+                        'description': 'Exported',
+                        'status': status,
+                        'priority': 'medium',
+                        'user_id': user_id,
+                        'created_at': start + timedelta(seconds=i),
+                        'updated_at': start + timedelta(seconds=i)
+                    }
+                    for i in range(offset, min(offset + 10000, count))
+                ])
+            db.session.commit()
+
+class TasksExportTestCase(ExportTestBase, unittest.TestCase):
+    def test_export_ndjson(self):
+        """Test NDJSON export is scoped to the caller and newest first."""
+        self.seed(3, self.user_id)
+        self.seed(2, self.other_id)
+
+        response = self.client.get('/api/tasks/export', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertIn('tasks.ndjson', response.headers['Content-Disposition'])
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Task 2', 'Task 1', 'Task 0'])
+        self.assertTrue(all(row['user_id'] == self.user_id for row in rows))
+        self.assertEqual(rows[0]['created_at'], '2024-01-01T00:00:02')
+
+    def test_export_csv_with_filters(self):
+        """Test CSV export applies the list filters."""
+        self.seed(4, self.user_id)
+        self.seed(2, self.user_id, status='completed')
+
+        response = self.client.get('/api/tasks/export?format=csv&status=completed', headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row['status'] for row in rows}, {'completed'})
+
+    def test_export_invalid_format(self):
+        """Test unknown export formats are rejected."""
+        response = self.client.get('/api/tasks/export?format=xml', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+@unittest.skipUnless(os.environ.get('RUN_SLOW_TESTS'), 'Set RUN_SLOW_TESTS=1 to run the 500k-row export test')
+@unittest.skipUnless(os.path.exists('/proc/self/status'), 'RSS sampling needs /proc')
+class TasksExportMemoryTestCase(ExportTestBase, unittest.TestCase):
+    """Export memory test against a throwaway database file.
+
+    An in-memory database would keep all 500k rows in this process's heap
+    and swamp the RSS measurement.
+    """
+
+    def setUp(self):
+        """Set up test environment."""
+        self.db_dir = tempfile.mkdtemp()
+        self.database_uri = f"sqlite:///{os.path.join(self.db_dir, 'test.db')}"
+        super().setUp()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        super().tearDown()
+        with self.app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(self.db_dir)
+
+    def test_export_streams_with_bounded_memory(self):
+        """Test exporting 500k rows keeps RSS flat instead of buffering the body."""
+        count = 500000
+        self.seed(count, self.user_id)
+
+        response = self.client.get('/api/tasks/export', headers=self.headers, buffered=False)
+        self.assertEqual(response.status_code, 200)
+
+        lines = 0
+        size = 0
+        baseline = peak = current_rss()
+        try:
+            for chunk in response.response:
+                lines += chunk.count(b'\n')
+                size += len(chunk)
+                peak = max(peak, current_rss())
+        finally:
+            response.close()
+
+        self.assertEqual(lines, count)
+        # The body is >50MB; RSS growth must stay a small, fixed amount
+        growth = peak - baseline
+        self.assertLess(growth, 30 * 1024 * 1024, f'RSS grew {growth} bytes for a {size} byte export')
+
+if __name__ == '__main__':
+    unittest.main()
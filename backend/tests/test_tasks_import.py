@@ -0,0 +1,166 @@
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+import time
+from datetime import datetime
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import create_app
+from models.user import db, User
+from models.task import Task
+from routes.tasks_import import RawRequestStream
+from services.task_counters import reconcile_task_counters
+from services.task_import import import_tasks
+
+class TasksImportTestCase(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment."""
+        self.app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            from flask_jwt_extended import create_access_token
+            user = User(username='testuser', email='test@example.com')
+            user.set_password('testpassword')
+            db.session.add(user)
+            db.session.commit()
+
+            self.user_id = user.id
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def upload(self, body, import_format='ndjson'):
+        """POST an import body and return the decoded event stream."""
+        response = self.client.post(f'/api/tasks/import?format={import_format}', headers=self.headers, data=body)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_import_ndjson(self):
+        """Test NDJSON import in batches with per-line errors."""
+        self.app.config['IMPORT_BATCH_SIZE'] = 2
+        lines = [
+            json.dumps({'title': 'One', 'priority': 'high'}),
+            'not json',
+            json.dumps({'title': 'Two', 'status': 'completed', 'due_date': '2030-01-01T00:00:00'}),
+            '',
+            json.dumps({'description': 'No title'}),
+            json.dumps({'title': 'Three', 'status': 'bogus'}),
+            json.dumps({'title': 'Four', 'id': 999, 'user_id': 999})
+        ]
+
+        events = self.upload('\n'.join(lines) + '\n')
+
+        errors = [(event['line'], event['message']) for event in events if event['type'] == 'error']
+        self.assertEqual([line for line, _ in errors], [2, 5, 6])
+        self.assertEqual(errors[1][1], 'title is required')
+        self.assertEqual(len([event for event in events if event['type'] == 'progress']), 2)
+        self.assertEqual(events[-1], {'type': 'summary', 'processed': 6, 'imported': 3, 'failed': 3})
+
+        with self.app.app_context():
+            tasks = {task.title: task for task in Task.query.all()}
+            self.assertEqual(set(tasks), {'One', 'Two', 'Four'})
+            self.assertEqual(tasks['One'].priority, 'high')
+            self.assertEqual(tasks['Two'].due_date.year, 2030)
+            self.assertEqual(tasks['Four'].user_id, self.user_id)
+            self.assertEqual(reconcile_task_counters(db), {})
+
+    def test_import_rejects_values_the_database_would(self):
+        """Test an over-long title or a NUL character fails only its own line, not the batch."""
+        body = '\n'.join(json.dumps(record) for record in [
+            {'title': 'Fits'},
+            {'title': 'x' * 201},
+            {'title': 'Nul', 'description': 'a\x00b'},
+            {'title': 'x' * 200}
+        ]).encode()
+        events = self.upload(body)
+
+        self.assertEqual([(event['line'], event['message']) for event in events if event['type'] == 'error'], [
+            (2, 'title must be at most 200 characters'),
+            (3, 'description must not contain NUL characters')
+        ])
+        self.assertEqual(events[-1], {'type': 'summary', 'processed': 4, 'imported': 2, 'failed': 2})
+
+    def test_batches_stamped_when_written(self):
+        """Test each batch's tasks are dated when that batch is written, not when the import started."""
+        records = [(line, {'title': f'Task {line}'}, None) for line in range(1, 5)]
+        with self.app.app_context():
+            events = import_tasks(db, records, self.user_id, batch_size=2)
+            self.assertEqual(next(events)['type'], 'progress')
+            time.sleep(0.01)
+            between = datetime.utcnow()
+            self.assertEqual(list(events)[-1]['imported'], 4)
+
+            stamps = [(task.created_at, task.updated_at) for task in Task.query.order_by(Task.id)]
+        self.assertTrue(all(created == updated for created, updated in stamps))
+        self.assertTrue(all(created < between for created, _ in stamps[:2]))
+        self.assertTrue(all(created > between for created, _ in stamps[2:]))
+
+    def test_import_csv_round_trip(self):
+        """Test a CSV export can be imported back, with blank columns using defaults."""
+        self.client.post('/api/tasks', headers=self.headers, json={'title': 'Exported, with comma', 'priority': 'low'})
+        exported = self.client.get('/api/tasks/export?format=csv', headers=self.headers).get_data(as_text=True)
+
+        events = self.upload(exported + 'x,Blank columns,,,,,,,\n', 'csv')
+
+        self.assertEqual(events[-1], {'type': 'summary', 'processed': 2, 'imported': 2, 'failed': 0})
+        with self.app.app_context():
+            titles = [task.title for task in Task.query.filter_by(priority='low')]
+            self.assertEqual(titles, ['Exported, with comma', 'Exported, with comma'])
+            blank = Task.query.filter_by(title='Blank columns').one()
+            self.assertEqual((blank.status, blank.priority), ('pending', 'medium'))
+
+    def test_import_invalid_format(self):
+        """Test unknown import formats are rejected."""
+        response = self.client.post('/api/tasks/import?format=xml', headers=self.headers, data='')
+        self.assertEqual(response.status_code, 400)
+
+    def test_raw_request_stream(self):
+        """Test server input streams that only provide read() can be buffered."""
+        class ServerBody:
+            # Like gunicorn's Body: read(size) only, no io interface
+            def __init__(self, data):
+                self.data = data
+
+            def read(self, size=-1):
+                chunk, self.data = self.data[:size], self.data[size:]
+                return chunk
+
+        body = io.BufferedReader(RawRequestStream(ServerBody(b'{"title": "a"}\n{"title": "b"}\n')), 4)
+        self.assertEqual(list(body), [b'{"title": "a"}\n', b'{"title": "b"}\n'])
+
+    def test_import_cli(self):
+        """Test the import-tasks command."""
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as source:
+            for i in range(5):
+                source.write(json.dumps({'title': f'Task {i}'}) + '\n')
+            source.write('{"title": 1}\n')
+
+        try:
+            runner = self.app.test_cli_runner()
+            result = runner.invoke(args=['import-tasks', source.name, '--user', 'testuser', '--batch-size', '2'])
+        finally:
+            os.unlink(source.name)
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Imported 5 of 6 task(s), 1 failed', result.output)
+        self.assertIn('line 6: title must be a string', result.output)
+        with self.app.app_context():
+            self.assertEqual(Task.query.count(), 5)
+
+        result = runner.invoke(args=['import-tasks', '-', '--user', 'nobody'], input='')
+        self.assertNotEqual(result.exit_code, 0)
+
+if __name__ == '__main__':
+    unittest.main()